@@ -0,0 +1,48 @@
+"""Item sales stats
+
+Revision ID: 0002_item_sales_stats
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_item_sales_stats"
+down_revision: Union[str, None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_sales_stats",
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("total_quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["items.item_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("item_id"),
+    )
+    op.create_index(
+        "ix_item_sales_stats_total_quantity",
+        "item_sales_stats",
+        ["total_quantity", "item_id"],
+    )
+    op.execute(
+        """
+        INSERT INTO item_sales_stats (item_id, total_quantity)
+        SELECT od.item_id, SUM(od.quantity)
+        FROM order_details od
+        JOIN orders o ON o.order_id = od.order_id
+        WHERE o.order_status <> 'cancelled'
+        GROUP BY od.item_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_sales_stats_total_quantity", table_name="item_sales_stats")
+    op.drop_table("item_sales_stats")
@@ -0,0 +1,52 @@
+"""Hot path indexes
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_item_sales_stats
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_hot_path_indexes"
+down_revision: Union[str, None] = "0002_item_sales_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_orders_user_id_order_id", "orders", ["user_id", "order_id"])
+    op.create_index("ix_orders_order_status_order_id", "orders", ["order_status", "order_id"])
+    op.create_index("ix_order_details_order_id", "order_details", ["order_id"])
+    op.create_index("ix_order_details_item_id", "order_details", ["item_id"])
+    op.create_index("ix_users_email", "users", ["email"])
+    op.create_index("ix_users_lower_email", "users", [sa.text("lower(email)")])
+    op.create_index("ix_users_lower_city_name", "users", [sa.text("lower(city)"), "name"])
+    # Top-ordered sorts by total_quantity DESC, item_id ASC; a mixed-direction
+    # index lets SQLite walk it without a temporary sort.
+    op.drop_index("ix_item_sales_stats_total_quantity", table_name="item_sales_stats")
+    op.create_index(
+        "ix_item_sales_stats_top",
+        "item_sales_stats",
+        [sa.text("total_quantity DESC"), "item_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_sales_stats_top", table_name="item_sales_stats")
+    op.create_index(
+        "ix_item_sales_stats_total_quantity",
+        "item_sales_stats",
+        ["total_quantity", "item_id"],
+    )
+    op.drop_index("ix_users_lower_city_name", table_name="users")
+    op.drop_index("ix_users_lower_email", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_order_details_item_id", table_name="order_details")
+    op.drop_index("ix_order_details_order_id", table_name="order_details")
+    op.drop_index("ix_orders_order_status_order_id", table_name="orders")
+    op.drop_index("ix_orders_user_id_order_id", table_name="orders")
@@ -0,0 +1,58 @@
+"""Item search index
+
+Revision ID: 0004_item_search
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_item_search"
+down_revision: Union[str, None] = "0003_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE item_search
+            USING fts5(item_name, description, tokenize = 'unicode61 remove_diacritics 2')
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO item_search (rowid, item_name, description)
+            SELECT item_id, item_name, COALESCE(description, '')
+            FROM items
+            """
+        )
+    else:
+        op.execute(
+            """
+            CREATE TABLE item_search (
+                item_id INTEGER PRIMARY KEY REFERENCES items (item_id) ON DELETE CASCADE,
+                document TSVECTOR NOT NULL
+            )
+            """
+        )
+        op.execute("CREATE INDEX ix_item_search_document ON item_search USING GIN (document)")
+        op.execute(
+            """
+            INSERT INTO item_search (item_id, document)
+            SELECT
+                item_id,
+                setweight(to_tsvector('simple', item_name), 'A')
+                || setweight(to_tsvector('simple', COALESCE(description, '')), 'B')
+            FROM items
+            """
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE item_search")
@@ -0,0 +1,50 @@
+"""User search index
+
+Revision ID: 0005_user_search
+Revises: 0004_item_search
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_user_search"
+down_revision: Union[str, None] = "0004_item_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE user_search
+            USING fts5(name, city, email, phone, tokenize = 'trigram')
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO user_search (rowid, name, city, email, phone)
+            SELECT user_id, name, COALESCE(city, ''), email, CAST(phone_number AS TEXT)
+            FROM users
+            """
+        )
+    else:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_users_name_trgm ON users USING GIN (lower(name) gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_users_city_trgm ON users USING GIN (lower(city) gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_users_email_trgm ON users USING GIN (lower(email) gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_users_phone_trgm ON users USING GIN ((phone_number::text) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE user_search")
+    else:
+        op.execute("DROP INDEX ix_users_phone_trgm")
+        op.execute("DROP INDEX ix_users_email_trgm")
+        op.execute("DROP INDEX ix_users_city_trgm")
+        op.execute("DROP INDEX ix_users_name_trgm")
@@ -0,0 +1,28 @@
+"""Item photo variants
+
+Revision ID: 0006_item_photo_variants
+Revises: 0005_user_search
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_item_photo_variants"
+down_revision: Union[str, None] = "0005_user_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.add_column(sa.Column("photo_variants", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.drop_column("photo_variants")
@@ -0,0 +1,136 @@
+"""Order date columns
+
+On SQLite the rebuilt orders table keeps the original column order. Postgres
+cannot reorder columns in place, so there order_date and delivery_date end up
+as the last two columns of orders (SELECT * lists them last).
+
+Revision ID: 0007_order_date_columns
+Revises: 0006_item_photo_variants
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_order_date_columns"
+down_revision: Union[str, None] = "0006_item_photo_variants"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Orders converted per UPDATE. Each chunk commits on its own, so a large
+# table is never locked or held in one transaction for the whole backfill.
+BACKFILL_CHUNK_SIZE = 5000
+
+# Column order of orders since 0001; the SQLite table rebuild restores it.
+ORDER_COLUMNS = (
+    "order_id",
+    "user_id",
+    "amount",
+    "order_status",
+    "payment_status",
+    "payment_mode",
+    "order_date",
+    "delivery_date",
+    "address",
+    "city",
+)
+
+
+def _as_date(column: str, dialect: str) -> str:
+    # Blank strings become NULL; a time part after the date is dropped.
+    if dialect == "sqlite":
+        return f"date(NULLIF(trim({column}), ''))"
+    return f"CAST(NULLIF(btrim({column}), '') AS DATE)"
+
+
+def _rebuild_args(dialect: str, renamed_suffix: str) -> dict:
+    # SQLite rebuilds the table for the drop and rename anyway; forcing the
+    # rebuild lets it lay the replacement columns (still carrying
+    # renamed_suffix at that point) out where the old ones were.
+    if dialect != "sqlite":
+        return {}
+    layout = tuple(
+        f"{column}{renamed_suffix}" if column in ("order_date", "delivery_date") else column
+        for column in ORDER_COLUMNS
+    )
+    return {"recreate": "always", "partial_reordering": [layout]}
+
+
+def _backfill(target_suffix: str, convert) -> None:
+    # Copies order_date and delivery_date into the columns named with target_suffix.
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text("SELECT MIN(order_id), MAX(order_id) FROM orders")).one()
+    if low is None:
+        return
+    statement = sa.text(
+        f"""
+        UPDATE orders
+        SET order_date{target_suffix} = {convert("order_date")},
+            delivery_date{target_suffix} = {convert("delivery_date")}
+        WHERE order_id >= :start AND order_id < :stop
+        """
+    )
+    with op.get_context().autocommit_block():
+        for start in range(low, high + 1, BACKFILL_CHUNK_SIZE):
+            bind.execute(statement, {"start": start, "stop": start + BACKFILL_CHUNK_SIZE})
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.add_column(sa.Column("order_date_new", sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column("delivery_date_new", sa.Date(), nullable=True))
+
+    _backfill("_new", lambda column: _as_date(column, dialect))
+
+    unparsed = op.get_bind().execute(
+        sa.text("SELECT order_id, order_date FROM orders WHERE order_date_new IS NULL ORDER BY order_id LIMIT 10")
+    ).all()
+    if unparsed:
+        examples = ", ".join(f"{order_id}: {value!r}" for order_id, value in unparsed)
+        raise RuntimeError(f"Fix these order dates before upgrading; they are not YYYY-MM-DD: {examples}")
+
+    with op.batch_alter_table("orders", **_rebuild_args(dialect, "_new")) as batch_op:
+        batch_op.drop_column("order_date")
+        batch_op.drop_column("delivery_date")
+        batch_op.alter_column(
+            "order_date_new", new_column_name="order_date", existing_type=sa.Date(), nullable=False
+        )
+        batch_op.alter_column(
+            "delivery_date_new", new_column_name="delivery_date", existing_type=sa.Date(), existing_nullable=True
+        )
+
+    op.create_index("ix_orders_order_date_order_id", "orders", ["order_date", "order_id"])
+    op.create_index("ix_orders_order_status_order_date", "orders", ["order_status", "order_date", "order_id"])
+    op.create_index("ix_orders_delivery_date", "orders", ["delivery_date"])
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    op.drop_index("ix_orders_delivery_date", table_name="orders")
+    op.drop_index("ix_orders_order_status_order_date", table_name="orders")
+    op.drop_index("ix_orders_order_date_order_id", table_name="orders")
+
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.add_column(sa.Column("order_date_old", sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column("delivery_date_old", sa.String(length=20), nullable=True))
+
+    # Dates go back to the ISO strings the String(20) columns held.
+    _backfill("_old", lambda column: column if dialect == "sqlite" else f"to_char({column}, 'YYYY-MM-DD')")
+
+    with op.batch_alter_table("orders", **_rebuild_args(dialect, "_old")) as batch_op:
+        batch_op.drop_column("order_date")
+        batch_op.drop_column("delivery_date")
+        batch_op.alter_column(
+            "order_date_old", new_column_name="order_date", existing_type=sa.String(length=20), nullable=False
+        )
+        batch_op.alter_column(
+            "delivery_date_old",
+            new_column_name="delivery_date",
+            existing_type=sa.String(length=20),
+            existing_nullable=True,
+        )
@@ -0,0 +1,85 @@
+"""Daily sales rollups
+
+Revision ID: 0008_sales_rollups
+Revises: 0007_order_date_columns
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_sales_rollups"
+down_revision: Union[str, None] = "0007_order_date_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_sales",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+        sa.Column("items_sold", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "daily_item_sales",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["items.item_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("day", "item_id"),
+    )
+    op.create_table(
+        "daily_city_sales",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("city", sa.String(length=120), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "city"),
+    )
+    op.execute(
+        """
+        INSERT INTO daily_item_sales (day, item_id, quantity, revenue)
+        SELECT o.order_date, od.item_id, SUM(od.quantity), SUM(od.quantity * od.price)
+        FROM orders o
+        JOIN order_details od ON od.order_id = o.order_id
+        WHERE o.order_status <> 'cancelled'
+        GROUP BY o.order_date, od.item_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_city_sales (day, city, orders, revenue)
+        SELECT order_date, city, COUNT(*), SUM(amount)
+        FROM orders
+        WHERE order_status <> 'cancelled'
+        GROUP BY order_date, city
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_sales (day, orders, revenue, items_sold)
+        SELECT o.order_date, COUNT(*), SUM(o.amount), COALESCE(SUM(lines.quantity), 0)
+        FROM orders o
+        LEFT JOIN (
+            SELECT order_id, SUM(quantity) AS quantity
+            FROM order_details
+            GROUP BY order_id
+        ) lines ON lines.order_id = o.order_id
+        WHERE o.order_status <> 'cancelled'
+        GROUP BY o.order_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_city_sales")
+    op.drop_table("daily_item_sales")
+    op.drop_table("daily_sales")
@@ -0,0 +1,34 @@
+"""Open order delivery date index
+
+Revision ID: 0009_open_order_delivery_index
+Revises: 0008_sales_rollups
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_open_order_delivery_index"
+down_revision: Union[str, None] = "0008_sales_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_ORDER_PREDICATE = "order_status IN ('pending', 'confirmed')"
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_orders_open_delivery_date",
+        "orders",
+        ["delivery_date", "order_id"],
+        sqlite_where=sa.text(OPEN_ORDER_PREDICATE),
+        postgresql_where=sa.text(OPEN_ORDER_PREDICATE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_open_delivery_date", table_name="orders")
@@ -0,0 +1,131 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import get_admin_user_async, get_current_user_async
+from catalog import build_catalog_page, catalog_cache, get_top_ordered_catalog_items
+from database import get_async_db
+from db_utils import RawJSONResponse, fetch_one_dict, fetch_page, json_response
+from models import ItemPage, ItemResponse, OrderPage, OrderResponse, UserResponse
+from order_service import attach_order_lines, fetch_order_lines, fetch_order_page, parse_order_includes
+
+
+# Async twins of the read-heavy routes in main.py, mounted only when
+# ASYNC_DB_ENABLED is set. Queries reuse the sync helpers through
+# AsyncSession.run_sync, which drives the async driver without a thread.
+router = APIRouter()
+
+
+async def fetch_order_for_user(db: AsyncSession, order_id: int, current_user: dict) -> dict:
+    order = await db.run_sync(fetch_one_dict, "SELECT * FROM orders WHERE order_id = :order_id", {"order_id": order_id})
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if order["user_id"] != current_user["user_id"] and current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    return order
+
+
+@router.get("/items", response_model=list[ItemResponse])
+async def get_items(db: AsyncSession = Depends(get_async_db)):
+    return RawJSONResponse(await catalog_cache.get_json_async(db))
+
+
+@router.get("/items/top-ordered", response_model=list[ItemResponse])
+async def get_top_ordered_items(limit: int = 3, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(get_top_ordered_catalog_items, limit)
+
+
+@router.get("/items/paginated", response_model=ItemPage)
+async def get_items_paginated(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    all_items, _ = await catalog_cache.get_async(db)
+    return json_response(build_catalog_page(all_items, cursor, limit, include_total))
+
+
+@router.get("/items/{item_id}", response_model=ItemResponse)
+async def get_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    _, items_by_id = await catalog_cache.get_async(db)
+    item = items_by_id.get(item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+
+@router.get("/orders", response_model=OrderPage)
+async def get_orders(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    include: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_async_db),
+    admin: dict = Depends(get_admin_user_async),
+):
+    includes = parse_order_includes(include)
+    page = await db.run_sync(fetch_order_page, cursor, limit, include_total, date_from, date_to, order_status)
+    if "items" in includes:
+        await db.run_sync(attach_order_lines, page["items"])
+    return json_response(page)
+
+
+@router.get("/orders/{order_id}", response_model=OrderResponse)
+async def get_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user_async),
+):
+    return await fetch_order_for_user(db, order_id, current_user)
+
+
+@router.get("/orders/{order_id}/complete")
+async def get_complete_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user_async),
+):
+    order = await fetch_order_for_user(db, order_id, current_user)
+    items = await db.run_sync(fetch_order_lines, order_id)
+    return {"order": order, "items": items, "total_items": len(items)}
+
+
+@router.get("/users/{user_id}/orders", response_model=OrderPage)
+async def get_user_orders(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user_async),
+):
+    if current_user["user_id"] != user_id and current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    includes = parse_order_includes(include)
+    page = await db.run_sync(
+        fetch_page,
+        "orders",
+        "*",
+        "order_id",
+        cursor,
+        limit,
+        where="user_id = :user_id",
+        params={"user_id": user_id},
+        descending=True,
+        include_total=include_total,
+    )
+    if "items" in includes:
+        await db.run_sync(attach_order_lines, page["items"])
+    return json_response(page)
+
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user_profile(current_user: dict = Depends(get_current_user_async)):
+    return current_user
@@ -1,16 +1,34 @@
+import asyncio
+import hashlib
+import logging
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Hashable, Optional
 
 from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
-from settings import IS_PRODUCTION
+from database import SessionLocal, get_async_db, get_db
+from settings import (
+    IS_PRODUCTION,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WORKERS,
+    PRINCIPAL_CACHE_SIZE,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 def _load_secret_key() -> str:
@@ -56,6 +74,108 @@ def password_needs_rehash(stored_password: str) -> bool:
     return pwd_context.needs_update(stored_password)
 
 
+# bcrypt is CPU bound, so it runs on its own small pool instead of Starlette's
+# request threadpool. Work beyond PASSWORD_HASH_MAX_PENDING is rejected with a
+# 503 rather than queued behind everything else.
+_password_executor = ThreadPoolExecutor(max_workers=max(1, PASSWORD_HASH_WORKERS), thread_name_prefix="password-hash")
+_password_slots = threading.BoundedSemaphore(max(1, PASSWORD_HASH_MAX_PENDING))
+_password_stats_lock = threading.Lock()
+_password_stats: dict[str, Any] = {
+    "pending": 0,
+    "rejected": 0,
+    "hash": {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+    "verify": {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+}
+
+
+def _timed_password_work(operation: str, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        elapsed = time.perf_counter() - started
+        with _password_stats_lock:
+            stats = _password_stats[operation]
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+
+def _release_password_slot(_future) -> None:
+    with _password_stats_lock:
+        _password_stats["pending"] -= 1
+    _password_slots.release()
+
+
+async def _run_password_work(operation: str, func, *args):
+    if not _password_slots.acquire(blocking=False):
+        with _password_stats_lock:
+            _password_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    with _password_stats_lock:
+        _password_stats["pending"] += 1
+    future = _password_executor.submit(_timed_password_work, operation, func, *args)
+    future.add_done_callback(_release_password_slot)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_work("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, stored_password: str) -> bool:
+    return await _run_password_work("verify", verify_password, plain_password, stored_password)
+
+
+def _store_password_hash(user_id: int, hashed_password: str, old_hash: str) -> bool:
+    # Only replaces the hash the login verified against: if the password was
+    # changed in the meantime, the rehash of the old one matches nothing.
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            text("UPDATE users SET password = :password WHERE user_id = :user_id AND password = :old_hash"),
+            {"password": hashed_password, "user_id": user_id, "old_hash": old_hash},
+        )
+        db.commit()
+        return result.rowcount > 0
+    finally:
+        db.close()
+
+
+async def rehash_password_in_background(user_id: int, plain_password: str, old_hash: str) -> None:
+    try:
+        hashed_password = await hash_password_async(plain_password)
+    except HTTPException:
+        # Pool is saturated; the next successful login will try again.
+        logger.info("Skipped password rehash for user %s: hashing pool busy", user_id)
+        return
+    if not await run_in_threadpool(_store_password_hash, user_id, hashed_password, old_hash):
+        logger.info("Skipped password rehash for user %s: password changed since login", user_id)
+
+
+def get_password_hash_stats() -> dict:
+    with _password_stats_lock:
+        stats = {
+            "workers": max(1, PASSWORD_HASH_WORKERS),
+            "max_pending": max(1, PASSWORD_HASH_MAX_PENDING),
+            "pending": _password_stats["pending"],
+            "rejected": _password_stats["rejected"],
+        }
+        for operation in ("hash", "verify"):
+            op_stats = dict(_password_stats[operation])
+            op_stats["avg_seconds"] = op_stats["total_seconds"] / op_stats["count"] if op_stats["count"] else 0.0
+            stats[operation] = op_stats
+    return stats
+
+
+def shutdown_password_executor() -> None:
+    _password_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
@@ -93,44 +213,167 @@ def clear_auth_cookie(response: Response) -> None:
     )
 
 
-def get_current_user(request: Request):
-    credentials_exception = HTTPException(
+class ExpiringLRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pop_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Decoded tokens are kept until their own expiry; principals (the users row)
+# for a short TTL, keyed by user and token so each session has its own entry.
+# Writers in this process invalidate every session of the user at once; other
+# workers keep serving their copy until PRINCIPAL_CACHE_TTL_SECONDS runs out.
+_token_cache = ExpiringLRUCache(PRINCIPAL_CACHE_SIZE)
+_principal_cache = ExpiringLRUCache(PRINCIPAL_CACHE_SIZE)
+_auth_stats_lock = threading.Lock()
+_auth_stats = {"token_hits": 0, "token_misses": 0, "principal_hits": 0, "principal_misses": 0}
+
+
+def _count_auth(key: str) -> None:
+    with _auth_stats_lock:
+        _auth_stats[key] += 1
+
+
+def invalidate_principal(user_id: int) -> None:
+    _principal_cache.pop_matching(lambda key: key[0] == user_id)
+
+
+def get_auth_cache_stats() -> dict:
+    with _auth_stats_lock:
+        stats = dict(_auth_stats)
+    stats["db_lookups_avoided"] = stats["principal_hits"]
+    stats["cached_tokens"] = len(_token_cache)
+    stats["cached_principals"] = len(_principal_cache)
+    stats["principal_ttl_seconds"] = PRINCIPAL_CACHE_TTL_SECONDS
+    return stats
+
+
+def _decode_user_id(token: str) -> Optional[int]:
+    user_id = _token_cache.get(token)
+    if user_id is not None:
+        _count_auth("token_hits")
+        return user_id
+
+    _count_auth("token_misses")
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    expires_at = payload.get("exp")
+    if subject is None or expires_at is None:
+        return None
+    try:
+        user_id = int(subject)
+    except (TypeError, ValueError):
+        return None
+    _token_cache.set(token, user_id, float(expires_at))
+    return user_id
+
+
+PRINCIPAL_QUERY = text(
+    """
+    SELECT user_id, name, phone_number, email, role, address, city
+    FROM users
+    WHERE user_id = :user_id
+    """
+)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _principal_key(request: Request) -> tuple[int, str]:
+    # (user_id, token hash): the principal cache key for this session.
     token = get_token_from_request(request)
     if not token:
-        raise credentials_exception
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    user_id = _decode_user_id(token)
+    if user_id is None:
+        raise _credentials_exception()
+    return user_id, hashlib.sha256(token.encode()).hexdigest()
+
+
+def _cached_principal(key: tuple[int, str]) -> Optional[dict]:
+    user = _principal_cache.get(key)
+    _count_auth("principal_hits" if user is not None else "principal_misses")
+    return dict(user) if user is not None else None
 
-    db: Session = SessionLocal()
-    try:
-        user = db.execute(
-            text(
-                """
-                SELECT user_id, name, phone_number, email, role, address, city
-                FROM users
-                WHERE user_id = :user_id
-                """
-            ),
-            {"user_id": int(user_id)},
-        ).mappings().first()
-    finally:
-        db.close()
 
-    if user is None:
-        raise credentials_exception
+def _remember_principal(key: tuple[int, str], row) -> dict:
+    if row is None:
+        raise _credentials_exception()
+    user = dict(row)
+    _principal_cache.set(key, user, time.time() + PRINCIPAL_CACHE_TTL_SECONDS)
     return dict(user)
 
 
+def get_current_user(request: Request, db: Session = Depends(get_db)):
+    key = _principal_key(request)
+    user = _cached_principal(key)
+    if user is not None:
+        return user
+    row = db.execute(PRINCIPAL_QUERY, {"user_id": key[0]}).mappings().first()
+    return _remember_principal(key, row)
+
+
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = _principal_key(request)
+    user = _cached_principal(key)
+    if user is not None:
+        return user
+    row = (await db.execute(PRINCIPAL_QUERY, {"user_id": key[0]})).mappings().first()
+    return _remember_principal(key, row)
+
+
 def get_admin_user(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
+
+
+async def get_admin_user_async(current_user: dict = Depends(get_current_user_async)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
@@ -0,0 +1,155 @@
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def _configure_database(database_url: str | None) -> str:
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+        return database_url
+    path = Path(tempfile.mkdtemp(prefix="homebites-bench-")) / "bench.db"
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def run(orders: int, concurrency: int, cart_size: int, max_batch: int, database_url: str | None) -> list[dict]:
+    _configure_database(database_url)
+
+    # Imported after DATABASE_URL is set so the engine points at the bench database.
+    from sqlalchemy import text
+
+    from database import IS_SQLITE, GroupCommitWriter, SessionLocal, engine
+    from db_models import Base
+    from order_service import create_order_with_items
+
+    if not IS_SQLITE:
+        raise SystemExit("The group commit writer is for SQLite; pass a sqlite:/// URL or none")
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        user_id = db.execute(
+            text(
+                """
+                INSERT INTO users (name, phone_number, email, password, role, address, city)
+                VALUES ('Bench User', 9000000000, 'bench@example.com', 'x', 'user', 'Bench Street', 'Bench City')
+                RETURNING user_id
+                """
+            )
+        ).scalar_one()
+        item_ids = [
+            db.execute(
+                text(
+                    """
+                    INSERT INTO items (item_name, price, weight, photos, videos, description)
+                    VALUES (:name, :price, '250g', '', '', 'benchmark item')
+                    RETURNING item_id
+                    """
+                ),
+                {"name": f"Bench item {index}", "price": 50 + index},
+            ).scalar_one()
+            for index in range(cart_size)
+        ]
+        db.commit()
+
+    cart = [{"item_id": item_id, "quantity": 2} for item_id in item_ids]
+
+    def create(db):
+        return create_order_with_items(
+            db,
+            user_id=user_id,
+            items=cart,
+            order_status="pending",
+            payment_status="pending",
+            payment_mode="cash",
+            order_date="2026-01-01",
+            delivery_date="2026-01-02",
+            address="Bench Street",
+            city="Bench City",
+        )
+
+    def per_request_commit():
+        with SessionLocal() as db:
+            create(db)
+            db.commit()
+
+    writer = GroupCommitWriter(SessionLocal, max_batch=max_batch)
+    results = [
+        _drive("per-request commit", per_request_commit, orders, concurrency),
+        _drive("group commit", lambda: writer.run(create), orders, concurrency),
+    ]
+    writer.close()
+    stats = writer.stats()
+    results[1]["mean_batch"] = stats["jobs"] / stats["batches"] if stats["batches"] else 0
+    results[1]["largest_batch"] = stats["largest_batch"]
+    return results
+
+
+def _drive(mode: str, place_order, orders: int, concurrency: int) -> dict:
+    # Each thread stands in for a request handler placing orders back to back.
+    timings: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = iter(range(orders))
+
+    def worker() -> None:
+        nonlocal errors
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                place_order()
+            except Exception:
+                with lock:
+                    errors += 1
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                timings.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "orders": len(timings),
+        "errors": errors,
+        "orders_per_second": len(timings) / wall if wall else 0.0,
+        "p50_ms": statistics.median(timings) if timings else 0.0,
+        "p95_ms": statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else sum(timings),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare SQLite order throughput with a commit per order and with the group commit writer."
+    )
+    parser.add_argument("--orders", type=int, default=2000, help="orders to place per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="threads placing orders at once")
+    parser.add_argument("--cart-size", type=int, default=3, help="lines per order")
+    parser.add_argument("--max-batch", type=int, default=64, help="most orders the writer commits together")
+    parser.add_argument("--database-url", default=None, help="scratch SQLite database; defaults to a throwaway file")
+    args = parser.parse_args()
+
+    results = run(args.orders, args.concurrency, args.cart_size, args.max_batch, args.database_url)
+
+    print(f"{'mode':<20} {'orders':>7} {'errors':>7} {'orders/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch':>6}")
+    for row in results:
+        batch = f"{row['mean_batch']:.1f}" if "mean_batch" in row else "-"
+        print(
+            f"{row['mode']:<20} {row['orders']:>7} {row['errors']:>7} {row['orders_per_second']:>9.0f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {batch:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
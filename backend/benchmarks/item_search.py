@@ -0,0 +1,96 @@
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.order_creation import _configure_database
+
+WORDS = [
+    "ragi", "besan", "rava", "coconut", "jaggery", "millet", "ghee", "dry", "fruit", "sesame",
+    "peanut", "chikki", "laddu", "murukku", "chakli", "mixture", "pickle", "mango", "lemon", "gongura",
+    "karam", "podi", "sweet", "spicy", "crispy", "roasted", "homemade", "village", "special", "classic",
+]
+QUERIES = ["laddu", "ragi lad", "crispy murukku", "mango pickle", "gongra", "swet", "homemade ghee laddu"]
+
+
+def _filler_words(generator: random.Random, count: int) -> list[str]:
+    # Made-up words so the catalog has a realistic vocabulary size instead
+    # of every item sharing the same few dozen terms.
+    letters = "abcdeghiklmnoprstuvy"
+    return ["".join(generator.choices(letters, k=generator.randint(4, 9))) for _ in range(count)]
+
+
+def run(items: int, repeats: int, limit: int, database_url: str | None) -> list[dict]:
+    _configure_database(database_url)
+
+    # Imported after DATABASE_URL is set so the engine points at the bench database.
+    from sqlalchemy import text
+
+    from database import SessionLocal, engine
+    from db_models import Base
+    from item_search import rebuild_item_search, search_items
+
+    Base.metadata.create_all(bind=engine)
+    generator = random.Random(7)
+    filler = _filler_words(generator, 3000)
+
+    with SessionLocal() as db:
+        db.execute(
+            text(
+                """
+                INSERT INTO items (item_name, price, weight, photos, videos, description)
+                VALUES (:name, :price, '250g', '', '', :description)
+                """
+            ),
+            [
+                {
+                    "name": " ".join(generator.sample(WORDS, 2) + generator.sample(filler, 1)).title(),
+                    "price": 50 + index % 400,
+                    "description": " ".join(generator.sample(WORDS, 2) + generator.sample(filler, 10)),
+                }
+                for index in range(items)
+            ],
+        )
+        db.execute(
+            text("INSERT INTO item_sales_stats (item_id, total_quantity) SELECT item_id, item_id % 97 FROM items")
+        )
+        rebuild_item_search(db)
+        db.commit()
+
+    results = []
+    with SessionLocal() as db:
+        for query in QUERIES:
+            search_items(db, query, limit)  # warm the catalog snapshot and vocabulary
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                matches = search_items(db, query, limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            results.append(
+                {
+                    "query": query,
+                    "matches": len(matches),
+                    "mean_ms": statistics.fmean(timings),
+                    "p95_ms": statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0],
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time full-text item search on a synthetic catalog.")
+    parser.add_argument("--items", type=int, default=10_000, help="catalog size")
+    parser.add_argument("--repeats", type=int, default=200, help="searches per query")
+    parser.add_argument("--limit", type=int, default=20, help="results per search")
+    parser.add_argument("--database-url", default=None, help="scratch database to write to; defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    results = run(args.items, args.repeats, args.limit, args.database_url)
+
+    print(f"{'query':<22} {'matches':>8} {'mean ms':>9} {'p95 ms':>9}")
+    for row in results:
+        print(f"{row['query']:<22} {row['matches']:>8} {row['mean_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from benchmarks.order_creation import _configure_database
+from benchmarks.seed import (
+    ADMIN_EMAIL,
+    BENCH_PASSWORD,
+    USER_EMAIL_TEMPLATE,
+    add_seed_arguments,
+    create_seeded_database,
+)
+
+
+# Drives the hot endpoints in-process through httpx's ASGI transport at a
+# fixed concurrency, so runs measure the application and database rather
+# than a network stack, and writes JSON that --compare can diff later.
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+CUSTOMER_ID = 2
+
+
+def _order_payload(rng: random.Random, item_count: int) -> dict:
+    today = date.today().isoformat()
+    return {
+        "order_status": "pending",
+        "payment_status": "pending",
+        "payment_mode": "upi",
+        "order_date": today,
+        "delivery_date": today,
+        "address": f"{CUSTOMER_ID} Bench Street",
+        "city": "Vizag",
+        "items": [
+            {"item_id": item_id, "quantity": rng.randint(1, 3)}
+            for item_id in rng.sample(range(1, item_count + 1), min(item_count, 3))
+        ],
+    }
+
+
+# name -> (client role, build(rng, counts) -> (method, url, request kwargs))
+SCENARIOS = {
+    "items": ("anonymous", lambda rng, counts: ("GET", "/items", {})),
+    "top-ordered": ("anonymous", lambda rng, counts: ("GET", "/items/top-ordered?limit=10", {})),
+    "login": (
+        "anonymous",
+        lambda rng, counts: (
+            "POST",
+            "/login",
+            {
+                "data": {
+                    "username": USER_EMAIL_TEMPLATE.format(n=rng.randint(2, max(2, counts["users"]))),
+                    "password": BENCH_PASSWORD,
+                }
+            },
+        ),
+    ),
+    "order-complete": ("customer", lambda rng, counts: ("POST", "/orders/complete", {"json": _order_payload(rng, counts["items"])})),
+    "user-orders": ("customer", lambda rng, counts: ("GET", f"/users/{CUSTOMER_ID}/orders?limit=20&include=items", {})),
+    "admin-orders": ("admin", lambda rng, counts: ("GET", "/orders?limit=50", {})),
+    "admin-users": ("admin", lambda rng, counts: ("GET", "/admin/users?limit=50", {})),
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summarize(name: str, timings: list[float], statuses: dict[int, int], elapsed: float) -> dict:
+    ordered = sorted(timings)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    errors = sum(count for code, count in statuses.items() if code >= 400)
+    return {
+        "scenario": name,
+        "requests": len(timings),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": len(timings) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": cuts[49],
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "max_ms": ordered[-1],
+    }
+
+
+async def _run_scenario(clients, name: str, requests: int, warmup: int, concurrency: int, counts: dict, rng: random.Random) -> dict:
+    role, build = SCENARIOS[name]
+    client = clients[role]
+
+    async def drive(total: int, timings: list[float], statuses: dict[int, int]) -> None:
+        remaining = total
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                method, url, kwargs = build(rng, counts)
+                started = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    await drive(warmup, [], {})
+    timings: list[float] = []
+    statuses: dict[int, int] = {}
+    started = time.perf_counter()
+    await drive(requests, timings, statuses)
+    return _summarize(name, timings, statuses, time.perf_counter() - started)
+
+
+async def run_load(scenarios: list[str], requests: int, warmup: int, concurrency: int, counts: dict, random_seed: int) -> list[dict]:
+    # Imported after DATABASE_URL is set so the app binds to the bench database.
+    import httpx
+
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    clients = {
+        role: httpx.AsyncClient(transport=transport, base_url="http://testserver")
+        for role in ("anonymous", "customer", "admin")
+    }
+    try:
+        for role, email in (("customer", USER_EMAIL_TEMPLATE.format(n=CUSTOMER_ID)), ("admin", ADMIN_EMAIL)):
+            response = await clients[role].post("/login", data={"username": email, "password": BENCH_PASSWORD})
+            response.raise_for_status()
+
+        rng = random.Random(random_seed)
+        return [await _run_scenario(clients, name, requests, warmup, concurrency, counts, rng) for name in scenarios]
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+
+def compare(results: dict, baseline: dict) -> None:
+    before = {row["scenario"]: row for row in baseline["scenarios"]}
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    print(f"{'scenario':<16} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'req/s':>17}")
+    for row in results["scenarios"]:
+        old = before.get(row["scenario"])
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            change = (row[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{row[key]:>8.2f} ({change:+5.1f}%)")
+        print(f"{row['scenario']:<16} " + " ".join(f"{cell:>17}" for cell in cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load the hot endpoints in-process and report latency percentiles.")
+    add_seed_arguments(parser)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests per scenario before timing")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded --database-url")
+    parser.add_argument("--output", default=None, help="results file; defaults to benchmarks/results/load-<commit>.json")
+    parser.add_argument("--compare", default=None, help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.skip_seed:
+        if not args.database_url:
+            parser.error("--skip-seed needs --database-url")
+        _configure_database(args.database_url)
+    else:
+        create_seeded_database(
+            args.users,
+            args.items,
+            args.orders,
+            args.lines_per_order,
+            database_url=args.database_url,
+            days=args.days,
+            random_seed=args.random_seed,
+        )
+
+    from sqlalchemy.engine import make_url
+
+    from database import DATABASE_URL
+    from settings import ASYNC_DB_ENABLED
+
+    counts = {"users": args.users, "items": args.items}
+    scenario_results = asyncio.run(
+        run_load(scenarios, args.requests, args.warmup, args.concurrency, counts, args.random_seed)
+    )
+
+    commit = _git_commit()
+    results = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": make_url(DATABASE_URL).get_backend_name(),
+            "async_db": ASYNC_DB_ENABLED,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": {
+                "users": args.users,
+                "items": args.items,
+                "orders": args.orders,
+                "lines_per_order": args.lines_per_order,
+                "random_seed": args.random_seed,
+            },
+        },
+        "scenarios": scenario_results,
+    }
+
+    print(f"{'scenario':<16} {'reqs':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for row in scenario_results:
+        print(
+            f"{row['scenario']:<16} {row['requests']:>6} {row['errors']:>6} {row['throughput_rps']:>9.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}"
+        )
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
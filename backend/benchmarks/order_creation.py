@@ -0,0 +1,118 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+def _configure_database(database_url: str | None) -> str:
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+        return database_url
+    path = Path(tempfile.mkdtemp(prefix="homebites-bench-")) / "bench.db"
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def run(cart_sizes: list[int], orders_per_size: int, database_url: str | None) -> list[dict]:
+    _configure_database(database_url)
+
+    # Imported after DATABASE_URL is set so the engine points at the bench database.
+    from sqlalchemy import event, text
+
+    from database import SessionLocal, engine
+    from db_models import Base
+    from order_service import create_order_with_items
+
+    Base.metadata.create_all(bind=engine)
+    max_cart = max(cart_sizes)
+
+    with SessionLocal() as db:
+        user_id = db.execute(
+            text(
+                """
+                INSERT INTO users (name, phone_number, email, password, role, address, city)
+                VALUES ('Bench User', 9000000000, 'bench@example.com', 'x', 'user', 'Bench Street', 'Bench City')
+                RETURNING user_id
+                """
+            )
+        ).scalar_one()
+        item_ids = [
+            db.execute(
+                text(
+                    """
+                    INSERT INTO items (item_name, price, weight, photos, videos, description)
+                    VALUES (:name, :price, '250g', '', '', 'benchmark item')
+                    RETURNING item_id
+                    """
+                ),
+                {"name": f"Bench item {index}", "price": 50 + index},
+            ).scalar_one()
+            for index in range(max_cart)
+        ]
+        db.commit()
+
+    statement_count = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statements(*_args) -> None:
+        nonlocal statement_count
+        statement_count += 1
+
+    results = []
+    for cart_size in cart_sizes:
+        cart = [{"item_id": item_id, "quantity": 2} for item_id in item_ids[:cart_size]]
+        timings = []
+        statements_before = statement_count
+        for _ in range(orders_per_size):
+            started = time.perf_counter()
+            with SessionLocal() as db:
+                create_order_with_items(
+                    db,
+                    user_id=user_id,
+                    items=cart,
+                    order_status="pending",
+                    payment_status="pending",
+                    payment_mode="cash",
+                    order_date="2026-01-01",
+                    delivery_date="2026-01-02",
+                    address="Bench Street",
+                    city="Bench City",
+                )
+                db.commit()
+            timings.append((time.perf_counter() - started) * 1000)
+        results.append(
+            {
+                "cart_size": cart_size,
+                "orders": orders_per_size,
+                "statements_per_order": (statement_count - statements_before) / orders_per_size,
+                "mean_ms": statistics.fmean(timings),
+                "p95_ms": statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0],
+            }
+        )
+
+    event.remove(engine, "before_cursor_execute", count_statements)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time order creation for different cart sizes.")
+    parser.add_argument("--cart-sizes", default="1,50", help="comma separated line counts per order")
+    parser.add_argument("--orders", type=int, default=200, help="orders to create per cart size")
+    parser.add_argument("--database-url", default=None, help="scratch database to write to; defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    cart_sizes = [int(size) for size in args.cart_sizes.split(",") if size.strip()]
+    results = run(cart_sizes, args.orders, args.database_url)
+
+    print(f"{'lines':>6} {'orders':>7} {'stmts/order':>12} {'mean ms':>9} {'p95 ms':>9}")
+    for row in results:
+        print(
+            f"{row['cart_size']:>6} {row['orders']:>7} {row['statements_per_order']:>12.1f} "
+            f"{row['mean_ms']:>9.2f} {row['p95_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.order_creation import _configure_database
+
+
+# Synthetic data for benchmarks. Rows get explicit ids and go in through
+# executemany batches, so seeding 100k orders takes seconds, not minutes.
+# The same --random-seed always produces the same rows; order dates are
+# spread back from today so date-based views have recent data.
+
+BATCH_SIZE = 5000
+
+ADMIN_EMAIL = "admin@bench.example.com"
+USER_EMAIL_TEMPLATE = "user{n}@bench.example.com"
+BENCH_PASSWORD = "bench-password"
+
+CITIES = ["Hyderabad", "Vizag", "Vijayawada", "Guntur", "Nellore", "Tirupati", "Kakinada", "Warangal"]
+FIRST_NAMES = ["Anil", "Bhavya", "Chandu", "Divya", "Esha", "Gopi", "Harsha", "Indu", "Kiran", "Lakshmi", "Mohan", "Nisha"]
+LAST_NAMES = ["Reddy", "Rao", "Naidu", "Varma", "Sharma", "Kumar", "Prasad", "Devi"]
+DISHES = ["Pulihora", "Gongura Pickle", "Sunnundalu", "Ariselu", "Kaju Barfi", "Boondi", "Murukulu", "Mango Pickle", "Chekkalu", "Pootharekulu"]
+WEIGHTS = ["250g", "500g", "1kg"]
+ORDER_STATUSES = ["pending", "confirmed", "delivered", "delivered", "delivered", "cancelled"]
+PAYMENT_MODES = ["cash", "upi", "card"]
+
+
+def _insert(db, statement: str, rows: list[dict]) -> None:
+    from sqlalchemy import text
+
+    query = text(statement)
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(query, rows[start : start + BATCH_SIZE])
+
+
+def _reset_sequences(db) -> None:
+    from sqlalchemy import text
+
+    for table, key in (("users", "user_id"), ("items", "item_id"), ("orders", "order_id"), ("order_details", "order_detail_id")):
+        db.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', '{key}'), COALESCE(MAX({key}), 0) + 1, false) FROM {table}")
+        )
+
+
+def seed_database(
+    db,
+    users: int,
+    items: int,
+    orders: int,
+    lines_per_order: int,
+    days: int = 180,
+    random_seed: int = 0,
+) -> dict[str, int]:
+    # Expects empty tables; user 1 is the admin, the rest are customers.
+    from sqlalchemy import text
+
+    from auth import hash_password
+    from database import IS_SQLITE
+    from item_search import rebuild_item_search
+    from sales_rollups import rebuild_sales_rollups
+    from sales_stats import rebuild_item_sales_stats
+    from user_search import rebuild_user_search
+
+    existing = db.execute(text("SELECT COUNT(*) FROM users")).scalar_one()
+    if existing:
+        raise RuntimeError("Seeding needs an empty database; users table already has rows")
+
+    rng = random.Random(random_seed)
+    password = hash_password(BENCH_PASSWORD)
+    today = date.today()
+
+    user_rows = [
+        {
+            "user_id": n,
+            "name": "Bench Admin" if n == 1 else f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}",
+            "phone_number": 9000000000 + n,
+            "email": ADMIN_EMAIL if n == 1 else USER_EMAIL_TEMPLATE.format(n=n),
+            "password": password,
+            "role": "admin" if n == 1 else "user",
+            "address": f"{n} Bench Street",
+            "city": rng.choice(CITIES),
+        }
+        for n in range(1, users + 1)
+    ]
+    _insert(
+        db,
+        """
+        INSERT INTO users (user_id, name, phone_number, email, password, role, address, city)
+        VALUES (:user_id, :name, :phone_number, :email, :password, :role, :address, :city)
+        """,
+        user_rows,
+    )
+
+    prices = {n: rng.randrange(80, 900, 10) for n in range(1, items + 1)}
+    _insert(
+        db,
+        """
+        INSERT INTO items (item_id, item_name, price, weight, photos, videos, description)
+        VALUES (:item_id, :item_name, :price, :weight, '', '', :description)
+        """,
+        [
+            {
+                "item_id": n,
+                "item_name": f"{DISHES[n % len(DISHES)]} {n}",
+                "price": prices[n],
+                "weight": rng.choice(WEIGHTS),
+                "description": f"Homemade {DISHES[n % len(DISHES)].lower()} from {rng.choice(CITIES)}",
+            }
+            for n in range(1, items + 1)
+        ],
+    )
+
+    item_ids = list(prices)
+    order_rows = []
+    line_rows = []
+    for order_id in range(1, orders + 1):
+        user = user_rows[rng.randrange(1, users) if users > 1 else 0]
+        ordered_on = today - timedelta(days=rng.randrange(days))
+        amount = 0
+        for item_id in rng.sample(item_ids, min(len(item_ids), rng.randint(1, lines_per_order))):
+            quantity = rng.randint(1, 3)
+            amount += prices[item_id] * quantity
+            line_rows.append(
+                {
+                    "order_detail_id": len(line_rows) + 1,
+                    "order_id": order_id,
+                    "item_id": item_id,
+                    "quantity": quantity,
+                    "price": prices[item_id],
+                }
+            )
+        order_rows.append(
+            {
+                "order_id": order_id,
+                "user_id": user["user_id"],
+                "amount": amount,
+                "order_status": rng.choice(ORDER_STATUSES),
+                "payment_status": rng.choice(["pending", "paid"]),
+                "payment_mode": rng.choice(PAYMENT_MODES),
+                "order_date": ordered_on.isoformat(),
+                "delivery_date": (ordered_on + timedelta(days=2)).isoformat(),
+                "address": user["address"],
+                "city": user["city"],
+            }
+        )
+    _insert(
+        db,
+        """
+        INSERT INTO orders (order_id, user_id, amount, order_status, payment_status, payment_mode,
+                            order_date, delivery_date, address, city)
+        VALUES (:order_id, :user_id, :amount, :order_status, :payment_status, :payment_mode,
+                :order_date, :delivery_date, :address, :city)
+        """,
+        order_rows,
+    )
+    _insert(
+        db,
+        """
+        INSERT INTO order_details (order_detail_id, order_id, item_id, quantity, price)
+        VALUES (:order_detail_id, :order_id, :item_id, :quantity, :price)
+        """,
+        line_rows,
+    )
+
+    if not IS_SQLITE:
+        _reset_sequences(db)
+    rebuild_item_sales_stats(db)
+    rebuild_sales_rollups(db)
+    rebuild_item_search(db)
+    rebuild_user_search(db)
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return {"users": users, "items": items, "orders": orders, "order_details": len(line_rows)}
+
+
+def create_seeded_database(
+    users: int,
+    items: int,
+    orders: int,
+    lines_per_order: int,
+    database_url: str | None = None,
+    days: int = 180,
+    random_seed: int = 0,
+) -> dict[str, int]:
+    _configure_database(database_url)
+
+    # Imported after DATABASE_URL is set so the engine points at the bench database.
+    from database import SessionLocal, engine
+    from db_models import Base
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        return seed_database(db, users, items, orders, lines_per_order, days=days, random_seed=random_seed)
+
+
+def add_seed_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=2000, help="users to create, including the admin")
+    parser.add_argument("--items", type=int, default=200, help="catalog items to create")
+    parser.add_argument("--orders", type=int, default=20000, help="orders to create")
+    parser.add_argument("--lines-per-order", type=int, default=4, help="maximum lines per order")
+    parser.add_argument("--days", type=int, default=180, help="spread order dates over this many past days")
+    parser.add_argument("--random-seed", type=int, default=0, help="seed for the data generator")
+    parser.add_argument("--database-url", default=None, help="empty scratch database to seed; defaults to a throwaway SQLite file")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a scratch database with synthetic users, items and orders.")
+    add_seed_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = create_seeded_database(
+        args.users,
+        args.items,
+        args.orders,
+        args.lines_per_order,
+        database_url=args.database_url,
+        days=args.days,
+        random_seed=args.random_seed,
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"Seeded {os.environ['DATABASE_URL']} in {elapsed:.1f}s")
+    for table, count in counts.items():
+        print(f"  {table:<14} {count:>9}")
+    print(f"Log in as {ADMIN_EMAIL} or {USER_EMAIL_TEMPLATE.format(n=2)} with password {BENCH_PASSWORD!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.order_creation import _configure_database
+
+
+def _time_per_row(func, rows: int, repeats: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1_000_000 / rows)
+    return statistics.fmean(timings), min(timings)
+
+
+def run(rows: int, repeats: int, database_url: str | None) -> list[dict]:
+    _configure_database(database_url)
+
+    # Imported after DATABASE_URL is set so the engine points at the bench database.
+    from pydantic import TypeAdapter
+    from sqlalchemy import text
+
+    import db_utils
+    from database import SessionLocal, engine
+    from db_models import Base
+    from models import OrderResponse
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user_id = db.execute(
+            text(
+                """
+                INSERT INTO users (name, phone_number, email, password, role, address, city)
+                VALUES ('Bench User', 9000000000, 'bench@example.com', 'x', 'user', 'Bench Street', 'Bench City')
+                RETURNING user_id
+                """
+            )
+        ).scalar_one()
+        db.execute(
+            text(
+                """
+                INSERT INTO orders (user_id, amount, order_status, payment_status, payment_mode,
+                                    order_date, delivery_date, address, city)
+                VALUES (:user_id, :amount, 'delivered', 'paid', 'upi', '2026-01-01', '2026-01-02',
+                        '12 Bench Street, Near Market', 'Bench City')
+                """
+            ),
+            [{"user_id": user_id, "amount": 100 + index} for index in range(rows)],
+        )
+        db.commit()
+
+    query = "SELECT * FROM orders ORDER BY order_id LIMIT :limit"
+    params = {"limit": rows}
+    adapter = TypeAdapter(list[OrderResponse])
+    orjson_module = db_utils.orjson
+
+    def mapping_rows():
+        with SessionLocal() as db:
+            return [dict(row) for row in db.execute(text(query), params).mappings().all()]
+
+    def tuple_rows():
+        with SessionLocal() as db:
+            return db_utils.fetch_all_dicts(db, query, params)
+
+    fetched = tuple_rows()
+
+    def pydantic_response():
+        # What FastAPI does for a response_model: validate, dump to JSON-able
+        # data, then encode with the stdlib JSONResponse settings.
+        content = adapter.dump_python(adapter.validate_python(fetched), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def stdlib_bytes():
+        db_utils.orjson = None
+        try:
+            return db_utils.dumps_json(fetched)
+        finally:
+            db_utils.orjson = orjson_module
+
+    cases = [
+        ("fetch: RowMapping dicts", mapping_rows),
+        ("fetch: tuples zipped with keys", tuple_rows),
+        ("encode: pydantic validate + json", pydantic_response),
+        ("encode: dumps_json (stdlib)", stdlib_bytes),
+    ]
+    if orjson_module is not None:
+        cases.append(("encode: dumps_json (orjson)", lambda: db_utils.dumps_json(fetched)))
+
+    results = []
+    for name, func in cases:
+        mean_us, best_us = _time_per_row(func, rows, repeats)
+        results.append({"case": name, "rows": rows, "mean_us_per_row": mean_us, "best_us_per_row": best_us})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-row cost of fetching and encoding list responses.")
+    parser.add_argument("--rows", type=int, default=10_000, help="rows per response")
+    parser.add_argument("--repeats", type=int, default=20, help="timed runs per case")
+    parser.add_argument("--database-url", default=None, help="scratch database to write to; defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeats, args.database_url)
+
+    print(f"{'case':<36} {'rows':>7} {'mean us/row':>12} {'best us/row':>12}")
+    for row in results:
+        print(f"{row['case']:<36} {row['rows']:>7} {row['mean_us_per_row']:>12.3f} {row['best_us_per_row']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import bisect
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db_utils import InvalidCursorError, build_page, decode_cursor, dumps_json, fetch_all_dicts, normalize_page_size
+from item_images import present_item
+from sales_stats import get_top_ordered_item_ids
+from settings import CATALOG_CACHE_TTL_SECONDS
+
+
+class CatalogCache:
+    # Items change a few times a day, so reads are served from an in-process
+    # snapshot. Writers bump the version; the next reader refreshes while any
+    # concurrent readers keep getting the previous snapshot.
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._snapshot: Optional[tuple[int, float, list[dict], dict[int, dict]]] = None
+        # The full catalog encoded as JSON, paired with the items list it was built from.
+        self._items_json: Optional[tuple[list[dict], bytes]] = None
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "invalidations": 0}
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _is_fresh(self, snapshot) -> bool:
+        version, loaded_at, _, _ = snapshot
+        return version == self._version and (time.monotonic() - loaded_at) < self.ttl_seconds
+
+    def invalidate(self) -> None:
+        with self._stats_lock:
+            self._version += 1
+            self._stats["invalidations"] += 1
+
+    def _load(self, db: Session) -> tuple[list[dict], dict[int, dict]]:
+        items = [present_item(item) for item in fetch_all_dicts(db, "SELECT * FROM items ORDER BY item_id ASC")]
+        return items, {item["item_id"]: item for item in items}
+
+    def get(self, db: Session, wait: bool = True) -> tuple[list[dict], dict[int, dict]]:
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh(snapshot):
+            self._count("hits")
+            return snapshot[2], snapshot[3]
+
+        if snapshot is not None or not wait:
+            if not self._refresh_lock.acquire(blocking=False):
+                self._count("misses" if snapshot is None else "stale_hits")
+                # Nothing cached yet and the caller cannot block: read through.
+                return (snapshot[2], snapshot[3]) if snapshot is not None else self._load(db)
+        else:
+            self._refresh_lock.acquire()
+
+        try:
+            snapshot = self._snapshot
+            if snapshot is not None and self._is_fresh(snapshot):
+                self._count("hits")
+                return snapshot[2], snapshot[3]
+
+            self._count("misses")
+            version = self._version
+            items, items_by_id = self._load(db)
+            self._snapshot = (version, time.monotonic(), items, items_by_id)
+            self._count("refreshes")
+            return items, items_by_id
+        finally:
+            self._refresh_lock.release()
+
+    async def get_async(self, db: AsyncSession) -> tuple[list[dict], dict[int, dict]]:
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh(snapshot):
+            self._count("hits")
+            return snapshot[2], snapshot[3]
+        # Blocking on the refresh lock would stall the event loop, so async
+        # callers never wait for another refresh to finish.
+        return await db.run_sync(self.get, False)
+
+    def _encoded(self, items: list[dict]) -> bytes:
+        cached = self._items_json
+        if cached is None or cached[0] is not items:
+            cached = (items, dumps_json(items))
+            self._items_json = cached
+        return cached[1]
+
+    def get_json(self, db: Session) -> bytes:
+        items, _ = self.get(db)
+        return self._encoded(items)
+
+    async def get_json_async(self, db: AsyncSession) -> bytes:
+        items, _ = await self.get_async(db)
+        return self._encoded(items)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["version"] = self._version
+        snapshot = self._snapshot
+        stats["loaded_version"] = snapshot[0] if snapshot else None
+        stats["cached_items"] = len(snapshot[2]) if snapshot else 0
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_TTL_SECONDS)
+
+
+def build_catalog_page(
+    all_items: list[dict], cursor: Optional[str], limit: Optional[int], include_total: bool
+) -> dict[str, Any]:
+    page_size = normalize_page_size(limit)
+    after_key = decode_cursor(cursor)
+    if after_key is not None and not isinstance(after_key, int):
+        raise InvalidCursorError("Invalid cursor")
+    # The cached catalog is ordered by item_id, so the cursor position is a binary search.
+    start = 0 if after_key is None else bisect.bisect_right(all_items, after_key, key=lambda item: item["item_id"])
+    rows = all_items[start : start + page_size + 1]
+    return build_page(rows, "item_id", page_size, len(all_items) if include_total else None)
+
+
+def get_top_ordered_catalog_items(db: Session, limit: int) -> list[dict]:
+    safe_limit = max(1, min(limit, 20))
+    all_items, items_by_id = catalog_cache.get(db, wait=False)
+    top_items = [items_by_id[item_id] for item_id in get_top_ordered_item_ids(db, safe_limit) if item_id in items_by_id]
+    if len(top_items) < safe_limit:
+        top_ids = {item["item_id"] for item in top_items}
+        top_items.extend(item for item in all_items if item["item_id"] not in top_ids)
+    return top_items[:safe_limit]
@@ -1,13 +1,42 @@
+import logging
 import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional, TypeVar
 
 from sqlalchemy import create_engine, event
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from db_models import Base
-from settings import IS_PRODUCTION
+from metrics import record_query
+from profiler import PROFILER_AVAILABLE, profile_statement
+from settings import (
+    ASYNC_DB_ENABLED,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_WAIT_WARN_MS,
+    IS_PRODUCTION,
+    METRICS_ENABLED,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_GROUP_COMMIT,
+    SQLITE_GROUP_COMMIT_MAX_BATCH,
+    SQLITE_MMAP_SIZE,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -25,25 +54,280 @@ def get_database_url() -> str:
     return f"sqlite+pysqlite:///{SQLITE_PATH}"
 
 
+def get_async_database_url(database_url: str) -> str:
+    # psycopg 3 serves both sync and async engines from the same URL; SQLite
+    # needs the aiosqlite driver instead of pysqlite.
+    if database_url.startswith("sqlite+pysqlite://"):
+        return database_url.replace("sqlite+pysqlite://", "sqlite+aiosqlite://", 1)
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return database_url
+
+
+_pool_stats_lock = threading.Lock()
+_pool_stats = {"checkouts": 0, "slow_checkouts": 0, "saturated_checkouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+
+def _pool_saturated(pool: QueuePool) -> bool:
+    # DB_MAX_OVERFLOW=-1 lets the pool open connections without limit.
+    if DB_MAX_OVERFLOW < 0:
+        return False
+    return pool.checkedout() >= pool.size() + DB_MAX_OVERFLOW
+
+
+class PoolWaitMonitorMixin:
+    # Times every checkout so pool sizing can be checked against the
+    # database's connection limit: slow waits and checkouts that leave no
+    # spare connection are logged. connect() is the pool's public entry
+    # point; the counting happens in a "checkout" event listener.
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            logger.error(
+                "Timed out after %.1f s waiting for a database connection (%s)",
+                time.perf_counter() - started,
+                self.status(),
+            )
+            raise
+        waited = time.perf_counter() - started
+        with _pool_stats_lock:
+            _pool_stats["wait_seconds_total"] += waited
+            _pool_stats["wait_seconds_max"] = max(_pool_stats["wait_seconds_max"], waited)
+            if waited * 1000 >= DB_POOL_WAIT_WARN_MS:
+                _pool_stats["slow_checkouts"] += 1
+        if waited * 1000 >= DB_POOL_WAIT_WARN_MS:
+            logger.warning("Waited %.1f ms for a database connection (%s)", waited * 1000, self.status())
+        return connection
+
+
+def _watch_checkouts(pool) -> None:
+    @event.listens_for(pool, "checkout")
+    def count_checkout(_dbapi_connection, _connection_record, _connection_proxy) -> None:
+        saturated = _pool_saturated(pool)
+        with _pool_stats_lock:
+            _pool_stats["checkouts"] += 1
+            if saturated:
+                _pool_stats["saturated_checkouts"] += 1
+        if saturated:
+            logger.warning("Database connection pool saturated (%s)", pool.status())
+
+
+class MonitoredQueuePool(PoolWaitMonitorMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(PoolWaitMonitorMixin, AsyncAdaptedQueuePool):
+    pass
+
+
 DATABASE_URL = get_database_url()
 IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and make_url(DATABASE_URL).database in (None, "", ":memory:")
 
 engine_kwargs = {"future": True}
 if IS_SQLITE:
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
+    engine_kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+if not IS_SQLITE_MEMORY:
+    engine_kwargs.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+if not IS_SQLITE:
+    engine_kwargs.update(pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
 
-engine: Engine = create_engine(DATABASE_URL, **engine_kwargs)
+engine: Engine = create_engine(
+    DATABASE_URL,
+    **({"poolclass": MonitoredQueuePool} if not IS_SQLITE_MEMORY else {}),
+    **engine_kwargs,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if ASYNC_DB_ENABLED:
+    async_engine = create_async_engine(
+        get_async_database_url(DATABASE_URL),
+        **({"poolclass": MonitoredAsyncQueuePool} if not IS_SQLITE_MEMORY else {}),
+        **engine_kwargs,
+    )
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+for _pool in (engine.pool, async_engine.sync_engine.pool if async_engine is not None else None):
+    if isinstance(_pool, QueuePool):
+        _watch_checkouts(_pool)
+
+
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
     if IS_SQLITE:
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        if not IS_SQLITE_MEMORY:
+            # WAL lets readers proceed during a write; NORMAL sync is durable
+            # across application crashes, which is enough for local use.
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
 
 
+if async_engine is not None:
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+
+
+def _start_query_timer(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    context._query_started = time.perf_counter()
+
+
+def _record_query_time(conn, _cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._query_started
+    if METRICS_ENABLED:
+        record_query(elapsed)
+    if PROFILER_AVAILABLE:
+        profile_statement(conn, statement, parameters, elapsed, executemany)
+
+
+if METRICS_ENABLED or PROFILER_AVAILABLE:
+    for _engine in (engine, async_engine.sync_engine if async_engine is not None else None):
+        if _engine is not None:
+            event.listen(_engine, "before_cursor_execute", _start_query_timer)
+            event.listen(_engine, "after_cursor_execute", _record_query_time)
+
+
+T = TypeVar("T")
+
+
+class GroupCommitWriter:
+    # A single writer thread for SQLite. Callers submit a function of a
+    # Session; the thread runs whatever has queued up (up to max_batch
+    # jobs) inside one BEGIN IMMEDIATE ... COMMIT, each job under its own
+    # SAVEPOINT so a failing job is rolled back alone and its exception goes
+    # to its caller. Requests stop contending for the database lock, and a
+    # rush of orders pays for one commit (one WAL sync) per batch instead of
+    # one per order. Results are handed out only after the batch commits.
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_batch: int = SQLITE_GROUP_COMMIT_MAX_BATCH,
+    ):
+        self.session_factory = session_factory or SessionLocal
+        self.max_batch = max(1, max_batch)
+        # (work, future) jobs; None tells the thread to stop
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"jobs": 0, "failed_jobs": 0, "batches": 0, "largest_batch": 0}
+
+    def submit(self, work: Callable[[Session], T]) -> "Future[T]":
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The group commit writer is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sqlite-group-commit", daemon=True)
+                self._thread.start()
+            self._queue.put((work, future))
+        return future
+
+    def run(self, work: Callable[[Session], T]) -> T:
+        # Blocks until the batch holding `work` has committed.
+        return self.submit(work).result()
+
+    def close(self) -> None:
+        # Jobs already queued are still written.
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [job for job in batch if job is not None]
+            if not batch:
+                continue
+            try:
+                self._write_batch(batch)
+            except Exception as exc:
+                # Only reached if rolling back or closing the session failed;
+                # the thread keeps serving later batches.
+                logger.exception("Group commit writer could not recover a batch")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _write_batch(self, batch: list[tuple[Callable[[Session], object], Future]]) -> None:
+        succeeded: list[tuple[Future, object]] = []
+        db = self.session_factory()
+        try:
+            # pysqlite opens transactions lazily; starting one explicitly
+            # takes the write lock up front and keeps each SAVEPOINT nested,
+            # so releasing the first one does not commit the batch.
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for work, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                savepoint = db.begin_nested()
+                try:
+                    result = work(db)
+                    savepoint.commit()
+                except Exception as exc:
+                    savepoint.rollback()
+                    future.set_exception(exc)
+                else:
+                    succeeded.append((future, result))
+            db.commit()
+        except Exception as exc:
+            logger.exception("Group commit of %d jobs failed", len(batch))
+            db.rollback()
+            succeeded = []
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            db.close()
+        for future, result in succeeded:
+            future.set_result(result)
+        with self._lock:
+            self._stats["jobs"] += len(batch)
+            self._stats["failed_jobs"] += len(batch) - len(succeeded)
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+
+
+# Opt-in (SQLITE_GROUP_COMMIT=true) and only for file-backed SQLite:
+# Postgres handles concurrent writers itself, and every thread would see a
+# different in-memory database.
+order_writer: Optional[GroupCommitWriter] = (
+    GroupCommitWriter() if SQLITE_GROUP_COMMIT and IS_SQLITE and not IS_SQLITE_MEMORY else None
+)
+
+
 def init_db() -> None:
     if IS_SQLITE and not IS_PRODUCTION:
         Base.metadata.create_all(bind=engine)
@@ -55,3 +339,24 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled. Set ASYNC_DB_ENABLED=true to enable it.")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            checked_in=pool.checkedin(),
+        )
+    return stats
@@ -1,4 +1,6 @@
-from sqlalchemy import CheckConstraint, ForeignKey, Integer, String, Text
+from datetime import date
+
+from sqlalchemy import DDL, CheckConstraint, Date, ForeignKey, Index, Integer, String, Text, event, func, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -22,9 +24,36 @@ class UserTable(Base):
 
     __table_args__ = (
         CheckConstraint("role IN ('admin', 'user')", name="ck_users_role"),
+        Index("ix_users_email", "email"),
     )
 
 
+Index("ix_users_lower_email", func.lower(UserTable.email))
+Index("ix_users_lower_city_name", func.lower(UserTable.city), UserTable.name)
+
+# Admin user search (user_search.py): an FTS5 trigram table keyed by
+# rowid = user_id on SQLite, pg_trgm GIN expression indexes on Postgres.
+USER_SEARCH_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS user_search
+    USING fts5(name, city, email, phone, tokenize = 'trigram')
+    """,
+)
+USER_SEARCH_POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING GIN (lower(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_city_trgm ON users USING GIN (lower(city) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING GIN (lower(email) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_phone_trgm ON users USING GIN ((phone_number::text) gin_trgm_ops)",
+)
+
+for _statement in USER_SEARCH_SQLITE_DDL:
+    event.listen(UserTable.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in USER_SEARCH_POSTGRES_DDL:
+    event.listen(UserTable.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(UserTable.__table__, "before_drop", DDL("DROP TABLE IF EXISTS user_search").execute_if(dialect="sqlite"))
+
+
 class ItemTable(Base):
     __tablename__ = "items"
 
@@ -35,10 +64,43 @@ class ItemTable(Base):
     photos: Mapped[str | None] = mapped_column(Text, nullable=True)
     videos: Mapped[str | None] = mapped_column(Text, nullable=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # JSON: variant name -> {"path", "width", "height"}, written by item_images.py
+    photo_variants: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     order_details: Mapped[list["OrderDetailTable"]] = relationship(back_populates="item")
 
 
+# The item search index is dialect specific, so it lives outside the ORM
+# metadata: an FTS5 table keyed by rowid = item_id on SQLite, and a tsvector
+# document table with a GIN index on Postgres. item_search.py keeps it in sync.
+ITEM_SEARCH_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS item_search
+    USING fts5(item_name, description, tokenize = 'unicode61 remove_diacritics 2')
+    """,
+)
+ITEM_SEARCH_POSTGRES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS item_search (
+        item_id INTEGER PRIMARY KEY REFERENCES items (item_id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_item_search_document ON item_search USING GIN (document)",
+)
+
+for _statement in ITEM_SEARCH_SQLITE_DDL:
+    event.listen(ItemTable.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in ITEM_SEARCH_POSTGRES_DDL:
+    event.listen(ItemTable.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(ItemTable.__table__, "before_drop", DDL("DROP TABLE IF EXISTS item_search"))
+
+
+# Orders the kitchen still has to cook (production_plan.py). Queries must
+# repeat this predicate literally for the partial index below to apply.
+OPEN_ORDER_PREDICATE = "order_status IN ('pending', 'confirmed')"
+
+
 class OrderTable(Base):
     __tablename__ = "orders"
 
@@ -48,8 +110,8 @@ class OrderTable(Base):
     order_status: Mapped[str] = mapped_column(String(20), nullable=False)
     payment_status: Mapped[str] = mapped_column(String(20), nullable=False)
     payment_mode: Mapped[str] = mapped_column(String(20), nullable=False)
-    order_date: Mapped[str] = mapped_column(String(20), nullable=False)
-    delivery_date: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    order_date: Mapped[date] = mapped_column(Date, nullable=False)
+    delivery_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     address: Mapped[str] = mapped_column(Text, nullable=False)
     city: Mapped[str] = mapped_column(String(120), nullable=False)
 
@@ -69,6 +131,19 @@ class OrderTable(Base):
             "payment_mode IN ('cash','upi','card')",
             name="ck_orders_payment_mode",
         ),
+        Index("ix_orders_user_id_order_id", "user_id", "order_id"),
+        Index("ix_orders_order_status_order_id", "order_status", "order_id"),
+        # Date-filtered order pages walk (order_date, order_id) in index order.
+        Index("ix_orders_order_date_order_id", "order_date", "order_id"),
+        Index("ix_orders_order_status_order_date", "order_status", "order_date", "order_id"),
+        Index("ix_orders_delivery_date", "delivery_date"),
+        Index(
+            "ix_orders_open_delivery_date",
+            "delivery_date",
+            "order_id",
+            sqlite_where=text(OPEN_ORDER_PREDICATE),
+            postgresql_where=text(OPEN_ORDER_PREDICATE),
+        ),
     )
 
 
@@ -87,4 +162,45 @@ class OrderDetailTable(Base):
     __table_args__ = (
         CheckConstraint("quantity > 0", name="ck_order_details_quantity_positive"),
         CheckConstraint("price >= 0", name="ck_order_details_price_nonnegative"),
+        Index("ix_order_details_order_id", "order_id"),
+        Index("ix_order_details_item_id", "item_id"),
     )
+
+
+class ItemSalesStatsTable(Base):
+    __tablename__ = "item_sales_stats"
+
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.item_id", ondelete="CASCADE"), primary_key=True)
+    total_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+Index("ix_item_sales_stats_top", ItemSalesStatsTable.total_quantity.desc(), ItemSalesStatsTable.item_id)
+
+
+# Daily sales rollups (sales_rollups.py), maintained by order writers. The
+# primary keys lead with day, so date-range reads are index range scans.
+class DailySalesTable(Base):
+    __tablename__ = "daily_sales"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    items_sold: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailyItemSalesTable(Base):
+    __tablename__ = "daily_item_sales"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.item_id", ondelete="CASCADE"), primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailyCitySalesTable(Base):
+    __tablename__ = "daily_city_sales"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    city: Mapped[str] = mapped_column(String(120), primary_key=True)
+    orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
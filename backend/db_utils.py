@@ -1,7 +1,34 @@
+import base64
+import binascii
+import json
 from collections.abc import Sequence
-from typing import Any
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
 
+from fastapi import Response
+from sqlalchemy import text
 from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+
+from profiler import profile_phase
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used without it
+    orjson = None
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class RawJSONResponse(Response):
+    media_type = "application/json"
 
 
 def row_to_dict(row: RowMapping | None) -> dict[str, Any] | None:
@@ -12,3 +39,149 @@ def row_to_dict(row: RowMapping | None) -> dict[str, Any] | None:
 
 def rows_to_dicts(rows: Sequence[RowMapping]) -> list[dict[str, Any]]:
     return [dict(row) for row in rows]
+
+
+def normalize_page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+# A page key is one column, or a tuple of columns compared as a row value.
+PageKey = str | tuple[str, ...]
+CursorKey = int | list[int | str]
+
+
+def encode_cursor(last_key: CursorKey) -> str:
+    payload = json.dumps({"k": last_key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[CursorKey]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_key = payload["k"]
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeEncodeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+    if isinstance(last_key, list):
+        if not last_key or not all(isinstance(part, (int, str)) for part in last_key):
+            raise InvalidCursorError("Invalid cursor")
+    elif not isinstance(last_key, int):
+        raise InvalidCursorError("Invalid cursor")
+    return last_key
+
+
+def _cursor_key(row: dict[str, Any], key: PageKey) -> CursorKey:
+    if isinstance(key, str):
+        return row[key]
+    # Postgres returns DATE columns as date objects; the cursor carries them
+    # as ISO strings, which both databases compare against DATE columns.
+    return [value.isoformat() if isinstance(value, date) else value for value in (row[column] for column in key)]
+
+
+def build_page(rows: list[dict[str, Any]], key: PageKey, limit: int, total: Optional[int] = None) -> dict[str, Any]:
+    # Callers fetch limit + 1 rows; the extra row only signals that another page exists.
+    items = rows[:limit]
+    next_cursor = encode_cursor(_cursor_key(items[-1], key)) if len(rows) > limit and items else None
+    return {"items": items, "next_cursor": next_cursor, "limit": limit, "total": total}
+
+
+def fetch_one_dict(db: Session, query: str, params: Optional[dict] = None) -> dict[str, Any] | None:
+    row = db.execute(text(query), params or {}).mappings().first()
+    return row_to_dict(row)
+
+
+def fetch_all_dicts(db: Session, query: str, params: Optional[dict] = None) -> list[dict[str, Any]]:
+    # Plain tuples zipped with the column names once per result are much
+    # cheaper than building a RowMapping per row.
+    result = db.execute(text(query), params or {})
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result.all()]
+
+
+def _json_default(value: Any) -> Any:
+    # Postgres returns SUM and NUMERIC results as Decimal; they are sent as
+    # numbers, like the ints SQLite returns for the same queries. Anything
+    # else unexpected is a bug, not something to stringify.
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_json(payload: Any) -> bytes:
+    with profile_phase("serialize"):
+        if orjson is not None:
+            return orjson.dumps(payload, default=_json_default)
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def json_response(payload: Any) -> RawJSONResponse:
+    # Rows read from our own tables already match the response models, so
+    # returning a Response skips FastAPI's per-row pydantic validation and
+    # generic encoder. The route's response_model still documents the shape.
+    return RawJSONResponse(dumps_json(payload))
+
+
+def count_rows(db: Session, table: str, where: Optional[str] = None, params: Optional[dict] = None) -> int:
+    if where is None and db.get_bind().dialect.name == "postgresql":
+        # Planner statistics are good enough for an unfiltered total and avoid a full scan.
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+            {"table": table},
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    query = f"SELECT COUNT(*) FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    return db.execute(text(query), params or {}).scalar_one()
+
+
+def fetch_page(
+    db: Session,
+    table: str,
+    columns: str,
+    key: PageKey,
+    cursor: Optional[str],
+    limit: Optional[int],
+    where: Optional[str] = None,
+    params: Optional[dict] = None,
+    descending: bool = False,
+    include_total: bool = False,
+) -> dict[str, Any]:
+    page_size = normalize_page_size(limit)
+    after_key = decode_cursor(cursor)
+    query_params = dict(params or {})
+    conditions = [where] if where else []
+    comparison = "<" if descending else ">"
+    if after_key is not None:
+        if isinstance(key, str):
+            if not isinstance(after_key, int):
+                raise InvalidCursorError("Invalid cursor")
+            conditions.append(f"{key} {comparison} :after_key")
+            query_params["after_key"] = after_key
+        else:
+            if not isinstance(after_key, list) or len(after_key) != len(key):
+                raise InvalidCursorError("Invalid cursor")
+            # A row-value comparison keeps a composite key on one index range
+            # in both SQLite and Postgres.
+            placeholders = ", ".join(f":after_key_{index}" for index in range(len(key)))
+            conditions.append(f"({', '.join(key)}) {comparison} ({placeholders})")
+            query_params.update({f"after_key_{index}": part for index, part in enumerate(after_key)})
+
+    direction = "DESC" if descending else "ASC"
+    query = f"SELECT {columns} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    key_columns = (key,) if isinstance(key, str) else key
+    query += f" ORDER BY {', '.join(f'{column} {direction}' for column in key_columns)} LIMIT :page_limit"
+    query_params["page_limit"] = page_size + 1
+
+    rows = fetch_all_dicts(db, query, query_params)
+    total = count_rows(db, table, where, params) if include_total else None
+    return build_page(rows, key, page_size, total)
@@ -0,0 +1,113 @@
+import csv
+import io
+from collections.abc import Iterator
+from datetime import date
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal
+from db_utils import dumps_json
+from order_service import build_order_filters
+
+
+# Admin exports stream rows straight from a server-side cursor (a named
+# cursor on Postgres, an unbuffered cursor on SQLite) and encode one batch at
+# a time, so memory stays flat no matter how many rows match.
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORTS = {
+    "orders": {
+        "columns": [
+            "o.order_id",
+            "o.user_id",
+            "o.amount",
+            "o.order_status",
+            "o.payment_status",
+            "o.payment_mode",
+            "o.order_date",
+            "o.delivery_date",
+            "o.address",
+            "o.city",
+        ],
+        "from": "orders o",
+        "key": "o.order_id",
+        "filterable": True,
+    },
+    "order-details": {
+        "columns": [
+            "od.order_detail_id",
+            "od.order_id",
+            "od.item_id",
+            "i.item_name",
+            "od.quantity",
+            "od.price",
+            "o.order_date",
+            "o.order_status",
+        ],
+        "from": """
+            order_details od
+            JOIN orders o ON o.order_id = od.order_id
+            JOIN items i ON i.item_id = od.item_id
+        """,
+        "key": "od.order_detail_id",
+        "filterable": True,
+    },
+    "users": {
+        "columns": ["u.user_id", "u.name", "u.phone_number", "u.email", "u.role", "u.address", "u.city"],
+        "from": "users u",
+        "key": "u.user_id",
+        "filterable": False,
+    },
+}
+
+
+def export_column_names(export: str) -> list[str]:
+    return [column.split(".", 1)[1] for column in EXPORTS[export]["columns"]]
+
+
+def build_export_query(
+    export: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order_status: Optional[str] = None,
+) -> tuple[str, dict[str, Any]]:
+    spec = EXPORTS[export]
+    where, params = build_order_filters(date_from, date_to, order_status, alias="o") if spec["filterable"] else (None, {})
+
+    query = f"SELECT {', '.join(spec['columns'])} FROM {spec['from']}"
+    if where:
+        query += f" WHERE {where}"
+    query += f" ORDER BY {spec['key']} ASC"
+    return query, params
+
+
+def _encode_ndjson(columns: list[str], rows) -> bytes:
+    # Same encoder as the API responses, so a row exports as it is served.
+    return b"".join(dumps_json(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _encode_csv(columns: list[str], rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def stream_export(export: str, export_format: str, query: str, params: dict[str, Any]) -> Iterator[bytes]:
+    columns = export_column_names(export)
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    if export_format == "csv":
+        yield _encode_csv(columns, [columns])
+
+    # The generator owns its session: request-scoped dependencies are closed
+    # before a streaming body is sent.
+    with SessionLocal() as db:
+        result = db.execute(text(query).execution_options(yield_per=EXPORT_BATCH_SIZE), params)
+        for batch in result.partitions():
+            yield encode(columns, batch)
@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built without it
+    brotli = None
+
+
+# Serves frontend/ from the API process. The site is built once, in memory,
+# when the app starts: every asset except HTML is copied to a content-hashed
+# name (styles.3f9a1c2b7d.css) and HTML, CSS and JS references are rewritten
+# to those names, so hashed files can be cached for a year. HTML and the
+# original, unhashed names (item photos are picked at runtime) revalidate
+# with an ETag instead. Text files get gzip and, when the brotli package is
+# installed, brotli variants up front rather than per request.
+
+logger = logging.getLogger(__name__)
+
+MOUNT_PATH = "/app"
+HASH_LENGTH = 10
+TEXT_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+# Variants that save less than this fraction are not worth a separate representation.
+MIN_COMPRESSION_SAVING = 0.1
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+class Asset:
+    __slots__ = ("content_type", "cache_control", "variants")
+
+    def __init__(self, content_type: str, cache_control: str, body: bytes, digest: str, compress: bool):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        # encoding ("identity", "br", "gzip") -> (body, etag)
+        self.variants: dict[str, tuple[bytes, str]] = {"identity": (body, f'"{digest}"')}
+        if compress:
+            candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                candidates["br"] = brotli.compress(body, quality=11)
+            for encoding, compressed in candidates.items():
+                if len(compressed) <= len(body) * (1 - MIN_COMPRESSION_SAVING):
+                    self.variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+
+    def select(self, accept_encoding: str) -> tuple[str, bytes, str]:
+        accepted = {part.split(";", 1)[0].strip().lower() for part in accept_encoding.split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return (encoding, *self.variants[encoding])
+        return ("identity", *self.variants["identity"])
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+
+
+def _hashed_name(relative: str, digest: str) -> str:
+    path = Path(relative)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def _content_type(relative: str) -> str:
+    content_type = mimetypes.guess_type(relative)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+_REFERENCE_PATTERN = re.compile(r"""(?P<open>["'(])(?P<prefix>\./)?(?P<path>[\w./-]+?)(?P<close>["')])""")
+
+
+def _rewrite_references(text: str, hashed_names: dict[str, str]) -> str:
+    # Only whole quoted or url() references change, so "./assets/logo.png"
+    # is rewritten but the runtime template "./assets/items/${file}" is not.
+    def replace(match: re.Match) -> str:
+        relative = match.group("path")
+        hashed = hashed_names.get(relative)
+        return match.group(0) if hashed is None else f"{match.group('open')}{match.group('prefix') or ''}{hashed}{match.group('close')}"
+
+    return _REFERENCE_PATTERN.sub(replace, text)
+
+
+def build_site(source_dir: Path) -> dict[str, Asset]:
+    files = sorted(path for path in source_dir.rglob("*") if path.is_file() and not path.name.startswith("."))
+    sources = {path.relative_to(source_dir).as_posix(): path.read_bytes() for path in files}
+
+    # Binary assets first, then CSS and JS (which may point at them), then HTML.
+    def build_order(relative: str) -> int:
+        suffix = Path(relative).suffix.lower()
+        if suffix == ".html":
+            return 2
+        return 1 if suffix in TEXT_SUFFIXES else 0
+
+    hashed_names: dict[str, str] = {}
+    assets: dict[str, Asset] = {}
+    for relative in sorted(sources, key=lambda name: (build_order(name), name)):
+        body = sources[relative]
+        is_text = Path(relative).suffix.lower() in TEXT_SUFFIXES
+        if is_text:
+            body = _rewrite_references(body.decode("utf-8"), hashed_names).encode("utf-8")
+        digest = _digest(body)
+        content_type = _content_type(relative)
+        assets[relative] = Asset(content_type, REVALIDATE_CACHE_CONTROL, body, digest, is_text)
+        if build_order(relative) < 2:
+            hashed = _hashed_name(relative, digest)
+            hashed_names[relative] = hashed
+            assets[hashed] = Asset(content_type, IMMUTABLE_CACHE_CONTROL, body, digest, is_text)
+    return assets
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class FrontendSite:
+    # ASGI app for app.mount(MOUNT_PATH, ...). Builds on first use if the
+    # startup hook has not already done so.
+    def __init__(self, source_dir: Path):
+        self.source_dir = source_dir
+        self._assets: Optional[dict[str, Asset]] = None
+
+    def build(self) -> None:
+        self._assets = build_site(self.source_dir)
+        logger.info("Built frontend from %s: %d files", self.source_dir, len(self._assets))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if self._assets is None:
+            self.build()
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await _send(send, 405, [(b"allow", b"GET, HEAD")], b"Method Not Allowed")
+            return
+        # Mount leaves the full path in scope and the mount prefix in root_path.
+        path, root_path = scope["path"], scope.get("root_path", "")
+        relative = (path[len(root_path) :] if path.startswith(root_path) else path).lstrip("/")
+        asset = self._assets.get(relative or "index.html")
+        if asset is None:
+            await _send(send, 404, [(b"content-type", b"text/plain; charset=utf-8")], b"Not Found")
+            return
+
+        request_headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        encoding, body, etag = asset.select(request_headers.get("accept-encoding", ""))
+        headers = [
+            (b"cache-control", asset.cache_control.encode()),
+            (b"etag", etag.encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if _etag_matches(request_headers.get("if-none-match", ""), etag):
+            await _send(send, 304, headers, b"", content_length=None)
+            return
+
+        headers.append((b"content-type", asset.content_type.encode()))
+        if encoding != "identity":
+            headers.append((b"content-encoding", encoding.encode()))
+        await _send(send, 200, headers, b"" if scope["method"] == "HEAD" else body, content_length=len(body))
+
+
+async def _send(send, status_code: int, headers: list[tuple[bytes, bytes]], body: bytes, content_length: Optional[int] = -1) -> None:
+    # content_length=-1 sizes the header from body; None leaves it out (304).
+    if content_length is not None:
+        headers = [*headers, (b"content-length", str(len(body) if content_length < 0 else content_length).encode())]
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
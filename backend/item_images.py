@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.staticfiles import StaticFiles
+
+from settings import IMAGE_UPLOAD_MAX_BYTES, IMAGE_WORKERS, MEDIA_DIR, MEDIA_URL_PATH
+
+
+# Item photo uploads. The request body is streamed to a temporary file, then
+# a worker process decodes it once and writes WebP variants sized for the
+# catalog grid, the item card and the full view. Variant file names carry a
+# digest of the upload, so /media responses are cached as immutable.
+
+# variant -> maximum width in pixels; images are never upscaled
+VARIANT_WIDTHS = {"thumb": 160, "card": 480, "full": 1200}
+# The variant stored in items.photos for clients that only read that column.
+DEFAULT_VARIANT = "card"
+WEBP_QUALITY = 80
+# Larger images are rejected rather than decoded (decompression bombs).
+MAX_IMAGE_PIXELS = 40_000_000
+
+ACCEPTED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+ITEM_MEDIA_SUBDIR = "items"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImageUploadError(ValueError):
+    pass
+
+
+class UploadTooLargeError(ImageUploadError):
+    pass
+
+
+class MediaFiles(StaticFiles):
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+def media_url(path: str) -> str:
+    return f"{MEDIA_URL_PATH}/{path}"
+
+
+def present_item(item: dict[str, Any]) -> dict[str, Any]:
+    # Turns the stored photo_variants JSON into URLs plus a srcset string.
+    stored = item.get("photo_variants")
+    variants = json.loads(stored) if isinstance(stored, str) and stored else None
+    if not variants:
+        item["photo_variants"] = None
+        item["photo_srcset"] = None
+        return item
+    item["photo_variants"] = {
+        name: {"url": media_url(variant["path"]), "width": variant["width"], "height": variant["height"]}
+        for name, variant in variants.items()
+    }
+    by_width = sorted(item["photo_variants"].values(), key=lambda variant: variant["width"])
+    item["photo_srcset"] = ", ".join(f"{variant['url']} {variant['width']}w" for variant in by_width)
+    return item
+
+
+async def receive_upload(chunks: AsyncIterator[bytes], max_bytes: int = IMAGE_UPLOAD_MAX_BYTES) -> Path:
+    # Writes the body as it arrives, so memory use is one chunk regardless of
+    # the upload size. The caller deletes the returned file.
+    upload_dir = Path(MEDIA_DIR) / "tmp"
+    await run_in_threadpool(upload_dir.mkdir, parents=True, exist_ok=True)
+    handle = await run_in_threadpool(tempfile.NamedTemporaryFile, dir=upload_dir, suffix=".upload", delete=False)
+    path = Path(handle.name)
+    received = 0
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadTooLargeError(f"Image uploads are limited to {max_bytes // (1024 * 1024)} MB")
+            await run_in_threadpool(handle.write, chunk)
+    except BaseException:
+        handle.close()
+        path.unlink(missing_ok=True)
+        raise
+    await run_in_threadpool(handle.close)
+    if received == 0:
+        path.unlink(missing_ok=True)
+        raise ImageUploadError("The upload is empty")
+    return path
+
+
+def render_variants(source_path: str, output_dir: str, name_prefix: str) -> dict[str, dict[str, Any]]:
+    # Runs in a worker process; Pillow is imported here so the API process
+    # never loads it.
+    import warnings
+
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    with open(source_path, "rb") as source:
+        digest = hashlib.sha256(source.read()).hexdigest()[:12]
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            with Image.open(source_path) as opened:
+                image = ImageOps.exif_transpose(opened)
+                image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, Image.DecompressionBombWarning, OSError) as exc:
+        raise ImageUploadError(f"Not a supported image: {exc}") from None
+
+    image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    os.makedirs(output_dir, exist_ok=True)
+    variants = {}
+    for name, max_width in VARIANT_WIDTHS.items():
+        resized = image.copy()
+        if resized.width > max_width:
+            resized.thumbnail((max_width, resized.height), Image.LANCZOS)
+        filename = f"{name_prefix}-{name}-{digest}.webp"
+        resized.save(os.path.join(output_dir, filename), "WEBP", quality=WEBP_QUALITY, method=6)
+        variants[name] = {
+            "path": f"{ITEM_MEDIA_SUBDIR}/{filename}",
+            "width": resized.width,
+            "height": resized.height,
+        }
+    return variants
+
+
+# Decoding and resizing are CPU bound and hold the GIL, so they run in
+# processes. "spawn" keeps workers from inheriting the server's threads and
+# open connections.
+_image_executor: Optional[ProcessPoolExecutor] = None
+_image_executor_lock = threading.Lock()
+
+
+def _get_image_executor() -> ProcessPoolExecutor:
+    global _image_executor
+    with _image_executor_lock:
+        if _image_executor is None:
+            _image_executor = ProcessPoolExecutor(
+                max_workers=max(1, IMAGE_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _image_executor
+
+
+async def render_item_photo(source: Path, item_id: int) -> dict[str, dict[str, Any]]:
+    future = _get_image_executor().submit(
+        render_variants,
+        str(source),
+        str(Path(MEDIA_DIR) / ITEM_MEDIA_SUBDIR),
+        f"item-{item_id}",
+    )
+    return await asyncio.wrap_future(future)
+
+
+def remove_variant_files(stored: Optional[str], keep: Optional[dict[str, dict[str, Any]]] = None) -> None:
+    # Best effort: a leftover file only costs disk space.
+    if not stored:
+        return
+    kept_paths = {variant["path"] for variant in (keep or {}).values()}
+    for variant in json.loads(stored).values():
+        if variant["path"] not in kept_paths:
+            (Path(MEDIA_DIR) / variant["path"]).unlink(missing_ok=True)
+
+
+def shutdown_image_executor() -> None:
+    with _image_executor_lock:
+        if _image_executor is not None:
+            _image_executor.shutdown(wait=False, cancel_futures=True)
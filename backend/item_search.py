@@ -0,0 +1,211 @@
+import bisect
+import re
+import threading
+from difflib import SequenceMatcher
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from catalog import catalog_cache
+from database import IS_SQLITE, SessionLocal
+from db_models import ITEM_SEARCH_POSTGRES_DDL, ITEM_SEARCH_SQLITE_DDL
+from db_utils import fetch_all_dicts
+from item_images import present_item
+
+
+# Full-text item search. Item writers call sync_item_search() inside their
+# transaction; queries match every term as a prefix, swap unknown terms for
+# close catalog words, and rank by text relevance boosted by sales.
+
+MAX_QUERY_TERMS = 8
+MIN_TYPO_TERM_LENGTH = 3
+TYPO_SIMILARITY_CUTOFF = 0.8
+MAX_TYPO_ALTERNATIVES = 3
+
+# score = relevance * (1 + SALES_BOOST * quantity / (quantity + SALES_BOOST_HALF_QUANTITY)),
+# so best sellers get at most SALES_BOOST extra weight and text match still dominates.
+SALES_BOOST = 0.5
+SALES_BOOST_HALF_QUANTITY = 50.0
+
+TERM_PATTERN = re.compile(r"[^\W_]+")
+
+if IS_SQLITE:
+    INDEX_ITEMS_SQL = """
+        INSERT INTO item_search (rowid, item_name, description)
+        SELECT item_id, item_name, COALESCE(description, '')
+        FROM items
+        {where}
+    """
+    SEARCH_SQL = """
+        SELECT i.*
+        FROM item_search
+        JOIN items i ON i.item_id = item_search.rowid
+        LEFT JOIN item_sales_stats s ON s.item_id = i.item_id
+        WHERE item_search MATCH :query
+        ORDER BY
+            -bm25(item_search, 4.0, 1.0)
+            * (1 + :sales_boost * COALESCE(s.total_quantity, 0)
+                / (COALESCE(s.total_quantity, 0) + :half_quantity)) DESC,
+            i.item_id ASC
+        LIMIT :limit
+    """
+    SEARCH_DDL = ITEM_SEARCH_SQLITE_DDL
+else:
+    INDEX_ITEMS_SQL = """
+        INSERT INTO item_search (item_id, document)
+        SELECT
+            item_id,
+            setweight(to_tsvector('simple', item_name), 'A')
+            || setweight(to_tsvector('simple', COALESCE(description, '')), 'B')
+        FROM items
+        {where}
+    """
+    SEARCH_SQL = """
+        SELECT i.*
+        FROM item_search d
+        JOIN items i ON i.item_id = d.item_id
+        LEFT JOIN item_sales_stats s ON s.item_id = i.item_id
+        WHERE d.document @@ to_tsquery('simple', :query)
+        ORDER BY
+            ts_rank_cd(d.document, to_tsquery('simple', :query))
+            * (1 + :sales_boost * COALESCE(s.total_quantity, 0)
+                / (COALESCE(s.total_quantity, 0) + :half_quantity)) DESC,
+            i.item_id ASC
+        LIMIT :limit
+    """
+    SEARCH_DDL = ITEM_SEARCH_POSTGRES_DDL
+
+
+def sync_item_search(db: Session, item_id: int) -> None:
+    # Re-reads the item row, so it covers inserts, updates and deletes alike.
+    key = "rowid" if IS_SQLITE else "item_id"
+    db.execute(text(f"DELETE FROM item_search WHERE {key} = :item_id"), {"item_id": item_id})
+    db.execute(text(INDEX_ITEMS_SQL.format(where="WHERE item_id = :item_id")), {"item_id": item_id})
+
+
+def rebuild_item_search(db: Session) -> int:
+    for statement in SEARCH_DDL:
+        db.execute(text(statement))
+    db.execute(text("DELETE FROM item_search"))
+    result = db.execute(text(INDEX_ITEMS_SQL.format(where="")))
+    if IS_SQLITE:
+        db.execute(text("INSERT INTO item_search (item_search) VALUES ('optimize')"))
+    return result.rowcount
+
+
+class _Vocabulary:
+    # Distinct words in item names and descriptions, rebuilt whenever the
+    # catalog cache hands out a new snapshot.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source: Optional[list[dict]] = None
+        self._terms: list[str] = []
+        self._terms_by_initial: dict[str, list[str]] = {}
+
+    def get(self, db: Session) -> tuple[list[str], dict[str, list[str]]]:
+        items, _ = catalog_cache.get(db)
+        with self._lock:
+            if items is not self._source:
+                terms = set()
+                for item in items:
+                    terms.update(split_terms(f"{item['item_name']} {item.get('description') or ''}"))
+                ordered = sorted(terms)
+                by_initial: dict[str, list[str]] = {}
+                for term in ordered:
+                    by_initial.setdefault(term[0], []).append(term)
+                self._source, self._terms, self._terms_by_initial = items, ordered, by_initial
+            return self._terms, self._terms_by_initial
+
+
+_vocabulary = _Vocabulary()
+
+
+def split_terms(value: str) -> list[str]:
+    return TERM_PATTERN.findall(value.casefold())
+
+
+def _has_prefix(terms: list[str], prefix: str) -> bool:
+    index = bisect.bisect_left(terms, prefix)
+    return index < len(terms) and terms[index].startswith(prefix)
+
+
+def _close_terms(term: str, candidates: list[str]) -> list[str]:
+    # Compare against candidates cut to roughly the typed length so a
+    # misspelt partial word still finds its completion.
+    # SequenceMatcher caches its analysis of the second sequence, so the typed
+    # term stays fixed there and the cheap upper bounds run before ratio().
+    matcher = SequenceMatcher(None, "", term)
+    scored = []
+    for candidate in candidates:
+        matcher.set_seq1(candidate[: len(term) + 1])
+        if matcher.real_quick_ratio() < TYPO_SIMILARITY_CUTOFF or matcher.quick_ratio() < TYPO_SIMILARITY_CUTOFF:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= TYPO_SIMILARITY_CUTOFF:
+            scored.append((-ratio, candidate))
+    return [candidate for _, candidate in sorted(scored)[:MAX_TYPO_ALTERNATIVES]]
+
+
+def build_match_groups(db: Session, query: str) -> list[tuple[str, list[str]]]:
+    # (term, alternatives) pairs; no alternatives means the term is matched as a prefix.
+    terms, terms_by_initial = _vocabulary.get(db)
+    groups = []
+    for term in dict.fromkeys(split_terms(query)[:MAX_QUERY_TERMS]):
+        if len(term) < MIN_TYPO_TERM_LENGTH or _has_prefix(terms, term):
+            groups.append((term, []))
+            continue
+        alternatives = _close_terms(term, terms_by_initial.get(term[0], []))
+        if not alternatives:
+            # No catalog word is close, so nothing can match every term.
+            return []
+        groups.append((term, alternatives))
+    return groups
+
+
+def _format_sqlite_query(groups: list[tuple[str, list[str]]]) -> str:
+    parts = []
+    for term, alternatives in groups:
+        if alternatives:
+            parts.append("(" + " OR ".join(f'"{word}"*' for word in alternatives) + ")")
+        else:
+            parts.append(f'"{term}"*')
+    return " AND ".join(parts)
+
+
+def _format_postgres_query(groups: list[tuple[str, list[str]]]) -> str:
+    parts = []
+    for term, alternatives in groups:
+        if alternatives:
+            parts.append("(" + " | ".join(f"'{word}':*" for word in alternatives) + ")")
+        else:
+            parts.append(f"'{term}':*")
+    return " & ".join(parts)
+
+
+def search_items(db: Session, query: str, limit: int) -> list[dict[str, Any]]:
+    groups = build_match_groups(db, query)
+    if not groups:
+        return []
+    match = _format_sqlite_query(groups) if IS_SQLITE else _format_postgres_query(groups)
+    rows = fetch_all_dicts(
+        db,
+        SEARCH_SQL,
+        {
+            "query": match,
+            "sales_boost": SALES_BOOST,
+            "half_quantity": SALES_BOOST_HALF_QUANTITY,
+            "limit": limit,
+        },
+    )
+    return [present_item(row) for row in rows]
+
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        rebuilt = rebuild_item_search(session)
+        session.commit()
+    finally:
+        session.close()
+    print(f"Rebuilt item_search for {rebuilt} items")
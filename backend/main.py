@@ -1,13 +1,18 @@
+import json
 import logging
-from datetime import date, datetime, timedelta
+import os
+import secrets
+from datetime import date, timedelta
+from pathlib import Path
 from typing import Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import text
+from sqlalchemy import Date, bindparam, text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -16,27 +21,116 @@ from auth import (
     clear_auth_cookie,
     create_access_token,
     get_admin_user,
+    get_auth_cache_stats,
     get_current_user,
-    hash_password,
+    get_password_hash_stats,
+    hash_password_async,
+    invalidate_principal,
     password_needs_rehash,
+    rehash_password_in_background,
     set_auth_cookie,
-    verify_password,
+    shutdown_password_executor,
+    verify_password_async,
 )
-from database import get_db, init_db
-from db_utils import row_to_dict, rows_to_dicts
+from async_routes import router as async_read_router
+from catalog import build_catalog_page, catalog_cache, get_top_ordered_catalog_items
+from database import async_engine, get_db, get_pool_stats, init_db, order_writer
+from db_utils import (
+    InvalidCursorError,
+    RawJSONResponse,
+    count_rows,
+    fetch_all_dicts,
+    fetch_one_dict,
+    fetch_page,
+    json_response,
+    normalize_page_size,
+)
+from exports import EXPORT_FORMATS, EXPORTS, build_export_query, stream_export
+from frontend_site import MOUNT_PATH as FRONTEND_MOUNT_PATH, FrontendSite
+from item_images import (
+    ACCEPTED_CONTENT_TYPES,
+    DEFAULT_VARIANT,
+    PILLOW_AVAILABLE,
+    ImageUploadError,
+    MediaFiles,
+    UploadTooLargeError,
+    media_url,
+    present_item,
+    receive_upload,
+    remove_variant_files,
+    render_item_photo,
+    shutdown_image_executor,
+)
+from item_search import search_items as search_catalog_items, sync_item_search
+from metrics import MetricsMiddleware, render_metrics
 from models import (
+    AdminSummary,
+    CitySalesReport,
     CreateOrder,
+    DailySalesReport,
+    ItemPage,
     ItemResponse,
+    ItemSalesReport,
     Items,
+    OrderDetailPage,
     OrderDetailResponse,
     OrderDetails,
+    OrderPage,
     OrderResponse,
     Orders,
+    ProductionPlan,
+    UserPage,
     UserProfileUpdate,
     UserResponse,
     Users,
 )
-from settings import ALLOWED_ORIGINS, CORS_ALLOW_ORIGIN_REGEX, DEBUG, IS_PRODUCTION
+from order_service import (
+    InvalidIncludeError,
+    InvalidOrderFilterError,
+    OrderCreationError,
+    UnknownItemsError,
+    attach_order_lines,
+    create_order_with_items,
+    fetch_order_lines,
+    fetch_order_page,
+    parse_order_includes,
+)
+from order_transitions import (
+    OrderConflictError,
+    OrderNotFoundError,
+    OrderOwnershipError,
+    OrderTransitionError,
+    lock_order,
+    lock_order_detail,
+    transition_order,
+)
+from production_plan import InvalidProductionPlanRangeError, fetch_production_plan, production_plan_range
+from profiler import PROFILER_AVAILABLE, SQLProfilerMiddleware
+from sales_rollups import (
+    InvalidAnalyticsRangeError,
+    analytics_range,
+    apply_line_rollups,
+    apply_order_rollups,
+    fetch_city_sales,
+    fetch_daily_sales,
+    fetch_item_sales,
+    fetch_rollup_lines,
+)
+from sales_stats import apply_item_sales_deltas, order_line_deltas
+from settings import (
+    ALLOWED_ORIGINS,
+    ASYNC_DB_ENABLED,
+    CORS_ALLOW_ORIGIN_REGEX,
+    DEBUG,
+    FRONTEND_DIR,
+    FRONTEND_ENABLED,
+    IS_PRODUCTION,
+    MEDIA_DIR,
+    MEDIA_URL_PATH,
+    METRICS_ENABLED,
+    METRICS_TOKEN,
+)
+from user_search import search_users as search_user_records, sync_user_search
 
 
 app = FastAPI()
@@ -51,6 +145,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if PROFILER_AVAILABLE:
+    app.add_middleware(SQLProfilerMiddleware)
 
 
 @app.exception_handler(RequestValidationError)
@@ -61,6 +159,36 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+if ASYNC_DB_ENABLED:
+    # Registered before the sync handlers below, so these read routes match first.
+    app.include_router(async_read_router)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_exception_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": "Invalid cursor"})
+
+
+@app.exception_handler(InvalidIncludeError)
+async def invalid_include_exception_handler(request: Request, exc: InvalidIncludeError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidOrderFilterError)
+async def invalid_order_filter_exception_handler(request: Request, exc: InvalidOrderFilterError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidAnalyticsRangeError)
+async def invalid_analytics_range_exception_handler(request: Request, exc: InvalidAnalyticsRangeError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidProductionPlanRangeError)
+async def invalid_production_plan_range_exception_handler(request: Request, exc: InvalidProductionPlanRangeError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
 @app.exception_handler(SQLAlchemyError)
 async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     logger.exception("Database error on %s %s", request.method, request.url.path, exc_info=exc)
@@ -79,10 +207,30 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+frontend_site = FrontendSite(Path(FRONTEND_DIR).resolve()) if FRONTEND_ENABLED and os.path.isdir(FRONTEND_DIR) else None
+if frontend_site is not None:
+    # Pages served from the API's own origin need no CORS for their fetch calls.
+    app.mount(FRONTEND_MOUNT_PATH, frontend_site)
+app.mount(MEDIA_URL_PATH, MediaFiles(directory=MEDIA_DIR, check_dir=False))
+
+
 @app.on_event("startup")
 def startup():
     logging.basicConfig(level=logging.DEBUG if DEBUG else logging.INFO)
     init_db()
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    if frontend_site is not None:
+        frontend_site.build()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_password_executor()
+    shutdown_image_executor()
+    if order_writer is not None:
+        await run_in_threadpool(order_writer.close)
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 @app.get("/health")
@@ -90,39 +238,38 @@ def health_check():
     return {"status": "ok", "environment": "production" if IS_PRODUCTION else "development"}
 
 
-def fetch_one_dict(db: Session, query: str, params: Optional[dict] = None):
-    row = db.execute(text(query), params or {}).mappings().first()
-    return row_to_dict(row)
-
-
-def fetch_all_dicts(db: Session, query: str, params: Optional[dict] = None):
-    rows = db.execute(text(query), params or {}).mappings().all()
-    return rows_to_dicts(rows)
-
-
-def get_item_prices(db: Session, item_ids: list[int]) -> dict[int, int]:
-    if not item_ids:
-        return {}
-
-    placeholders = ", ".join(f":item_id_{index}" for index in range(len(item_ids)))
-    params = {f"item_id_{index}": item_id for index, item_id in enumerate(item_ids)}
-    rows = fetch_all_dicts(
-        db,
-        f"SELECT item_id, price FROM items WHERE item_id IN ({placeholders})",
-        params,
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(request: Request):
+    # Production only serves metrics to holders of METRICS_TOKEN: they name
+    # routes and expose traffic, pool and hashing figures.
+    if not METRICS_ENABLED or (IS_PRODUCTION and not METRICS_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Scrapers cannot log in, so /metrics takes a static bearer token instead
+    # of the session cookie when METRICS_TOKEN is set.
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not secrets.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(
+        render_metrics(get_pool_stats(), get_password_hash_stats()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
     )
-    return {row["item_id"]: row["price"] for row in rows}
 
 
 @app.post("/users/", status_code=201)
-def add_user(user: Users, admin: dict = Depends(get_admin_user), db: Session = Depends(get_db)):
+async def add_user(user: Users, admin: dict = Depends(get_admin_user), db: Session = Depends(get_db)):
+    hashed_password = await hash_password_async(user.password)
+    return await run_in_threadpool(insert_new_user, db, user, hashed_password)
+
+
+def insert_new_user(db: Session, user: Users, hashed_password: str):
     try:
-        hashed_password = hash_password(user.password)
         result = db.execute(
             text(
                 """
                 INSERT INTO users (name, phone_number, email, password, role, address, city)
                 VALUES (:name, :phone_number, :email, :password, :role, :address, :city)
+                RETURNING user_id
                 """
             ),
             {
@@ -135,8 +282,9 @@ def add_user(user: Users, admin: dict = Depends(get_admin_user), db: Session = D
                 "city": user.city,
             },
         )
+        user_id = result.scalar_one()
+        sync_user_search(db, user_id)
         db.commit()
-        user_id = result.lastrowid
         return {
             "message": "User created successfully",
             "user_id": user_id,
@@ -154,25 +302,38 @@ def add_user(user: Users, admin: dict = Depends(get_admin_user), db: Session = D
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(exc)}")
 
 
-@app.get("/users", response_model=list[UserResponse])
-def get_users(db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    return fetch_all_dicts(
+@app.get("/users", response_model=UserPage)
+def get_users(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    page = fetch_page(
         db,
-        """
-        SELECT user_id, name, phone_number, email, role, address, city
-        FROM users
-        """,
+        "users",
+        "user_id, name, phone_number, email, role, address, city",
+        "user_id",
+        cursor,
+        limit,
+        include_total=include_total,
     )
+    return json_response(page)
 
 
 @app.put("/users/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user: Users, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
+async def update_user(user_id: int, user: Users, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
+    hashed_password = await hash_password_async(user.password)
+    return await run_in_threadpool(apply_user_update, db, user_id, user, hashed_password)
+
+
+def apply_user_update(db: Session, user_id: int, user: Users, hashed_password: str):
     try:
         existing = fetch_one_dict(db, "SELECT 1 AS present FROM users WHERE user_id = :user_id", {"user_id": user_id})
         if not existing:
             raise HTTPException(status_code=404, detail="User not found")
 
-        hashed_password = hash_password(user.password)
         db.execute(
             text(
                 """
@@ -198,7 +359,9 @@ def update_user(user_id: int, user: Users, db: Session = Depends(get_db), admin:
                 "user_id": user_id,
             },
         )
+        sync_user_search(db, user_id)
         db.commit()
+        invalidate_principal(user_id)
         updated = fetch_one_dict(
             db,
             """
@@ -226,7 +389,9 @@ def delete_user(user_id: int, db: Session = Depends(get_db), admin: dict = Depen
         raise HTTPException(status_code=404, detail="User not found")
 
     db.execute(text("DELETE FROM users WHERE user_id = :user_id"), {"user_id": user_id})
+    sync_user_search(db, user_id)
     db.commit()
+    invalidate_principal(user_id)
     return {"message": "User deleted successfully"}
 
 
@@ -253,6 +418,7 @@ def add_item(item: Items, db: Session = Depends(get_db), admin: dict = Depends(g
             """
             INSERT INTO items (item_name, price, weight, photos, videos, description)
             VALUES (:item_name, :price, :weight, :photos, :videos, :description)
+            RETURNING item_id
             """
         ),
         {
@@ -264,38 +430,38 @@ def add_item(item: Items, db: Session = Depends(get_db), admin: dict = Depends(g
             "description": item.description,
         },
     )
+    item_id = result.scalar_one()
+    sync_item_search(db, item_id)
     db.commit()
-    return {"message": "Item created successfully", "item_id": result.lastrowid}
+    catalog_cache.invalidate()
+    return {"message": "Item created successfully", "item_id": item_id}
 
 
 @app.get("/items", response_model=list[ItemResponse])
 def get_items(db: Session = Depends(get_db)):
-    return fetch_all_dicts(db, "SELECT * FROM items")
+    return RawJSONResponse(catalog_cache.get_json(db))
 
 
 @app.get("/items/top-ordered", response_model=list[ItemResponse])
 def get_top_ordered_items(limit: int = 3, db: Session = Depends(get_db)):
-    safe_limit = max(1, min(limit, 20))
-    return fetch_all_dicts(
-        db,
-        """
-        SELECT i.*
-        FROM items i
-        LEFT JOIN (
-            SELECT item_id, SUM(quantity) AS ordered_qty
-            FROM order_details
-            GROUP BY item_id
-        ) stats ON stats.item_id = i.item_id
-        ORDER BY COALESCE(stats.ordered_qty, 0) DESC, i.item_id ASC
-        LIMIT :limit
-        """,
-        {"limit": safe_limit},
-    )
+    return get_top_ordered_catalog_items(db, limit)
+
+
+@app.get("/items/paginated", response_model=ItemPage)
+def get_items_paginated(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db),
+):
+    all_items, _ = catalog_cache.get(db)
+    return json_response(build_catalog_page(all_items, cursor, limit, include_total))
 
 
 @app.get("/items/{item_id}", response_model=ItemResponse)
 def get_item(item_id: int, db: Session = Depends(get_db)):
-    item = fetch_one_dict(db, "SELECT * FROM items WHERE item_id = :item_id", {"item_id": item_id})
+    _, items_by_id = catalog_cache.get(db)
+    item = items_by_id.get(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
@@ -303,13 +469,18 @@ def get_item(item_id: int, db: Session = Depends(get_db)):
 
 @app.put("/items/{item_id}", response_model=ItemResponse)
 def update_item(item_id: int, item: Items, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    existing = fetch_one_dict(db, "SELECT 1 AS present FROM items WHERE item_id = :item_id", {"item_id": item_id})
+    existing = fetch_one_dict(
+        db, "SELECT photos, photo_variants FROM items WHERE item_id = :item_id", {"item_id": item_id}
+    )
     if not existing:
         raise HTTPException(status_code=404, detail="Item not found")
 
+    # Uploaded variants belong to the uploaded photo; pointing photos
+    # elsewhere drops them.
+    photo_changed = item.photos != existing["photos"]
     db.execute(
         text(
-            """
+            f"""
             UPDATE items
             SET item_name = :item_name,
                 price = :price,
@@ -317,6 +488,7 @@ def update_item(item_id: int, item: Items, db: Session = Depends(get_db), admin:
                 photos = :photos,
                 videos = :videos,
                 description = :description
+                {", photo_variants = NULL" if photo_changed else ""}
             WHERE item_id = :item_id
             """
         ),
@@ -330,18 +502,80 @@ def update_item(item_id: int, item: Items, db: Session = Depends(get_db), admin:
             "item_id": item_id,
         },
     )
+    sync_item_search(db, item_id)
     db.commit()
-    return fetch_one_dict(db, "SELECT * FROM items WHERE item_id = :item_id", {"item_id": item_id})
+    catalog_cache.invalidate()
+    if photo_changed:
+        remove_variant_files(existing["photo_variants"])
+    return present_item(fetch_one_dict(db, "SELECT * FROM items WHERE item_id = :item_id", {"item_id": item_id}))
+
+
+@app.put("/items/{item_id}/photo", response_model=ItemResponse)
+async def upload_item_photo(
+    item_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    # The body is the raw image (Content-Type image/jpeg, png, webp or gif).
+    # It is streamed to disk, so no multipart parsing or in-memory copy.
+    if not PILLOW_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Image processing is not available on this server")
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type not in ACCEPTED_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail=f"Upload one of: {', '.join(sorted(ACCEPTED_CONTENT_TYPES))}")
+    existing = await run_in_threadpool(
+        fetch_one_dict, db, "SELECT photo_variants FROM items WHERE item_id = :item_id", {"item_id": item_id}
+    )
+    if not existing:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    try:
+        upload = await receive_upload(request.stream())
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ImageUploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        variants = await render_item_photo(upload, item_id)
+    except ImageUploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        upload.unlink(missing_ok=True)
+
+    def store_variants() -> dict:
+        db.execute(
+            text("UPDATE items SET photos = :photos, photo_variants = :photo_variants WHERE item_id = :item_id"),
+            {
+                "photos": media_url(variants[DEFAULT_VARIANT]["path"]),
+                "photo_variants": json.dumps(variants),
+                "item_id": item_id,
+            },
+        )
+        db.commit()
+        catalog_cache.invalidate()
+        return fetch_one_dict(db, "SELECT * FROM items WHERE item_id = :item_id", {"item_id": item_id})
+
+    updated = await run_in_threadpool(store_variants)
+    if updated is None:
+        # Deleted while the image was processed.
+        remove_variant_files(json.dumps(variants))
+        raise HTTPException(status_code=404, detail="Item not found")
+    remove_variant_files(existing["photo_variants"], keep=variants)
+    return present_item(updated)
 
 
 @app.delete("/items/{item_id}")
 def delete_item(item_id: int, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    existing = fetch_one_dict(db, "SELECT 1 AS present FROM items WHERE item_id = :item_id", {"item_id": item_id})
+    existing = fetch_one_dict(db, "SELECT photo_variants FROM items WHERE item_id = :item_id", {"item_id": item_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Item not found")
 
     db.execute(text("DELETE FROM items WHERE item_id = :item_id"), {"item_id": item_id})
+    sync_item_search(db, item_id)
     db.commit()
+    catalog_cache.invalidate()
+    remove_variant_files(existing["photo_variants"])
     return {"message": "Item deleted successfully"}
 
 
@@ -359,8 +593,9 @@ def add_order(order: Orders, db: Session = Depends(get_db), admin: dict = Depend
                     :user_id, :amount, :order_status, :payment_status, :payment_mode,
                     :order_date, :delivery_date, :address, :city
                 )
+                RETURNING order_id
                 """
-            ),
+            ).bindparams(bindparam("order_date", type_=Date()), bindparam("delivery_date", type_=Date())),
             {
                 "user_id": order.user_id,
                 "amount": order.amount,
@@ -373,16 +608,37 @@ def add_order(order: Orders, db: Session = Depends(get_db), admin: dict = Depend
                 "city": order.city,
             },
         )
+        order_id = result.scalar_one()
+        if order.order_status != "cancelled":
+            apply_order_rollups(
+                db,
+                {"order_date": order.order_date, "city": order.city, "amount": order.amount},
+                [],
+            )
         db.commit()
-        return {"message": "Order created successfully", "order_id": result.lastrowid}
+        return {"message": "Order created successfully", "order_id": order_id}
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="User not found")
 
 
-@app.get("/orders", response_model=list[OrderResponse])
-def get_orders(db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    return fetch_all_dicts(db, "SELECT * FROM orders")
+@app.get("/orders", response_model=OrderPage)
+def get_orders(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    include: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    includes = parse_order_includes(include)
+    page = fetch_order_page(db, cursor, limit, include_total, date_from, date_to, order_status)
+    if "items" in includes:
+        attach_order_lines(db, page["items"])
+    return json_response(page)
 
 
 @app.get("/orders/{order_id}", response_model=OrderResponse)
@@ -397,158 +653,118 @@ def get_order(order_id: int, db: Session = Depends(get_db), current_user: dict =
 
 @app.put("/orders/{order_id}", response_model=OrderResponse)
 def update_order(order_id: int, order: Orders, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    existing = fetch_one_dict(db, "SELECT 1 AS present FROM orders WHERE order_id = :order_id", {"order_id": order_id})
-    if not existing:
+    try:
+        updated = transition_order(
+            db,
+            order_id,
+            order.order_status,
+            changes={
+                "user_id": order.user_id,
+                "amount": order.amount,
+                "payment_status": order.payment_status,
+                "payment_mode": order.payment_mode,
+                "order_date": order.order_date,
+                "delivery_date": order.delivery_date,
+                "address": order.address,
+                "city": order.city,
+            },
+            allow_unchanged=True,
+        )
+        db.commit()
+    except OrderNotFoundError:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Order not found")
-
-    db.execute(
-        text(
-            """
-            UPDATE orders
-            SET user_id = :user_id,
-                amount = :amount,
-                order_status = :order_status,
-                payment_status = :payment_status,
-                payment_mode = :payment_mode,
-                order_date = :order_date,
-                delivery_date = :delivery_date,
-                address = :address,
-                city = :city
-            WHERE order_id = :order_id
-            """
-        ),
-        {
-            "user_id": order.user_id,
-            "amount": order.amount,
-            "order_status": order.order_status,
-            "payment_status": order.payment_status,
-            "payment_mode": order.payment_mode,
-            "order_date": order.order_date,
-            "delivery_date": order.delivery_date,
-            "address": order.address,
-            "city": order.city,
-            "order_id": order_id,
-        },
-    )
-    db.commit()
-    return fetch_one_dict(db, "SELECT * FROM orders WHERE order_id = :order_id", {"order_id": order_id})
+    except OrderConflictError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    except OrderTransitionError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+    return updated
 
 
 @app.post("/orders/{order_id}/cancel")
 def cancel_order(order_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    order = fetch_one_dict(db, "SELECT * FROM orders WHERE order_id = :order_id", {"order_id": order_id})
-    if not order:
+    try:
+        updated = transition_order(
+            db,
+            order_id,
+            "cancelled",
+            user_id=current_user["user_id"],
+            within_cancellation_window=True,
+        )
+        db.commit()
+    except OrderNotFoundError:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Order not found")
-    if order["user_id"] != current_user["user_id"]:
+    except OrderOwnershipError:
+        db.rollback()
         raise HTTPException(status_code=403, detail="You can cancel only your own orders")
-    if order["order_status"] in ("delivered", "cancelled"):
-        raise HTTPException(status_code=400, detail=f"Order already {order['order_status']}")
-
-    try:
-        order_date = datetime.strptime(order["order_date"], "%Y-%m-%d").date()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid order_date format on order")
-
-    today = date.today()
-    if today > (order_date + timedelta(days=1)):
-        raise HTTPException(status_code=400, detail="Cancellation window expired (allowed within 1 day of order date)")
-
-    db.execute(
-        text("UPDATE orders SET order_status = :order_status WHERE order_id = :order_id"),
-        {"order_status": "cancelled", "order_id": order_id},
-    )
-    db.commit()
-    updated = fetch_one_dict(db, "SELECT * FROM orders WHERE order_id = :order_id", {"order_id": order_id})
+    except OrderConflictError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    except OrderTransitionError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
     return {"message": "Order cancelled successfully", "order": updated}
 
 
 @app.delete("/orders/{order_id}")
 def delete_order(order_id: int, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    existing = fetch_one_dict(db, "SELECT 1 AS present FROM orders WHERE order_id = :order_id", {"order_id": order_id})
+    existing = lock_order(db, order_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Order not found")
 
+    # The lines go first (order_details references orders without a cascade);
+    # the counters are retracted once both deletes have gone through.
+    lines = fetch_rollup_lines(db, order_id)
+    db.execute(text("DELETE FROM order_details WHERE order_id = :order_id"), {"order_id": order_id})
     db.execute(text("DELETE FROM orders WHERE order_id = :order_id"), {"order_id": order_id})
+    if existing["order_status"] != "cancelled":
+        apply_item_sales_deltas(db, order_line_deltas(lines, -1))
+        apply_order_rollups(db, existing, lines, -1)
     db.commit()
     return {"message": "Order deleted successfully"}
 
 
 @app.post("/orders/complete", status_code=201)
 def create_complete_order(order: CreateOrder, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    try:
-        if not order.items:
-            raise HTTPException(status_code=400, detail="At least one item is required")
-
-        item_ids = [item.item_id for item in order.items]
-        item_prices = get_item_prices(db, item_ids)
-        if len(item_prices) != len(set(item_ids)):
-            raise HTTPException(status_code=400, detail="One or more items are invalid")
-
-        order_user_id = current_user["user_id"]
-        normalized_items = []
-        total_amount = 0
-        for item in order.items:
-            price = item_prices[item.item_id]
-            normalized_items.append(
-                {
-                    "item_id": item.item_id,
-                    "quantity": item.quantity,
-                    "price": price,
-                }
-            )
-            total_amount += price * item.quantity
-
-        result = db.execute(
-            text(
-                """
-                INSERT INTO orders (
-                    user_id, amount, order_status, payment_status, payment_mode,
-                    order_date, delivery_date, address, city
-                )
-                VALUES (
-                    :user_id, :amount, :order_status, :payment_status, :payment_mode,
-                    :order_date, :delivery_date, :address, :city
-                )
-                """
-            ),
-            {
-                "user_id": order_user_id,
-                "amount": total_amount,
-                "order_status": order.order_status,
-                "payment_status": order.payment_status,
-                "payment_mode": order.payment_mode,
-                "order_date": order.order_date,
-                "delivery_date": order.delivery_date,
-                "address": order.address,
-                "city": order.city,
-            },
+    def create(session: Session) -> dict:
+        return create_order_with_items(
+            session,
+            user_id=current_user["user_id"],
+            items=[{"item_id": item.item_id, "quantity": item.quantity} for item in order.items],
+            order_status=order.order_status,
+            payment_status=order.payment_status,
+            payment_mode=order.payment_mode,
+            order_date=order.order_date.isoformat(),
+            delivery_date=order.delivery_date.isoformat(),
+            address=order.address,
+            city=order.city,
         )
-        order_id = result.lastrowid
-        for item in normalized_items:
-            db.execute(
-                text(
-                    """
-                    INSERT INTO order_details (order_id, item_id, quantity, price)
-                    VALUES (:order_id, :item_id, :quantity, :price)
-                    """
-                ),
-                {
-                    "order_id": order_id,
-                    "item_id": item["item_id"],
-                    "quantity": item["quantity"],
-                    "price": item["price"],
-                },
-            )
-        db.commit()
-        return {
-            "message": "Order created successfully",
-            "order_id": order_id,
-            "total_amount": total_amount,
-            "items_count": len(normalized_items),
-        }
+
+    try:
+        if order_writer is not None:
+            # Committed together with other orders queued at the same time.
+            created = order_writer.run(create)
+        else:
+            created = create(db)
+            db.commit()
+        return {"message": "Order created successfully", **created}
+    except UnknownItemsError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="One or more items are invalid")
+    except OrderCreationError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Invalid user_id or item_id")
+    except HTTPException:
+        raise
     except Exception as exc:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(exc))
@@ -562,34 +778,14 @@ def get_complete_order(order_id: int, db: Session = Depends(get_db), current_use
     if order["user_id"] != current_user["user_id"] and current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access forbidden")
 
-    items = fetch_all_dicts(
-        db,
-        """
-        SELECT
-            od.order_detail_id,
-            od.item_id,
-            od.quantity,
-            od.price,
-            i.item_name,
-            i.description,
-            i.weight
-        FROM order_details od
-        JOIN items i ON od.item_id = i.item_id
-        WHERE od.order_id = :order_id
-        """,
-        {"order_id": order_id},
-    )
+    items = fetch_order_lines(db, order_id)
     return {"order": order, "items": items, "total_items": len(items)}
 
 
 @app.post("/order-details/", status_code=201)
 def add_order_detail(detail: OrderDetails, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
     try:
-        order = fetch_one_dict(
-            db,
-            "SELECT user_id FROM orders WHERE order_id = :order_id",
-            {"order_id": detail.order_id},
-        )
+        order = lock_order(db, detail.order_id)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
         if order["user_id"] != current_user["user_id"] and current_user["role"] != "admin":
@@ -603,11 +799,12 @@ def add_order_detail(detail: OrderDetails, db: Session = Depends(get_db), curren
         if not item_row:
             raise HTTPException(status_code=400, detail="Order or Item not found")
 
-        result = db.execute(
+        order_detail_id = db.execute(
             text(
                 """
                 INSERT INTO order_details (order_id, item_id, quantity, price)
                 VALUES (:order_id, :item_id, :quantity, :price)
+                RETURNING order_detail_id
                 """
             ),
             {
@@ -616,17 +813,32 @@ def add_order_detail(detail: OrderDetails, db: Session = Depends(get_db), curren
                 "quantity": detail.quantity,
                 "price": item_row["price"],
             },
-        )
+        ).scalar_one()
+        if order["order_status"] != "cancelled":
+            apply_item_sales_deltas(db, {detail.item_id: detail.quantity})
+            apply_line_rollups(
+                db,
+                order["order_date"],
+                [{"item_id": detail.item_id, "quantity": detail.quantity, "price": item_row["price"]}],
+            )
         db.commit()
-        return {"message": "Order detail created successfully", "order_detail_id": result.lastrowid}
+        return {"message": "Order detail created successfully", "order_detail_id": order_detail_id}
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Order or Item not found")
 
 
-@app.get("/order-details", response_model=list[OrderDetailResponse])
-def get_order_details(db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    return fetch_all_dicts(db, "SELECT * FROM order_details")
+@app.get("/order-details", response_model=OrderDetailPage)
+def get_order_details(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    return json_response(
+        fetch_page(db, "order_details", "*", "order_detail_id", cursor, limit, include_total=include_total)
+    )
 
 
 @app.get("/order-details/order/{order_id}", response_model=list[OrderDetailResponse])
@@ -645,14 +857,15 @@ def get_order_details_by_order(order_id: int, db: Session = Depends(get_db), cur
 
 @app.put("/order-details/{detail_id}", response_model=OrderDetailResponse)
 def update_order_detail(detail_id: int, detail: OrderDetails, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    existing = fetch_one_dict(
-        db,
-        "SELECT 1 AS present FROM order_details WHERE order_detail_id = :detail_id",
-        {"detail_id": detail_id},
-    )
+    existing, orders = lock_order_detail(db, detail_id, detail.order_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Order detail not found")
 
+    source_order = orders[existing["order_id"]]
+    target_order = orders[detail.order_id]
+    if not target_order:
+        raise HTTPException(status_code=400, detail="Order or Item not found")
+
     item_row = fetch_one_dict(
         db,
         "SELECT price FROM items WHERE item_id = :item_id",
@@ -680,6 +893,18 @@ def update_order_detail(detail_id: int, detail: OrderDetails, db: Session = Depe
             "detail_id": detail_id,
         },
     )
+    deltas: dict[int, int] = {}
+    if source_order["order_status"] != "cancelled":
+        deltas[existing["item_id"]] = -existing["quantity"]
+        apply_line_rollups(db, source_order["order_date"], [existing], -1)
+    if target_order["order_status"] != "cancelled":
+        deltas[detail.item_id] = deltas.get(detail.item_id, 0) + detail.quantity
+        apply_line_rollups(
+            db,
+            target_order["order_date"],
+            [{"item_id": detail.item_id, "quantity": detail.quantity, "price": item_row["price"]}],
+        )
+    apply_item_sales_deltas(db, deltas)
     db.commit()
     return fetch_one_dict(
         db,
@@ -690,28 +915,33 @@ def update_order_detail(detail_id: int, detail: OrderDetails, db: Session = Depe
 
 @app.delete("/order-details/{detail_id}")
 def delete_order_detail(detail_id: int, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    existing = fetch_one_dict(
-        db,
-        "SELECT 1 AS present FROM order_details WHERE order_detail_id = :detail_id",
-        {"detail_id": detail_id},
-    )
+    existing, orders = lock_order_detail(db, detail_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Order detail not found")
 
+    order = orders[existing["order_id"]]
     db.execute(text("DELETE FROM order_details WHERE order_detail_id = :detail_id"), {"detail_id": detail_id})
+    if order["order_status"] != "cancelled":
+        apply_item_sales_deltas(db, {existing["item_id"]: -existing["quantity"]})
+        apply_line_rollups(db, order["order_date"], [existing], -1)
     db.commit()
     return {"message": "Order detail deleted successfully"}
 
 
 @app.post("/register", status_code=201)
-def register(user: Users, db: Session = Depends(get_db)):
+async def register(user: Users, db: Session = Depends(get_db)):
+    hashed_password = await hash_password_async(user.password)
+    return await run_in_threadpool(insert_registered_user, db, user, hashed_password)
+
+
+def insert_registered_user(db: Session, user: Users, hashed_password: str):
     try:
-        hashed_password = hash_password(user.password)
         result = db.execute(
             text(
                 """
                 INSERT INTO users (name, phone_number, email, password, role, address, city)
                 VALUES (:name, :phone_number, :email, :password, :role, :address, :city)
+                RETURNING user_id
                 """
             ),
             {
@@ -724,32 +954,37 @@ def register(user: Users, db: Session = Depends(get_db)):
                 "city": user.city,
             },
         )
+        user_id = result.scalar_one()
+        sync_user_search(db, user_id)
         db.commit()
-        return {"message": "User registered successfully", "user_id": result.lastrowid}
+        return {"message": "User registered successfully", "user_id": user_id}
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Phone number already exists")
 
 
 @app.post("/login")
-def login(response: Response, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+):
     identifier = form_data.username.strip()
     is_phone_identifier = identifier.isdigit() and len(identifier) == 10
 
     if is_phone_identifier:
-        user = fetch_one_dict(db, "SELECT * FROM users WHERE phone_number = :phone_number", {"phone_number": int(identifier)})
+        user = await run_in_threadpool(
+            fetch_one_dict, db, "SELECT * FROM users WHERE phone_number = :phone_number", {"phone_number": int(identifier)}
+        )
     else:
-        user = fetch_one_dict(db, "SELECT * FROM users WHERE email = :email", {"email": identifier})
+        user = await run_in_threadpool(fetch_one_dict, db, "SELECT * FROM users WHERE email = :email", {"email": identifier})
 
-    if not user or not verify_password(form_data.password, user["password"]):
+    if not user or not await verify_password_async(form_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
 
     if password_needs_rehash(user["password"]):
-        db.execute(
-            text("UPDATE users SET password = :password WHERE user_id = :user_id"),
-            {"password": hash_password(form_data.password), "user_id": user["user_id"]},
-        )
-        db.commit()
+        background_tasks.add_task(rehash_password_in_background, user["user_id"], form_data.password, user["password"])
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(data={"sub": str(user["user_id"])}, expires_delta=access_token_expires)
@@ -800,7 +1035,9 @@ def update_current_user_profile(
                 "user_id": current_user["user_id"],
             },
         )
+        sync_user_search(db, current_user["user_id"])
         db.commit()
+        invalidate_principal(current_user["user_id"])
         updated = fetch_one_dict(
             db,
             """
@@ -820,70 +1057,232 @@ def update_current_user_profile(
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@app.get("/admin/users", response_model=list[UserResponse])
-def admin_get_all_users(db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
-    return fetch_all_dicts(
+@app.get("/admin/users", response_model=UserPage)
+def admin_get_all_users(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    page = fetch_page(
         db,
-        """
-        SELECT user_id, name, phone_number, email, role, address, city
-        FROM users
-        """,
+        "users",
+        "user_id, name, phone_number, email, role, address, city",
+        "user_id",
+        cursor,
+        limit,
+        include_total=include_total,
     )
+    return json_response(page)
 
 
 @app.get("/users/search/")
 def search_users(
+    q: Optional[str] = None,
     name: Optional[str] = None,
     city: Optional[str] = None,
+    limit: Optional[int] = None,
     db: Session = Depends(get_db),
     admin: dict = Depends(get_admin_user),
 ):
-    conditions = []
-    params = {}
-    if name:
-        conditions.append("name LIKE :name")
-        params["name"] = f"%{name}%"
-    if city:
-        conditions.append("city LIKE :city")
-        params["city"] = f"%{city}%"
-
-    query = "SELECT user_id, name, phone_number, email, role, address, city FROM users"
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-
-    return fetch_all_dicts(db, query, params)
+    return search_user_records(db, q, name=name, city=city, limit=normalize_page_size(limit))
 
 
-@app.get("/users/{user_id}/orders", response_model=list[OrderResponse])
-def get_user_orders(user_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+@app.get("/users/{user_id}/orders", response_model=OrderPage)
+def get_user_orders(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    include: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
     if current_user["user_id"] != user_id and current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access forbidden")
-    return fetch_all_dicts(db, "SELECT * FROM orders WHERE user_id = :user_id", {"user_id": user_id})
+    includes = parse_order_includes(include)
+    page = fetch_page(
+        db,
+        "orders",
+        "*",
+        "order_id",
+        cursor,
+        limit,
+        where="user_id = :user_id",
+        params={"user_id": user_id},
+        descending=True,
+        include_total=include_total,
+    )
+    if "items" in includes:
+        attach_order_lines(db, page["items"])
+    return json_response(page)
 
 
-@app.get("/orders/status/{status}", response_model=list[OrderResponse])
-def get_orders_by_status(status: str, db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
+@app.get("/orders/status/{status}", response_model=OrderPage)
+def get_orders_by_status(
+    status: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
     if status not in ["pending", "confirmed", "delivered", "cancelled"]:
         raise HTTPException(status_code=400, detail="Invalid status")
-    return fetch_all_dicts(db, "SELECT * FROM orders WHERE order_status = :status", {"status": status})
+    page = fetch_page(
+        db,
+        "orders",
+        "*",
+        "order_id",
+        cursor,
+        limit,
+        where="order_status = :status",
+        params={"status": status},
+        descending=True,
+        include_total=include_total,
+    )
+    return json_response(page)
 
 
 @app.get("/items/search/")
-def search_items(name: str, db: Session = Depends(get_db)):
-    return fetch_all_dicts(db, "SELECT * FROM items WHERE item_name LIKE :name", {"name": f"%{name}%"})
+def search_items(name: str, limit: Optional[int] = None, db: Session = Depends(get_db)):
+    return search_catalog_items(db, name, normalize_page_size(limit))
 
 
-@app.get("/items/paginated")
-def get_items_paginated(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    items = fetch_all_dicts(
+@app.get("/admin/summary", response_model=AdminSummary)
+def get_admin_summary(db: Session = Depends(get_db), admin: dict = Depends(get_admin_user)):
+    # Per-status counts come from the status index alone (no table rows);
+    # today's revenue is one row of the daily_sales rollup.
+    status_rows = fetch_all_dicts(
         db,
-        "SELECT * FROM items LIMIT :limit OFFSET :skip",
-        {"limit": limit, "skip": skip},
+        "SELECT order_status, COUNT(*) AS orders FROM orders GROUP BY order_status",
     )
-    total_row = fetch_one_dict(db, "SELECT COUNT(*) AS count FROM items")
+    revenue_today = db.execute(
+        text("SELECT revenue FROM daily_sales WHERE day = :today"),
+        {"today": date.today().isoformat()},
+    ).scalar()
+    orders_by_status = dict.fromkeys(("pending", "confirmed", "delivered", "cancelled"), 0)
+    for row in status_rows:
+        orders_by_status[row["order_status"]] = row["orders"]
+
+    items, _ = catalog_cache.get(db)
+    return {
+        "total_items": len(items),
+        "total_users": count_rows(db, "users"),
+        "total_orders": sum(orders_by_status.values()),
+        "orders_by_status": orders_by_status,
+        "pending_orders": orders_by_status["pending"],
+        "revenue_today": revenue_today or 0,
+        "recent_orders": fetch_all_dicts(
+            db,
+            "SELECT * FROM orders ORDER BY order_id DESC LIMIT 5",
+        ),
+    }
+
+
+# The analytics endpoints read the daily rollup tables (sales_rollups.py): a
+# report scans one row per day (per item or city) rather than every order
+# and order line in the range.
+@app.get("/admin/analytics/daily", response_model=DailySalesReport)
+def get_daily_sales(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    date_from, date_to = analytics_range(date_from, date_to)
+    days = fetch_daily_sales(db, date_from, date_to)
     return {
-        "items": items,
-        "total": total_row["count"],
-        "skip": skip,
-        "limit": limit,
+        "from": date_from,
+        "to": date_to,
+        "orders": sum(day["orders"] for day in days),
+        "revenue": sum(day["revenue"] for day in days),
+        "items_sold": sum(day["items_sold"] for day in days),
+        "days": days,
     }
+
+
+@app.get("/admin/analytics/items", response_model=ItemSalesReport)
+def get_item_sales(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    date_from, date_to = analytics_range(date_from, date_to)
+    return {
+        "from": date_from,
+        "to": date_to,
+        "items": fetch_item_sales(db, date_from, date_to, normalize_page_size(limit)),
+    }
+
+
+@app.get("/admin/analytics/cities", response_model=CitySalesReport)
+def get_city_sales(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    date_from, date_to = analytics_range(date_from, date_to)
+    return {
+        "from": date_from,
+        "to": date_to,
+        "cities": fetch_city_sales(db, date_from, date_to, normalize_page_size(limit)),
+    }
+
+
+@app.get("/admin/production-plan", response_model=ProductionPlan)
+def get_production_plan(
+    day: Optional[date] = Query(None, alias="date"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+    admin: dict = Depends(get_admin_user),
+):
+    date_from, date_to = production_plan_range(day, date_from, date_to)
+    return fetch_production_plan(db, date_from, date_to)
+
+
+@app.get("/admin/export/{export}")
+def export_table(
+    export: str,
+    export_format: str = Query("ndjson", alias="format"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    admin: dict = Depends(get_admin_user),
+):
+    if export not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    query, params = build_export_query(export, date_from, date_to, order_status)
+    return StreamingResponse(
+        stream_export(export, export_format, query, params),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export}.{export_format}"'},
+    )
+
+
+@app.get("/admin/cache/catalog")
+def get_catalog_cache_stats(admin: dict = Depends(get_admin_user)):
+    return catalog_cache.stats()
+
+
+@app.get("/admin/cache/auth")
+def get_auth_cache_stats_endpoint(admin: dict = Depends(get_admin_user)):
+    return get_auth_cache_stats()
+
+
+@app.get("/admin/password-hashing")
+def get_password_hashing_stats(admin: dict = Depends(get_admin_user)):
+    return get_password_hash_stats()
+
+
+@app.get("/admin/db/pool")
+def get_db_pool_stats(admin: dict = Depends(get_admin_user)):
+    return get_pool_stats()
@@ -5,14 +5,19 @@ from typing import Any, Optional
 
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
-from sqlalchemy import bindparam, text
+from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from database import SessionLocal, init_db
+from item_search import search_items
+from order_service import create_order_with_items
+from order_transitions import ORDER_STATUSES, transition_order
+from production_plan import fetch_production_plan, production_plan_range
+from sales_stats import fetch_top_ordered_items
+from user_search import search_users
 
 
-ORDER_STATUSES = {"pending", "confirmed", "delivered", "cancelled"}
 PAYMENT_STATUSES = {"pending", "paid", "failed"}
 PAYMENT_MODES = {"cash", "upi", "card"}
 
@@ -64,19 +69,11 @@ def _validate_choice(value: Optional[str], allowed: set[str], field_name: str) -
         raise ValueError(f"Invalid {field_name}: {value}. Allowed values: {sorted(allowed)}")
 
 
-def _get_item_prices(db: Session, item_ids: list[int]) -> dict[int, int]:
-    if not item_ids:
-        return {}
-
-    stmt = text(
-        """
-        SELECT item_id, price
-        FROM items
-        WHERE item_id IN :item_ids
-        """
-    ).bindparams(bindparam("item_ids", expanding=True))
-    rows = db.execute(stmt, {"item_ids": sorted(set(item_ids))}).mappings().all()
-    return {row["item_id"]: row["price"] for row in rows}
+def _parse_date(value: str, field_name: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid {field_name}: {value}. Use YYYY-MM-DD") from None
 
 
 @mcp.resource("homebites://project/overview")
@@ -102,7 +99,13 @@ def project_routes() -> dict[str, list[str]]:
             "POST /orders/{order_id}/cancel",
             "GET /users/{user_id}/orders",
         ],
-        "admin": ["GET /users", "POST /users/", "PUT /users/{user_id}", "PUT /orders/{order_id}"],
+        "admin": [
+            "GET /users",
+            "POST /users/",
+            "PUT /users/{user_id}",
+            "PUT /orders/{order_id}",
+            "GET /admin/production-plan",
+        ],
     }
 
 
@@ -118,39 +121,9 @@ def list_items(search: Optional[str] = None, limit: int = 20, top_ordered: bool
     safe_limit = _normalize_limit(limit)
     with db_session() as db:
         if top_ordered:
-            items = _fetch_all_dicts(
-                db,
-                """
-                SELECT
-                    i.item_id,
-                    i.item_name,
-                    i.price,
-                    i.weight,
-                    i.photos,
-                    i.videos,
-                    i.description,
-                    COALESCE(SUM(od.quantity), 0) AS total_quantity_ordered
-                FROM items i
-                LEFT JOIN order_details od ON i.item_id = od.item_id
-                GROUP BY i.item_id, i.item_name, i.price, i.weight, i.photos, i.videos, i.description
-                ORDER BY total_quantity_ordered DESC, i.item_name ASC
-                LIMIT :limit
-                """,
-                {"limit": safe_limit},
-            )
+            items = fetch_top_ordered_items(db, safe_limit)
         elif search:
-            items = _fetch_all_dicts(
-                db,
-                """
-                SELECT item_id, item_name, price, weight, photos, videos, description
-                FROM items
-                WHERE lower(item_name) LIKE lower(:search)
-                   OR lower(description) LIKE lower(:search)
-                ORDER BY item_name ASC
-                LIMIT :limit
-                """,
-                {"search": f"%{search}%", "limit": safe_limit},
-            )
+            items = search_items(db, search, safe_limit)
         else:
             items = _fetch_all_dicts(
                 db,
@@ -184,32 +157,12 @@ def get_item(item_id: int) -> dict[str, Any]:
 
 
 @mcp.tool()
-def list_users(city: Optional[str] = None, limit: int = 50) -> dict[str, Any]:
+def list_users(city: Optional[str] = None, limit: int = 50, search: Optional[str] = None) -> dict[str, Any]:
     safe_limit = _normalize_limit(limit)
     with db_session() as db:
-        if city:
-            users = _fetch_all_dicts(
-                db,
-                """
-                SELECT user_id, name, phone_number, email, role, address, city
-                FROM users
-                WHERE lower(city) = lower(:city)
-                ORDER BY name ASC
-                LIMIT :limit
-                """,
-                {"city": city, "limit": safe_limit},
-            )
-        else:
-            users = _fetch_all_dicts(
-                db,
-                """
-                SELECT user_id, name, phone_number, email, role, address, city
-                FROM users
-                ORDER BY name ASC
-                LIMIT :limit
-                """,
-                {"limit": safe_limit},
-            )
+        # No search and no city lists everyone by name; city alone is a
+        # substring match, the same as the admin search endpoint.
+        users = search_users(db, search, city=city, limit=safe_limit)
     return {"count": len(users), "users": users}
 
 
@@ -269,6 +222,23 @@ def get_order(order_id: int, include_items: bool = True) -> dict[str, Any]:
     return response
 
 
+@mcp.tool()
+def get_production_plan(
+    delivery_date: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> dict[str, Any]:
+    # Item quantities to cook for pending and confirmed orders, for one
+    # delivery date or a from/to range (today when nothing is given).
+    start, end = production_plan_range(
+        date.fromisoformat(_parse_date(delivery_date, "delivery_date")) if delivery_date else None,
+        date.fromisoformat(_parse_date(date_from, "date_from")) if date_from else None,
+        date.fromisoformat(_parse_date(date_to, "date_to")) if date_to else None,
+    )
+    with db_session() as db:
+        return fetch_production_plan(db, start, end)
+
+
 @mcp.tool()
 def create_order(
     user_id: int,
@@ -289,65 +259,27 @@ def create_order(
     if not items:
         raise ValueError("At least one item is required")
 
-    normalized_order_date = order_date or date.today().isoformat()
-    normalized_delivery_date = delivery_date or normalized_order_date
+    normalized_order_date = _parse_date(order_date, "order_date") if order_date else date.today().isoformat()
+    normalized_delivery_date = _parse_date(delivery_date, "delivery_date") if delivery_date else normalized_order_date
 
     with db_session() as db:
         user = _fetch_one_dict(db, "SELECT user_id FROM users WHERE user_id = :user_id", {"user_id": user_id})
         if not user:
             raise ValueError(f"User {user_id} not found")
 
-        item_ids = [item.item_id for item in items]
-        item_prices = _get_item_prices(db, item_ids)
-        if len(item_prices) != len(set(item_ids)):
-            missing_ids = sorted(set(item_ids) - set(item_prices))
-            raise ValueError(f"Unknown item ids: {missing_ids}")
-
-        total_amount = sum(item_prices[item.item_id] * item.quantity for item in items)
-
         try:
-            order_result = db.execute(
-                text(
-                    """
-                    INSERT INTO orders (
-                        user_id, amount, order_status, payment_status, payment_mode,
-                        order_date, delivery_date, address, city
-                    )
-                    VALUES (
-                        :user_id, :amount, :order_status, :payment_status, :payment_mode,
-                        :order_date, :delivery_date, :address, :city
-                    )
-                    """
-                ),
-                {
-                    "user_id": user_id,
-                    "amount": total_amount,
-                    "order_status": order_status,
-                    "payment_status": payment_status,
-                    "payment_mode": payment_mode,
-                    "order_date": normalized_order_date,
-                    "delivery_date": normalized_delivery_date,
-                    "address": address,
-                    "city": city,
-                },
+            created = create_order_with_items(
+                db,
+                user_id=user_id,
+                items=[{"item_id": item.item_id, "quantity": item.quantity} for item in items],
+                order_status=order_status,
+                payment_status=payment_status,
+                payment_mode=payment_mode,
+                order_date=normalized_order_date,
+                delivery_date=normalized_delivery_date,
+                address=address,
+                city=city,
             )
-            order_id = order_result.lastrowid
-
-            for item in items:
-                db.execute(
-                    text(
-                        """
-                        INSERT INTO order_details (order_id, item_id, quantity, price)
-                        VALUES (:order_id, :item_id, :quantity, :price)
-                        """
-                    ),
-                    {
-                        "order_id": order_id,
-                        "item_id": item.item_id,
-                        "quantity": item.quantity,
-                        "price": item_prices[item.item_id],
-                    },
-                )
             db.commit()
         except IntegrityError as exc:
             db.rollback()
@@ -355,10 +287,10 @@ def create_order(
 
     return {
         "message": "Order created successfully",
-        "order_id": order_id,
+        "order_id": created["order_id"],
         "user_id": user_id,
-        "total_amount": total_amount,
-        "items_count": len(items),
+        "total_amount": created["total_amount"],
+        "items_count": created["items_count"],
     }
 
 
@@ -373,40 +305,18 @@ def update_order_status(
     _validate_choice(order_status, ORDER_STATUSES, "order_status")
     _validate_choice(payment_status, PAYMENT_STATUSES, "payment_status")
 
-    updates: list[str] = []
-    params: dict[str, Any] = {"order_id": order_id}
-
-    if order_status is not None:
-        updates.append("order_status = :order_status")
-        params["order_status"] = order_status
+    changes: dict[str, Any] = {}
     if payment_status is not None:
-        updates.append("payment_status = :payment_status")
-        params["payment_status"] = payment_status
+        changes["payment_status"] = payment_status
     if delivery_date is not None:
-        updates.append("delivery_date = :delivery_date")
-        params["delivery_date"] = delivery_date
+        changes["delivery_date"] = date.fromisoformat(_parse_date(delivery_date, "delivery_date"))
 
-    if not updates:
+    if order_status is None and not changes:
         raise ValueError("Provide at least one field to update")
 
     with db_session() as db:
-        existing = _fetch_one_dict(db, "SELECT order_id FROM orders WHERE order_id = :order_id", {"order_id": order_id})
-        if not existing:
-            raise ValueError(f"Order {order_id} not found")
-
-        db.execute(text(f"UPDATE orders SET {', '.join(updates)} WHERE order_id = :order_id"), params)
+        updated_order = transition_order(db, order_id, order_status, changes=changes, allow_unchanged=True)
         db.commit()
-
-        updated_order = _fetch_one_dict(
-            db,
-            """
-            SELECT order_id, user_id, amount, order_status, payment_status, payment_mode,
-                   order_date, delivery_date, address, city
-            FROM orders
-            WHERE order_id = :order_id
-            """,
-            {"order_id": order_id},
-        )
     return {"message": "Order updated successfully", "order": updated_order}
 
 
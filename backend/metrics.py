@@ -0,0 +1,280 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Iterable, Optional
+
+
+# In-process request and query metrics, rendered in the Prometheus text
+# format by GET /metrics. Every thread writes to its own shard, so recording
+# takes no lock; a scrape sums the shards. Request metrics are recorded on
+# the event loop thread, query metrics on whichever thread ran the query.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Route label for requests that matched no API route, and for queries run
+# outside a request (startup, background threads).
+UNMATCHED_ROUTE = "unmatched"
+NO_ROUTE = "none"
+
+
+class _Shard:
+    __slots__ = ("requests", "latency", "queries", "query_latency", "in_progress")
+
+    def __init__(self):
+        # (method, route, status) -> count
+        self.requests: dict[tuple[str, str, str], int] = {}
+        # (method, route) -> per-bucket counts, +Inf count, then the sum
+        self.latency: dict[tuple[str, str], list[float]] = {}
+        # route -> [queries, seconds]
+        self.queries: dict[str, list[float]] = {}
+        self.query_latency: list[float] = [0] * (len(QUERY_BUCKETS) + 2)
+        self.in_progress = 0
+
+
+_shards: list[_Shard] = []
+_local = threading.local()
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        _shards.append(shard)
+    return shard
+
+
+def _observe(buckets: list[float], bounds: tuple[float, ...], seconds: float) -> None:
+    buckets[bisect.bisect_left(bounds, seconds)] += 1
+    buckets[-1] += seconds
+
+
+class _RequestQueries:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_request_queries: ContextVar[Optional[_RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def record_query(seconds: float) -> None:
+    # Called from the engine's after_cursor_execute hook. Context variables
+    # follow sync endpoints into the threadpool, so queries are charged to
+    # the request that ran them.
+    shard = _shard()
+    _observe(shard.query_latency, QUERY_BUCKETS, seconds)
+    queries = _request_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += seconds
+        return
+    totals = shard.queries.get(NO_ROUTE)
+    if totals is None:
+        totals = shard.queries[NO_ROUTE] = [0, 0.0]
+    totals[0] += 1
+    totals[1] += seconds
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware rather than BaseHTTPMiddleware: it adds no task
+    # or body buffering, and timing covers streamed bodies to the last chunk.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        queries = _RequestQueries()
+        token = _request_queries.set(queries)
+        shard = _shard()
+        shard.in_progress += 1
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_queries.reset(token)
+            shard.in_progress -= 1
+            # The router stores the matched route in the scope; use its
+            # template so /users/1 and /users/2 share one series. Mounted
+            # apps have no route, only their prefix in root_path.
+            route = scope.get("route")
+            route_path = getattr(route, "path_format", None)
+            if route_path is None:
+                route_path = scope.get("root_path") if "endpoint" in scope else None
+            route_path = route_path or UNMATCHED_ROUTE
+            _record_request(shard, scope["method"], route_path, status_code, elapsed, queries)
+
+
+def _record_request(shard: _Shard, method: str, route: str, status_code: int, seconds: float, queries: _RequestQueries) -> None:
+    key = (method, route, str(status_code))
+    shard.requests[key] = shard.requests.get(key, 0) + 1
+
+    buckets = shard.latency.get((method, route))
+    if buckets is None:
+        buckets = shard.latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 2)
+    _observe(buckets, LATENCY_BUCKETS, seconds)
+
+    totals = shard.queries.get(route)
+    if totals is None:
+        totals = shard.queries[route] = [0, 0.0]
+    totals[0] += queries.count
+    totals[1] += queries.seconds
+
+
+def _merge() -> dict[str, Any]:
+    requests: dict[tuple, int] = {}
+    latency: dict[tuple, list[float]] = {}
+    queries: dict[str, list[float]] = {}
+    query_latency = [0.0] * (len(QUERY_BUCKETS) + 2)
+    in_progress = 0
+    # dict() and list() copies are single C calls, so they never see a
+    # shard's dict change size halfway through.
+    for shard in list(_shards):
+        for key, count in dict(shard.requests).items():
+            requests[key] = requests.get(key, 0) + count
+        for key, buckets in dict(shard.latency).items():
+            merged = latency.setdefault(key, [0.0] * len(buckets))
+            for index, value in enumerate(list(buckets)):
+                merged[index] += value
+        for route, (count, seconds) in dict(shard.queries).items():
+            totals = queries.setdefault(route, [0, 0.0])
+            totals[0] += count
+            totals[1] += seconds
+        for index, value in enumerate(list(shard.query_latency)):
+            query_latency[index] += value
+        in_progress += shard.in_progress
+    return {
+        "requests": requests,
+        "latency": latency,
+        "queries": queries,
+        "query_latency": query_latency,
+        "in_progress": in_progress,
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram(name: str, bounds: tuple[float, ...], buckets: list[float], **labels: str) -> Iterable[str]:
+    cumulative = 0
+    for bound, count in zip(bounds, buckets):
+        cumulative += count
+        yield f"{name}_bucket{_labels(**labels, le=repr(bound))} {int(cumulative)}"
+    cumulative += buckets[len(bounds)]
+    yield f"{name}_bucket{_labels(**labels, le='+Inf')} {int(cumulative)}"
+    yield f"{name}_sum{_labels(**labels)} {_number(buckets[-1])}"
+    yield f"{name}_count{_labels(**labels)} {int(cumulative)}"
+
+
+def render_metrics(pool_stats: Optional[dict] = None, password_stats: Optional[dict] = None) -> str:
+    merged = _merge()
+    lines = [
+        "# HELP homebites_http_requests_total HTTP requests by route template and status code.",
+        "# TYPE homebites_http_requests_total counter",
+    ]
+    for (method, route, status_code), count in sorted(merged["requests"].items()):
+        lines.append(f"homebites_http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+
+    lines += [
+        "# HELP homebites_http_request_duration_seconds Time from receiving a request to sending the last body chunk.",
+        "# TYPE homebites_http_request_duration_seconds histogram",
+    ]
+    for (method, route), buckets in sorted(merged["latency"].items()):
+        lines.extend(_histogram("homebites_http_request_duration_seconds", LATENCY_BUCKETS, buckets, method=method, route=route))
+
+    lines += [
+        "# HELP homebites_http_requests_in_progress HTTP requests being handled.",
+        "# TYPE homebites_http_requests_in_progress gauge",
+        f"homebites_http_requests_in_progress {merged['in_progress']}",
+        "# HELP homebites_db_queries_total SQL statements executed, by the route that ran them.",
+        "# TYPE homebites_db_queries_total counter",
+    ]
+    for route, (count, _) in sorted(merged["queries"].items()):
+        lines.append(f"homebites_db_queries_total{_labels(route=route)} {int(count)}")
+    lines += [
+        "# HELP homebites_db_query_seconds_total Time spent executing SQL statements, by the route that ran them.",
+        "# TYPE homebites_db_query_seconds_total counter",
+    ]
+    for route, (_, seconds) in sorted(merged["queries"].items()):
+        lines.append(f"homebites_db_query_seconds_total{_labels(route=route)} {_number(seconds)}")
+    lines += [
+        "# HELP homebites_db_query_duration_seconds Duration of single SQL statements.",
+        "# TYPE homebites_db_query_duration_seconds histogram",
+    ]
+    lines.extend(_histogram("homebites_db_query_duration_seconds", QUERY_BUCKETS, merged["query_latency"]))
+
+    if pool_stats:
+        for key, description in (
+            ("size", "Connections the pool keeps open."),
+            ("checked_out", "Connections currently in use."),
+            ("checked_in", "Idle connections in the pool."),
+            ("overflow", "Connections opened beyond the pool size."),
+        ):
+            if key in pool_stats:
+                lines += [
+                    f"# HELP homebites_db_pool_{key} {description}",
+                    f"# TYPE homebites_db_pool_{key} gauge",
+                    f"homebites_db_pool_{key} {pool_stats[key]}",
+                ]
+        for key, name, description in (
+            ("checkouts", "checkouts_total", "Connections handed out by the pool."),
+            ("slow_checkouts", "slow_checkouts_total", "Checkouts that waited longer than DB_POOL_WAIT_WARN_MS."),
+            ("saturated_checkouts", "saturated_checkouts_total", "Checkouts that left no spare connection."),
+            ("wait_seconds_total", "wait_seconds_total", "Time spent waiting for a connection."),
+        ):
+            if key in pool_stats:
+                lines += [
+                    f"# HELP homebites_db_pool_{name} {description}",
+                    f"# TYPE homebites_db_pool_{name} counter",
+                    f"homebites_db_pool_{name} {_number(pool_stats[key])}",
+                ]
+    if password_stats:
+        # get_password_hash_stats() from auth.py: bcrypt runs on a bounded
+        # worker pool, so latency and rejections show when it is saturated.
+        lines += [
+            "# HELP homebites_password_hash_pending Password hash and verify jobs queued or running.",
+            "# TYPE homebites_password_hash_pending gauge",
+            f"homebites_password_hash_pending {password_stats['pending']}",
+            "# HELP homebites_password_hash_rejected_total Password jobs refused with 503 because the pool was full.",
+            "# TYPE homebites_password_hash_rejected_total counter",
+            f"homebites_password_hash_rejected_total {password_stats['rejected']}",
+        ]
+        for name, key, kind, description in (
+            ("operations_total", "count", "counter", "Password hash and verify jobs completed."),
+            ("seconds_total", "total_seconds", "counter", "Time spent hashing and verifying passwords."),
+            ("max_seconds", "max_seconds", "gauge", "Slowest single password job since startup."),
+        ):
+            lines += [
+                f"# HELP homebites_password_hash_{name} {description}",
+                f"# TYPE homebites_password_hash_{name} {kind}",
+            ]
+            for operation in ("hash", "verify"):
+                value = password_stats[operation][key]
+                lines.append(f"homebites_password_hash_{name}{_labels(operation=operation)} {_number(value)}")
+    return "\n".join(lines) + "\n"
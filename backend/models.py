@@ -1,4 +1,5 @@
-from typing import List, Optional
+from datetime import date
+from typing import Dict, List, Optional, Union
 
 from pydantic import BaseModel, EmailStr, Field, validator
 
@@ -39,6 +40,11 @@ class Items(BaseModel):
     videos: str
     description: str
 
+class PhotoVariant(BaseModel):
+    url: str
+    width: int
+    height: int
+
 class ItemResponse(BaseModel):
     item_id: int
     item_name: str
@@ -47,6 +53,8 @@ class ItemResponse(BaseModel):
     photos: str
     videos: str
     description: str
+    photo_variants: Optional[Dict[str, PhotoVariant]] = None
+    photo_srcset: Optional[str] = None
 
 class Orders(BaseModel):
     user_id: int
@@ -54,8 +62,8 @@ class Orders(BaseModel):
     order_status: str
     payment_status: str
     payment_mode: str
-    order_date: str
-    delivery_date: str
+    order_date: date
+    delivery_date: date
     address: str = Field(..., min_length=5)
     city: str = Field(..., min_length=2)
     
@@ -84,11 +92,23 @@ class OrderResponse(BaseModel):
     order_status: str
     payment_status: str
     payment_mode: str
-    order_date: str
-    delivery_date: str
+    order_date: date
+    delivery_date: date
     address: str
     city: str
 
+class OrderLineResponse(BaseModel):
+    order_detail_id: int
+    item_id: int
+    quantity: int
+    price: int
+    item_name: str
+    description: Optional[str] = None
+    weight: str
+
+class OrderWithItemsResponse(OrderResponse):
+    items: List[OrderLineResponse]
+
 class OrderDetails(BaseModel):
     order_id: int
     item_id: int
@@ -110,9 +130,97 @@ class OrderItem(BaseModel):
 class CreateOrder(BaseModel):
     order_status: str
     payment_status: str
-    payment_mode: str
-    order_date: str
-    delivery_date: str
+    payment_mode: str
+    order_date: date
+    delivery_date: date
     address: str
     city: str
-    items: List[OrderItem]
+    items: List[OrderItem]
+
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+    total: Optional[int] = None
+
+class ItemPage(BaseModel):
+    items: List[ItemResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+    total: Optional[int] = None
+
+class OrderPage(BaseModel):
+    # Orders carry their lines when the endpoint is called with include=items.
+    items: List[Union[OrderWithItemsResponse, OrderResponse]]
+    next_cursor: Optional[str] = None
+    limit: int
+    total: Optional[int] = None
+
+class OrderDetailPage(BaseModel):
+    items: List[OrderDetailResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+    total: Optional[int] = None
+
+class AdminSummary(BaseModel):
+    total_items: int
+    total_users: int
+    total_orders: int
+    orders_by_status: Dict[str, int]
+    pending_orders: int
+    revenue_today: int
+    recent_orders: List[OrderResponse]
+
+class DailySales(BaseModel):
+    day: date
+    orders: int
+    revenue: int
+    items_sold: int
+
+class ItemSales(BaseModel):
+    item_id: int
+    item_name: str
+    quantity: int
+    revenue: int
+
+class CitySales(BaseModel):
+    city: str
+    orders: int
+    revenue: int
+
+class ProductionPlanLine(BaseModel):
+    item_id: int
+    item_name: str
+    weight: Optional[str] = None
+    quantity: int
+    orders: int
+
+class ProductionPlanDay(BaseModel):
+    delivery_date: date
+    orders: int
+    items: List[ProductionPlanLine]
+
+class ProductionPlan(BaseModel):
+    date_from: date = Field(..., alias="from")
+    date_to: date = Field(..., alias="to")
+    orders: int
+    items: List[ProductionPlanLine]
+    days: List[ProductionPlanDay]
+
+class DailySalesReport(BaseModel):
+    date_from: date = Field(..., alias="from")
+    date_to: date = Field(..., alias="to")
+    orders: int
+    revenue: int
+    items_sold: int
+    days: List[DailySales]
+
+class ItemSalesReport(BaseModel):
+    date_from: date = Field(..., alias="from")
+    date_to: date = Field(..., alias="to")
+    items: List[ItemSales]
+
+class CitySalesReport(BaseModel):
+    date_from: date = Field(..., alias="from")
+    date_to: date = Field(..., alias="to")
+    cities: List[CitySales]
@@ -0,0 +1,243 @@
+from collections.abc import Mapping, Sequence
+from datetime import date
+from typing import Any, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from db_utils import fetch_page
+from order_transitions import ORDER_STATUSES
+from sales_rollups import apply_order_rollups
+from sales_stats import apply_item_sales_deltas, order_line_deltas
+
+
+# Detail rows per INSERT statement; keeps the bind-parameter count well under
+# SQLite's and psycopg's limits for very large carts.
+DETAIL_INSERT_CHUNK_SIZE = 500
+
+
+class OrderCreationError(ValueError):
+    pass
+
+
+class UnknownItemsError(OrderCreationError):
+    def __init__(self, item_ids: list[int]):
+        self.item_ids = item_ids
+        super().__init__(f"Unknown item ids: {item_ids}")
+
+
+class InvalidIncludeError(ValueError):
+    pass
+
+
+class InvalidOrderFilterError(ValueError):
+    pass
+
+
+# Related data order list endpoints can embed with ?include=...
+ORDER_INCLUDES = frozenset({"items"})
+
+
+def get_item_prices(db: Session, item_ids: Sequence[int]) -> dict[int, int]:
+    if not item_ids:
+        return {}
+
+    stmt = text(
+        """
+        SELECT item_id, price
+        FROM items
+        WHERE item_id IN :item_ids
+        """
+    ).bindparams(bindparam("item_ids", expanding=True))
+    rows = db.execute(stmt, {"item_ids": sorted(set(item_ids))}).mappings().all()
+    return {row["item_id"]: row["price"] for row in rows}
+
+
+def insert_order_details(db: Session, order_id: int, lines: Sequence[Mapping[str, Any]]) -> None:
+    for start in range(0, len(lines), DETAIL_INSERT_CHUNK_SIZE):
+        chunk = lines[start : start + DETAIL_INSERT_CHUNK_SIZE]
+        values = ", ".join(
+            f"(:order_id, :item_id_{index}, :quantity_{index}, :price_{index})" for index in range(len(chunk))
+        )
+        params: dict[str, Any] = {"order_id": order_id}
+        for index, line in enumerate(chunk):
+            params[f"item_id_{index}"] = line["item_id"]
+            params[f"quantity_{index}"] = line["quantity"]
+            params[f"price_{index}"] = line["price"]
+        db.execute(text(f"INSERT INTO order_details (order_id, item_id, quantity, price) VALUES {values}"), params)
+
+
+def create_order_with_items(
+    db: Session,
+    *,
+    user_id: int,
+    items: Sequence[Mapping[str, Any]],
+    order_status: str,
+    payment_status: str,
+    payment_mode: str,
+    order_date: str,
+    delivery_date: str | None,
+    address: str,
+    city: str,
+) -> dict[str, Any]:
+    # A fixed number of statements per order whatever the cart size: one price
+    # lookup, one order INSERT ... RETURNING, one multi-row detail INSERT, one
+    # sales-counter upsert and three rollup upserts. The caller owns the
+    # transaction and commits.
+    if not items:
+        raise OrderCreationError("At least one item is required")
+
+    item_ids = [item["item_id"] for item in items]
+    item_prices = get_item_prices(db, item_ids)
+    missing_ids = sorted(set(item_ids) - set(item_prices))
+    if missing_ids:
+        raise UnknownItemsError(missing_ids)
+
+    lines = [
+        {"item_id": item["item_id"], "quantity": item["quantity"], "price": item_prices[item["item_id"]]}
+        for item in items
+    ]
+    total_amount = sum(line["price"] * line["quantity"] for line in lines)
+
+    order_id = db.execute(
+        text(
+            """
+            INSERT INTO orders (
+                user_id, amount, order_status, payment_status, payment_mode,
+                order_date, delivery_date, address, city
+            )
+            VALUES (
+                :user_id, :amount, :order_status, :payment_status, :payment_mode,
+                :order_date, :delivery_date, :address, :city
+            )
+            RETURNING order_id
+            """
+        ),
+        {
+            "user_id": user_id,
+            "amount": total_amount,
+            "order_status": order_status,
+            "payment_status": payment_status,
+            "payment_mode": payment_mode,
+            "order_date": order_date,
+            "delivery_date": delivery_date,
+            "address": address,
+            "city": city,
+        },
+    ).scalar_one()
+
+    insert_order_details(db, order_id, lines)
+    if order_status != "cancelled":
+        apply_item_sales_deltas(db, order_line_deltas(lines))
+        apply_order_rollups(db, {"order_date": order_date, "city": city, "amount": total_amount}, lines)
+
+    return {"order_id": order_id, "total_amount": total_amount, "items_count": len(lines)}
+
+
+ORDER_LINE_COLUMNS = """
+    od.order_detail_id,
+    od.item_id,
+    od.quantity,
+    od.price,
+    i.item_name,
+    i.description,
+    i.weight
+"""
+
+
+def fetch_order_lines(db: Session, order_id: int) -> list[dict[str, Any]]:
+    rows = db.execute(
+        text(
+            f"""
+            SELECT {ORDER_LINE_COLUMNS}
+            FROM order_details od
+            JOIN items i ON od.item_id = i.item_id
+            WHERE od.order_id = :order_id
+            """
+        ),
+        {"order_id": order_id},
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def parse_order_includes(include: Optional[str]) -> frozenset[str]:
+    requested = frozenset(part.strip() for part in (include or "").split(",") if part.strip())
+    unknown = requested - ORDER_INCLUDES
+    if unknown:
+        raise InvalidIncludeError(f"Unsupported include: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def attach_order_lines(db: Session, orders: list[dict[str, Any]]) -> None:
+    # One IN query for the whole page, grouped here, instead of one detail
+    # lookup per order.
+    if not orders:
+        return
+    stmt = text(
+        f"""
+        SELECT od.order_id, {ORDER_LINE_COLUMNS}
+        FROM order_details od
+        JOIN items i ON od.item_id = i.item_id
+        WHERE od.order_id IN :order_ids
+        ORDER BY od.order_id, od.order_detail_id
+        """
+    ).bindparams(bindparam("order_ids", expanding=True))
+    lines_by_order: dict[int, list[dict[str, Any]]] = {order["order_id"]: [] for order in orders}
+    for row in db.execute(stmt, {"order_ids": list(lines_by_order)}).mappings():
+        line = dict(row)
+        lines_by_order[line.pop("order_id")].append(line)
+    for order in orders:
+        order["items"] = lines_by_order[order["order_id"]]
+
+
+def build_order_filters(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order_status: Optional[str] = None,
+    alias: str = "",
+) -> tuple[Optional[str], dict[str, Any]]:
+    # Inclusive order_date range plus status, as a WHERE fragment. Dates are
+    # bound as ISO strings, which both databases compare against DATE columns.
+    if order_status is not None and order_status not in ORDER_STATUSES:
+        raise InvalidOrderFilterError("Invalid status")
+    prefix = f"{alias}." if alias else ""
+    conditions = []
+    params: dict[str, Any] = {}
+    if date_from is not None:
+        conditions.append(f"{prefix}order_date >= :date_from")
+        params["date_from"] = date_from.isoformat()
+    if date_to is not None:
+        conditions.append(f"{prefix}order_date <= :date_to")
+        params["date_to"] = date_to.isoformat()
+    if order_status is not None:
+        conditions.append(f"{prefix}order_status = :order_status")
+        params["order_status"] = order_status
+    return (" AND ".join(conditions) or None), params
+
+
+def fetch_order_page(
+    db: Session,
+    cursor: Optional[str],
+    limit: Optional[int],
+    include_total: bool = False,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order_status: Optional[str] = None,
+) -> dict[str, Any]:
+    # Newest first. A date range pages by (order_date, order_id) so the
+    # order_date indexes serve the filter and the ordering without a sort;
+    # otherwise order_id alone, as the other order lists do.
+    where, params = build_order_filters(date_from, date_to, order_status)
+    key = ("order_date", "order_id") if date_from is not None or date_to is not None else "order_id"
+    return fetch_page(
+        db,
+        "orders",
+        "*",
+        key,
+        cursor,
+        limit,
+        where=where,
+        params=params,
+        descending=True,
+        include_total=include_total,
+    )
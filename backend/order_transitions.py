@@ -0,0 +1,350 @@
+from collections.abc import Mapping
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import Date, bindparam, text
+from sqlalchemy.orm import Session
+
+from sales_rollups import apply_order_rollups, fetch_rollup_lines
+from sales_stats import apply_item_sales_deltas, order_line_deltas
+
+
+# Order status changes. Each transition is a single conditional
+# UPDATE ... WHERE order_status IN (...) RETURNING *, so the status check and
+# the write happen in one statement: when two requests race for the same
+# order, the database lets exactly one of them match. The caller owns the
+# transaction and commits.
+
+# status -> statuses an order may move to
+ORDER_TRANSITIONS: dict[str, frozenset[str]] = {
+    "pending": frozenset({"confirmed", "cancelled"}),
+    "confirmed": frozenset({"delivered", "cancelled"}),
+    "delivered": frozenset(),
+    "cancelled": frozenset(),
+}
+ORDER_STATUSES = frozenset(ORDER_TRANSITIONS)
+
+# Customers may cancel up to this many days after the order date.
+CANCELLATION_WINDOW_DAYS = 1
+
+# Columns that place an order in the daily rollups (sales_rollups.py).
+ROLLUP_COLUMNS = frozenset({"order_date", "city", "amount"})
+# Re-reads allowed when a concurrent edit changes those columns mid-update.
+SNAPSHOT_ATTEMPTS = 3
+
+# Columns callers may change alongside the status.
+UPDATABLE_COLUMNS = frozenset(
+    {"user_id", "amount", "payment_status", "payment_mode", "order_date", "delivery_date", "address", "city"}
+)
+# DATE columns; their new values are passed as date objects.
+DATE_COLUMNS = frozenset({"order_date", "delivery_date"})
+
+
+class OrderTransitionError(ValueError):
+    pass
+
+
+class OrderNotFoundError(OrderTransitionError):
+    def __init__(self, order_id: int):
+        self.order_id = order_id
+        super().__init__(f"Order {order_id} not found")
+
+
+class OrderOwnershipError(OrderTransitionError):
+    pass
+
+
+class InvalidTransitionError(OrderTransitionError):
+    pass
+
+
+class CancellationWindowError(OrderTransitionError):
+    pass
+
+
+class OrderConflictError(OrderTransitionError):
+    # Concurrent edits kept changing the order until the retries ran out.
+    pass
+
+
+def counts_toward_sales(order_status: str) -> bool:
+    return order_status != "cancelled"
+
+
+def transition_sources(new_status: str, allow_unchanged: bool = False) -> list[str]:
+    sources = {status for status, targets in ORDER_TRANSITIONS.items() if new_status in targets}
+    if allow_unchanged:
+        sources.add(new_status)
+    return sorted(sources)
+
+
+def cancellation_cutoff(today: Optional[date] = None) -> str:
+    # Earliest order_date that can still be cancelled.
+    return ((today or date.today()) - timedelta(days=CANCELLATION_WINDOW_DAYS)).isoformat()
+
+
+def lock_order(db: Session, order_id: int) -> Optional[dict[str, Any]]:
+    # Holds the order against concurrent writes until the caller commits and
+    # returns its owner, status, day, city and amount; None if it does not
+    # exist. Writers that read the order before touching its lines (the
+    # /order-details endpoints, delete_order) call this first, so a status
+    # change cannot land between their read and their write. A no-op UPDATE
+    # rather than SELECT ... FOR UPDATE because SQLite has no row locks: there
+    # it takes the database write lock, which has the same effect.
+    row = db.execute(
+        text(
+            """
+            UPDATE orders SET order_status = order_status
+            WHERE order_id = :order_id
+            RETURNING user_id, order_status, order_date, city, amount
+            """
+        ),
+        {"order_id": order_id},
+    ).mappings().first()
+    return dict(row) if row else None
+
+
+def lock_order_detail(
+    db: Session, detail_id: int, other_order_id: Optional[int] = None
+) -> tuple[Optional[dict[str, Any]], dict[int, Optional[dict[str, Any]]]]:
+    # Locks the order a line belongs to (and other_order_id, for moves) and
+    # returns the line with the locked orders by id. The line's order is read
+    # before it is locked, so a concurrent move can make that read stale; the
+    # line is re-read under the lock and the new order locked as well. Every
+    # line writer locks the line's order first, so once both are held the
+    # line cannot move again and the loop ends.
+    orders: dict[int, Optional[dict[str, Any]]] = {}
+    while True:
+        order_id = db.execute(
+            text("SELECT order_id FROM order_details WHERE order_detail_id = :detail_id"),
+            {"detail_id": detail_id},
+        ).scalar()
+        if order_id is None:
+            return None, orders
+        # Ascending id order so two writers locking the same pair cannot deadlock.
+        for wanted in sorted({order_id, other_order_id} - {None} - orders.keys()):
+            orders[wanted] = lock_order(db, wanted)
+        row = db.execute(
+            text("SELECT order_id, item_id, quantity, price FROM order_details WHERE order_detail_id = :detail_id"),
+            {"detail_id": detail_id},
+        ).mappings().first()
+        if row is None or row["order_id"] in orders:
+            return (dict(row) if row else None), orders
+
+
+def transition_order(
+    db: Session,
+    order_id: int,
+    new_status: Optional[str],
+    *,
+    changes: Optional[Mapping[str, Any]] = None,
+    user_id: Optional[int] = None,
+    within_cancellation_window: bool = False,
+    allow_unchanged: bool = False,
+) -> dict[str, Any]:
+    # Moves the order to new_status (None keeps the status) and applies
+    # `changes` in the same statement. user_id restricts the update to that
+    # customer's order; allow_unchanged also accepts an order already in
+    # new_status, for edits that resend the current status.
+    if new_status is not None and new_status not in ORDER_STATUSES:
+        raise InvalidTransitionError(f"Invalid order status: {new_status}")
+    changes = dict(changes or {})
+    unknown = sorted(set(changes) - UPDATABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Columns cannot be updated: {', '.join(unknown)}")
+
+    assignments = [f"{column} = :{column}" for column in changes]
+    conditions = ["order_id = :order_id"]
+    params: dict[str, Any] = {**changes, "order_id": order_id}
+    if new_status is not None:
+        assignments.insert(0, "order_status = :new_status")
+        params["new_status"] = new_status
+    if user_id is not None:
+        conditions.append("user_id = :user_id")
+        params["user_id"] = user_id
+    if within_cancellation_window:
+        conditions.append("order_date >= :cancellable_from")
+        params["cancellable_from"] = cancellation_cutoff()
+
+    rollup_columns = sorted(ROLLUP_COLUMNS & changes.keys())
+    if not rollup_columns:
+        updated = _transition_in_place(db, order_id, new_status, assignments, conditions, params, allow_unchanged)
+        if updated is None:
+            raise _explain_failure(
+                db, order_id, new_status, _sources(new_status, allow_unchanged), user_id, within_cancellation_window
+            )
+        return updated
+
+    # Admin edits resend the day, city and amount even when they did not
+    # change. The first UPDATE assumes they did not: it matches only if they
+    # still hold those values and leaves them out of the SET list, so the
+    # order keeps its rollup rows and the edit is one statement. Only a real
+    # change (or a failed transition) falls through to the snapshot path.
+    unchanged_assignments = [
+        assignment for assignment in assignments if assignment.split(" = ", 1)[0] not in ROLLUP_COLUMNS
+    ]
+    updated = _transition_in_place(
+        db,
+        order_id,
+        new_status,
+        unchanged_assignments or assignments,
+        [*conditions, *(f"{column} = :{column}" for column in rollup_columns)],
+        params,
+        allow_unchanged,
+    )
+    if updated is not None:
+        return updated
+    return _transition_from_snapshot(
+        db, order_id, new_status, assignments, conditions, params, user_id, allow_unchanged, within_cancellation_window
+    )
+
+
+def _sources(new_status: Optional[str], allow_unchanged: bool) -> list[str]:
+    return transition_sources(new_status, allow_unchanged) if new_status is not None else []
+
+
+def _transition_in_place(
+    db: Session,
+    order_id: int,
+    new_status: Optional[str],
+    assignments: list[str],
+    conditions: list[str],
+    params: dict[str, Any],
+    allow_unchanged: bool,
+) -> Optional[dict[str, Any]]:
+    # The update for edits that keep the order in its rollup rows; None when
+    # no row matched.
+    if new_status is None:
+        updated = _update(db, assignments, conditions, params, None)
+        if updated is not None:
+            _apply_counters(db, order_id, counts_toward_sales(updated["order_status"]), None, updated)
+        return updated
+
+    # RETURNING only sees the new row, so the old status is pinned by the
+    # WHERE clause instead. Sources that differ in whether they count toward
+    # item sales are tried one group at a time; a table where they agree
+    # (every transition except resending "cancelled") needs one statement.
+    groups: dict[bool, list[str]] = {}
+    for status in transition_sources(new_status, allow_unchanged):
+        groups.setdefault(counts_toward_sales(status), []).append(status)
+    for was_counted, statuses in groups.items():
+        updated = _update(db, assignments, conditions, params, statuses)
+        if updated is not None:
+            _apply_counters(db, order_id, was_counted, None, updated)
+            return updated
+    return None
+
+
+def _transition_from_snapshot(
+    db: Session,
+    order_id: int,
+    new_status: Optional[str],
+    assignments: list[str],
+    conditions: list[str],
+    params: dict[str, Any],
+    user_id: Optional[int],
+    allow_unchanged: bool,
+    within_cancellation_window: bool,
+) -> dict[str, Any]:
+    # Edits to the day, city or amount move the order between rollup rows,
+    # which needs the values it was counted under. They are read first and
+    # the UPDATE only matches if they are still current, so a concurrent
+    # edit makes it match nothing and the read is retried.
+    sources = transition_sources(new_status, allow_unchanged) if new_status is not None else None
+    previous = None
+    for _ in range(SNAPSHOT_ATTEMPTS):
+        row = db.execute(
+            text(f"SELECT order_status, {', '.join(sorted(ROLLUP_COLUMNS))} FROM orders WHERE order_id = :order_id"),
+            {"order_id": order_id},
+        ).mappings().first()
+        current = dict(row) if row else None
+        if current is None or current == previous or (sources is not None and current["order_status"] not in sources):
+            break
+        previous = current
+        snapshot = {f"previous_{column}": value for column, value in previous.items()}
+        updated = _update(
+            db,
+            assignments,
+            [*conditions, *(f"{column} = :previous_{column}" for column in previous)],
+            {**params, **snapshot},
+            None,
+        )
+        if updated is not None:
+            _apply_counters(db, order_id, counts_toward_sales(previous["order_status"]), previous, updated)
+            return updated
+    raise _explain_failure(db, order_id, new_status, sources or [], user_id, within_cancellation_window)
+
+
+def _apply_counters(
+    db: Session,
+    order_id: int,
+    was_counted: bool,
+    previous: Optional[dict[str, Any]],
+    updated: dict[str, Any],
+) -> None:
+    # Keeps item_sales_stats and the daily rollups in step with the order.
+    # previous holds the day, city and amount before the update when they
+    # may have changed; otherwise they are the same as in updated.
+    before = previous or updated
+    is_counted = counts_toward_sales(updated["order_status"])
+    # str() because the drivers return order_date as a date or an ISO string.
+    moved = any(str(before[column]) != str(updated[column]) for column in ROLLUP_COLUMNS)
+    if was_counted == is_counted and not (is_counted and moved):
+        return
+    lines = fetch_rollup_lines(db, order_id)
+    if was_counted != is_counted:
+        apply_item_sales_deltas(db, order_line_deltas(lines, 1 if is_counted else -1))
+    if was_counted:
+        apply_order_rollups(db, before, lines, -1)
+    if is_counted:
+        apply_order_rollups(db, updated, lines, 1)
+
+
+def _update(
+    db: Session,
+    assignments: list[str],
+    conditions: list[str],
+    params: dict[str, Any],
+    statuses: Optional[list[str]],
+) -> Optional[dict[str, Any]]:
+    if statuses is not None:
+        conditions = [*conditions, "order_status IN :from_statuses"]
+        params = {**params, "from_statuses": statuses}
+    stmt = text(f"UPDATE orders SET {', '.join(assignments)} WHERE {' AND '.join(conditions)} RETURNING *")
+    binds = [bindparam(column, type_=Date()) for column in sorted(DATE_COLUMNS & params.keys())]
+    if statuses is not None:
+        binds.append(bindparam("from_statuses", expanding=True))
+    if binds:
+        stmt = stmt.bindparams(*binds)
+    row = db.execute(stmt, params).mappings().first()
+    return dict(row) if row else None
+
+
+def _explain_failure(
+    db: Session,
+    order_id: int,
+    new_status: Optional[str],
+    sources: list[str],
+    user_id: Optional[int],
+    within_cancellation_window: bool,
+) -> OrderTransitionError:
+    # Only reached when the UPDATE matched nothing; reads the order once to
+    # say why. The row may have changed since, so this describes the state
+    # that lost the race rather than guaranteeing it.
+    current = db.execute(
+        text("SELECT user_id, order_status, order_date FROM orders WHERE order_id = :order_id"),
+        {"order_id": order_id},
+    ).mappings().first()
+    if current is None:
+        return OrderNotFoundError(order_id)
+    if user_id is not None and current["user_id"] != user_id:
+        return OrderOwnershipError("You can change only your own orders")
+    if new_status is not None and current["order_status"] not in sources:
+        if not ORDER_TRANSITIONS[current["order_status"]]:
+            return InvalidTransitionError(f"Order already {current['order_status']}")
+        return InvalidTransitionError(f"Cannot change order from {current['order_status']} to {new_status}")
+    if within_cancellation_window and str(current["order_date"]) < cancellation_cutoff():
+        return CancellationWindowError(
+            f"Cancellation window expired (allowed within {CANCELLATION_WINDOW_DAYS} day of order date)"
+        )
+    return OrderConflictError("Order was changed by another request; reload it and try again")
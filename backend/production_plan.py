@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from db_models import OPEN_ORDER_PREDICATE
+
+
+# The kitchen's production plan: how much of each item to cook for pending
+# and confirmed orders, per delivery date. The orders are found through the
+# partial index ix_orders_open_delivery_date, which holds only open orders,
+# so the query reads the orders due in the range and their lines, never the
+# delivered and cancelled history.
+
+# Longest range one plan may cover.
+MAX_PLAN_DAYS = 31
+
+
+class InvalidProductionPlanRangeError(ValueError):
+    pass
+
+
+def production_plan_range(day: date | None, date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    # `day` plans a single date; otherwise from/to, each defaulting to the
+    # other, and to today when neither is given.
+    if day is not None:
+        if date_from is not None or date_to is not None:
+            raise InvalidProductionPlanRangeError("Use either date or from/to, not both")
+        return day, day
+    date_from = date_from or date_to or date.today()
+    date_to = date_to or date_from
+    if date_from > date_to:
+        raise InvalidProductionPlanRangeError("from must not be after to")
+    if (date_to - date_from).days >= MAX_PLAN_DAYS:
+        raise InvalidProductionPlanRangeError(f"A production plan covers at most {MAX_PLAN_DAYS} days")
+    return date_from, date_to
+
+
+def _by_quantity(line: dict[str, Any]) -> tuple:
+    return (-line["quantity"], line["item_name"], line["item_id"])
+
+
+def fetch_production_plan(db: Session, date_from: date, date_to: date) -> dict[str, Any]:
+    # One statement for the per-day order counts (item_id NULL) and the
+    # per-day item lines, so both come from the same snapshot: under READ
+    # COMMITTED two queries could see a line for a day the first one missed.
+    rows = db.execute(
+        text(
+            f"""
+            SELECT delivery_date, NULL AS item_id, NULL AS item_name, NULL AS weight,
+                   NULL AS quantity, COUNT(*) AS orders
+            FROM orders
+            WHERE {OPEN_ORDER_PREDICATE}
+              AND delivery_date >= :date_from AND delivery_date <= :date_to
+            GROUP BY delivery_date
+            UNION ALL
+            SELECT o.delivery_date, od.item_id, i.item_name, i.weight,
+                   SUM(od.quantity) AS quantity, COUNT(DISTINCT o.order_id) AS orders
+            FROM orders o
+            JOIN order_details od ON od.order_id = o.order_id
+            JOIN items i ON i.item_id = od.item_id
+            WHERE {OPEN_ORDER_PREDICATE}
+              AND o.delivery_date >= :date_from AND o.delivery_date <= :date_to
+            GROUP BY o.delivery_date, od.item_id, i.item_name, i.weight
+            ORDER BY delivery_date ASC
+            """
+        ),
+        {"date_from": date_from.isoformat(), "date_to": date_to.isoformat()},
+    ).mappings().all()
+
+    days: dict[str, dict[str, Any]] = {}
+    totals: dict[int, dict[str, Any]] = {}
+    for row in rows:
+        day = days.setdefault(
+            str(row["delivery_date"]), {"delivery_date": row["delivery_date"], "orders": 0, "items": []}
+        )
+        if row["item_id"] is None:
+            day["orders"] = row["orders"]
+            continue
+        line = {
+            "item_id": row["item_id"],
+            "item_name": row["item_name"],
+            "weight": row["weight"],
+            "quantity": row["quantity"],
+            "orders": row["orders"],
+        }
+        day["items"].append(line)
+        total = totals.setdefault(row["item_id"], {**line, "quantity": 0, "orders": 0})
+        total["quantity"] += row["quantity"]
+        total["orders"] += row["orders"]
+
+    for day in days.values():
+        day["items"].sort(key=_by_quantity)
+    return {
+        "from": date_from,
+        "to": date_to,
+        "orders": sum(day["orders"] for day in days.values()),
+        "items": sorted(totals.values(), key=_by_quantity),
+        "days": list(days.values()),
+    }
@@ -0,0 +1,183 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from settings import DEBUG, IS_PRODUCTION, SQL_PROFILER_REPEAT_THRESHOLD, SQL_PROFILER_SLOW_MS
+
+
+# Debug-only SQL profiler. With DEBUG on every request is profiled; outside
+# production a request can opt in with the X-Profile-SQL header. A profiled
+# request records each statement it runs, flags statement shapes repeated
+# SQL_PROFILER_REPEAT_THRESHOLD or more times (N+1 loops), captures EXPLAIN
+# output for statements slower than SQL_PROFILER_SLOW_MS, and answers with
+# a Server-Timing header that browser devtools show next to the request.
+
+logger = logging.getLogger(__name__)
+
+PROFILER_AVAILABLE = DEBUG or not IS_PRODUCTION
+PROFILE_HEADER = b"x-profile-sql"
+EXPLAINABLE_STATEMENTS = ("select", "with", "insert", "update", "delete")
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Expanding IN parameters render one placeholder per value; collapse them so
+# the same lookup with a different list length keeps one shape.
+_IN_LISTS = re.compile(r"\bIN \((?:\?|%s|%\(\w+\)s|:\w+)(?:, ?(?:\?|%s|%\(\w+\)s|:\w+))*\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _LITERALS.sub("?", shape)
+    return _IN_LISTS.sub("IN (...)", shape)
+
+
+class RequestProfile:
+    __slots__ = ("statements", "explains", "serialize_seconds", "explain_seconds")
+
+    def __init__(self):
+        # (shape, seconds) per statement, in execution order
+        self.statements: list[tuple[str, float]] = []
+        self.explains: list[dict[str, Any]] = []
+        self.serialize_seconds = 0.0
+        self.explain_seconds = 0.0
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def repeated_shapes(self) -> list[tuple[str, int, float]]:
+        totals: dict[str, list[float]] = {}
+        for shape, seconds in self.statements:
+            entry = totals.setdefault(shape, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        return [
+            (shape, int(count), seconds)
+            for shape, (count, seconds) in totals.items()
+            if count >= SQL_PROFILER_REPEAT_THRESHOLD
+        ]
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+@contextmanager
+def profile_phase(phase: str) -> Iterator[None]:
+    # Only "serialize" is tracked separately today; everything else is app time.
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if phase == "serialize":
+            profile.serialize_seconds += time.perf_counter() - started
+
+
+def _explain(conn, statement: str, parameters) -> list[str]:
+    # Runs on a fresh DBAPI cursor so the profiled statement's results are
+    # untouched. EXPLAIN without ANALYZE never executes the statement. On
+    # Postgres a savepoint keeps a failed EXPLAIN from aborting the
+    # request's transaction.
+    sqlite = conn.dialect.name == "sqlite"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if not sqlite:
+            cursor.execute("SAVEPOINT sql_profiler_explain")
+        try:
+            cursor.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters)
+            return [str(row[-1]) for row in cursor.fetchall()]
+        except Exception as exc:
+            if not sqlite:
+                cursor.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+            return [f"EXPLAIN failed: {exc}"]
+        finally:
+            if not sqlite:
+                cursor.execute("RELEASE SAVEPOINT sql_profiler_explain")
+    finally:
+        cursor.close()
+
+
+def profile_statement(conn, statement: str, parameters, seconds: float, executemany: bool) -> None:
+    # Called from the engine's after_cursor_execute hook.
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    shape = statement_shape(statement)
+    profile.statements.append((shape, seconds))
+    if seconds * 1000 < SQL_PROFILER_SLOW_MS or executemany:
+        return
+    if not statement.lstrip().lower().startswith(EXPLAINABLE_STATEMENTS):
+        return
+    started = time.perf_counter()
+    plan = _explain(conn, statement, parameters)
+    profile.explain_seconds += time.perf_counter() - started
+    profile.explains.append({"statement": shape, "ms": round(seconds * 1000, 2), "plan": plan})
+
+
+def _server_timing(profile: RequestProfile, total_seconds: float) -> str:
+    db_seconds = profile.db_seconds
+    app_seconds = max(total_seconds - db_seconds - profile.serialize_seconds - profile.explain_seconds, 0.0)
+    repeated = len(profile.repeated_shapes())
+    db_description = f"{len(profile.statements)} statements" + (f", {repeated} repeated" if repeated else "")
+    entries = [
+        f'db;dur={db_seconds * 1000:.2f};desc="{db_description}"',
+        f"app;dur={app_seconds * 1000:.2f}",
+        f"serialize;dur={profile.serialize_seconds * 1000:.2f}",
+    ]
+    if profile.explains:
+        entries.append(f'explain;dur={profile.explain_seconds * 1000:.2f};desc="{len(profile.explains)} slow"')
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def _log_profile(method: str, path: str, profile: RequestProfile, total_seconds: float) -> None:
+    repeated = profile.repeated_shapes()
+    level = logging.WARNING if repeated or profile.explains else logging.DEBUG
+    if not logger.isEnabledFor(level):
+        return
+    lines = [
+        f"{method} {path}: {len(profile.statements)} statements, "
+        f"db {profile.db_seconds * 1000:.1f} ms of {total_seconds * 1000:.1f} ms"
+    ]
+    for shape, count, seconds in repeated:
+        lines.append(f"  repeated {count}x ({seconds * 1000:.1f} ms): {shape}")
+    for explain in profile.explains:
+        lines.append(f"  slow ({explain['ms']} ms): {explain['statement']}")
+        lines.extend(f"    {step}" for step in explain["plan"])
+    logger.log(level, "\n".join(lines))
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (DEBUG or any(name == PROFILE_HEADER for name, _ in scope["headers"])):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                # Work done while a streamed body is sent lands after the header,
+                # so it shows up in the log line only.
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(profile, time.perf_counter() - started).encode()))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            _log_profile(scope["method"], scope["path"], profile, time.perf_counter() - started)
@@ -0,0 +1,246 @@
+from collections.abc import Iterable, Mapping
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+
+# Per-day sales rollups for the admin analytics endpoints:
+#   daily_sales       day -> orders, revenue, items_sold
+#   daily_item_sales  (day, item_id) -> quantity, revenue
+#   daily_city_sales  (day, city) -> orders, revenue
+# Cancelled orders are left out. Order revenue is orders.amount, item revenue
+# is quantity * price of the order lines. Like item_sales_stats, writers
+# apply deltas inside their own transaction, so the rollups commit (or roll
+# back) together with the order rows they describe.
+
+# Range the analytics endpoints report when no dates are given.
+DEFAULT_ANALYTICS_DAYS = 90
+
+
+class InvalidAnalyticsRangeError(ValueError):
+    pass
+
+
+def _day(value: date | str) -> str:
+    # Postgres returns DATE columns as date objects, SQLite as ISO strings.
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _upsert(db: Session, table: str, keys: tuple[str, ...], columns: tuple[str, ...], rows: list[tuple]) -> None:
+    # One multi-row upsert per table; keys must be unique across rows, which
+    # Postgres requires for ON CONFLICT DO UPDATE.
+    if not rows:
+        return
+    names = keys + columns
+    values = ", ".join(
+        "(" + ", ".join(f":{name}_{index}" for name in names) + ")" for index in range(len(rows))
+    )
+    params: dict[str, Any] = {}
+    for index, row in enumerate(rows):
+        for name, value in zip(names, row):
+            params[f"{name}_{index}"] = value
+    updates = ", ".join(f"{column} = {table}.{column} + excluded.{column}" for column in columns)
+    db.execute(
+        text(
+            f"""
+            INSERT INTO {table} ({', '.join(names)})
+            VALUES {values}
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE
+            SET {updates}
+            """
+        ),
+        params,
+    )
+
+
+def _item_totals(lines: Iterable[Mapping[str, Any]], sign: int) -> list[tuple[int, int, int]]:
+    per_item: dict[int, list[int]] = {}
+    for line in lines:
+        totals = per_item.setdefault(line["item_id"], [0, 0])
+        totals[0] += sign * line["quantity"]
+        totals[1] += sign * line["quantity"] * line["price"]
+    return [(item_id, quantity, revenue) for item_id, (quantity, revenue) in sorted(per_item.items()) if quantity or revenue]
+
+
+def _apply(db: Session, day: str, items: list[tuple[int, int, int]], orders: int, revenue: int) -> None:
+    if items:
+        _upsert(
+            db,
+            "daily_item_sales",
+            ("day", "item_id"),
+            ("quantity", "revenue"),
+            [(day, item_id, quantity, item_revenue) for item_id, quantity, item_revenue in items],
+        )
+    items_sold = sum(quantity for _, quantity, _ in items)
+    if orders or revenue or items_sold:
+        _upsert(db, "daily_sales", ("day",), ("orders", "revenue", "items_sold"), [(day, orders, revenue, items_sold)])
+
+
+def apply_line_rollups(db: Session, day: date | str, lines: Iterable[Mapping[str, Any]], sign: int = 1) -> None:
+    # Lines added to (sign=1) or removed from (sign=-1) a counted order.
+    _apply(db, _day(day), _item_totals(lines, sign), 0, 0)
+
+
+def apply_order_rollups(
+    db: Session,
+    order: Mapping[str, Any],
+    lines: Iterable[Mapping[str, Any]],
+    sign: int = 1,
+) -> None:
+    # Counts (sign=1) or uncounts (sign=-1) a whole order: at most three
+    # upserts. `order` needs order_date, city and amount, each line item_id,
+    # quantity and price. Callers skip cancelled orders.
+    day = _day(order["order_date"])
+    _apply(db, day, _item_totals(lines, sign), sign, sign * order["amount"])
+    _upsert(db, "daily_city_sales", ("day", "city"), ("orders", "revenue"), [(day, order["city"], sign, sign * order["amount"])])
+
+
+def fetch_rollup_lines(db: Session, order_id: int) -> list[dict[str, Any]]:
+    rows = db.execute(
+        text("SELECT item_id, quantity, price FROM order_details WHERE order_id = :order_id"),
+        {"order_id": order_id},
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def rebuild_sales_rollups(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+    # Recomputes the rollups from orders and order_details, for every day or
+    # for an inclusive day range. Returns the number of daily_sales rows.
+    order_conditions = ["o.order_status <> 'cancelled'"]
+    day_conditions = ["1 = 1"]
+    params: dict[str, Any] = {}
+    if date_from is not None:
+        order_conditions.append("o.order_date >= :date_from")
+        day_conditions.append("day >= :date_from")
+        params["date_from"] = date_from.isoformat()
+    if date_to is not None:
+        order_conditions.append("o.order_date <= :date_to")
+        day_conditions.append("day <= :date_to")
+        params["date_to"] = date_to.isoformat()
+    order_filter = " AND ".join(order_conditions)
+    day_filter = " AND ".join(day_conditions)
+
+    for table in ("daily_sales", "daily_item_sales", "daily_city_sales"):
+        db.execute(text(f"DELETE FROM {table} WHERE {day_filter}"), params)
+
+    db.execute(
+        text(
+            f"""
+            INSERT INTO daily_item_sales (day, item_id, quantity, revenue)
+            SELECT o.order_date, od.item_id, SUM(od.quantity), SUM(od.quantity * od.price)
+            FROM orders o
+            JOIN order_details od ON od.order_id = o.order_id
+            WHERE {order_filter}
+            GROUP BY o.order_date, od.item_id
+            """
+        ),
+        params,
+    )
+    db.execute(
+        text(
+            f"""
+            INSERT INTO daily_city_sales (day, city, orders, revenue)
+            SELECT o.order_date, o.city, COUNT(*), SUM(o.amount)
+            FROM orders o
+            WHERE {order_filter}
+            GROUP BY o.order_date, o.city
+            """
+        ),
+        params,
+    )
+    result = db.execute(
+        text(
+            f"""
+            INSERT INTO daily_sales (day, orders, revenue, items_sold)
+            SELECT o.order_date, COUNT(*), SUM(o.amount), COALESCE(SUM(lines.quantity), 0)
+            FROM orders o
+            LEFT JOIN (
+                SELECT order_id, SUM(quantity) AS quantity
+                FROM order_details
+                GROUP BY order_id
+            ) lines ON lines.order_id = o.order_id
+            WHERE {order_filter}
+            GROUP BY o.order_date
+            """
+        ),
+        params,
+    )
+    return result.rowcount
+
+
+def analytics_range(date_from: Optional[date], date_to: Optional[date]) -> tuple[date, date]:
+    # Fills in the last DEFAULT_ANALYTICS_DAYS days ending today (or at date_to).
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_ANALYTICS_DAYS - 1)
+    if date_from > date_to:
+        raise InvalidAnalyticsRangeError("from must not be after to")
+    return date_from, date_to
+
+
+def fetch_daily_sales(db: Session, date_from: date, date_to: date) -> list[dict[str, Any]]:
+    rows = db.execute(
+        text(
+            """
+            SELECT day, orders, revenue, items_sold
+            FROM daily_sales
+            WHERE day >= :date_from AND day <= :date_to AND orders > 0
+            ORDER BY day ASC
+            """
+        ),
+        {"date_from": date_from.isoformat(), "date_to": date_to.isoformat()},
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def fetch_item_sales(db: Session, date_from: date, date_to: date, limit: int) -> list[dict[str, Any]]:
+    rows = db.execute(
+        text(
+            """
+            SELECT s.item_id, i.item_name, s.quantity, s.revenue
+            FROM (
+                SELECT item_id, SUM(quantity) AS quantity, SUM(revenue) AS revenue
+                FROM daily_item_sales
+                WHERE day >= :date_from AND day <= :date_to
+                GROUP BY item_id
+            ) s
+            JOIN items i ON i.item_id = s.item_id
+            WHERE s.quantity > 0
+            ORDER BY s.revenue DESC, s.item_id ASC
+            LIMIT :limit
+            """
+        ),
+        {"date_from": date_from.isoformat(), "date_to": date_to.isoformat(), "limit": limit},
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def fetch_city_sales(db: Session, date_from: date, date_to: date, limit: int) -> list[dict[str, Any]]:
+    rows = db.execute(
+        text(
+            """
+            SELECT city, SUM(orders) AS orders, SUM(revenue) AS revenue
+            FROM daily_city_sales
+            WHERE day >= :date_from AND day <= :date_to
+            GROUP BY city
+            HAVING SUM(orders) > 0
+            ORDER BY revenue DESC, city ASC
+            LIMIT :limit
+            """
+        ),
+        {"date_from": date_from.isoformat(), "date_to": date_to.isoformat(), "limit": limit},
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        rebuilt = rebuild_sales_rollups(session)
+        session.commit()
+    finally:
+        session.close()
+    print(f"Rebuilt sales rollups for {rebuilt} days")
@@ -0,0 +1,127 @@
+from typing import Any, Iterable
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+
+# Quantities ordered per item, excluding cancelled orders. Writers apply
+# deltas inside their own transaction so the counters commit (or roll back)
+# together with the order rows they describe.
+
+
+def apply_item_sales_deltas(db: Session, deltas: dict[int, int]) -> None:
+    changed = [(item_id, quantity) for item_id, quantity in sorted(deltas.items()) if quantity]
+    if not changed:
+        return
+    # One multi-row upsert; item ids are unique after aggregation, which
+    # Postgres requires for ON CONFLICT DO UPDATE.
+    values = ", ".join(f"(:item_id_{index}, :quantity_{index})" for index in range(len(changed)))
+    params: dict[str, int] = {}
+    for index, (item_id, quantity) in enumerate(changed):
+        params[f"item_id_{index}"] = item_id
+        params[f"quantity_{index}"] = quantity
+    db.execute(
+        text(
+            f"""
+            INSERT INTO item_sales_stats (item_id, total_quantity)
+            VALUES {values}
+            ON CONFLICT (item_id) DO UPDATE
+            SET total_quantity = item_sales_stats.total_quantity + excluded.total_quantity
+            """
+        ),
+        params,
+    )
+
+
+def order_line_deltas(lines: Iterable[dict[str, Any]], sign: int = 1) -> dict[int, int]:
+    deltas: dict[int, int] = {}
+    for line in lines:
+        deltas[line["item_id"]] = deltas.get(line["item_id"], 0) + sign * line["quantity"]
+    return deltas
+
+
+def get_top_ordered_item_ids(db: Session, limit: int) -> list[int]:
+    rows = db.execute(
+        text(
+            """
+            SELECT item_id
+            FROM item_sales_stats
+            WHERE total_quantity > 0
+            ORDER BY total_quantity DESC, item_id ASC
+            LIMIT :limit
+            """
+        ),
+        {"limit": limit},
+    ).all()
+    return [row[0] for row in rows]
+
+
+def fetch_top_ordered_items(db: Session, limit: int) -> list[dict[str, Any]]:
+    rows = db.execute(
+        text(
+            """
+            SELECT
+                i.item_id,
+                i.item_name,
+                i.price,
+                i.weight,
+                i.photos,
+                i.videos,
+                i.description,
+                s.total_quantity AS total_quantity_ordered
+            FROM item_sales_stats s
+            JOIN items i ON i.item_id = s.item_id
+            WHERE s.total_quantity > 0
+            ORDER BY s.total_quantity DESC, s.item_id ASC
+            LIMIT :limit
+            """
+        ),
+        {"limit": limit},
+    ).mappings().all()
+    items = [dict(row) for row in rows]
+    if len(items) >= limit:
+        return items
+
+    # Fewer than `limit` items have sales; pad with unsold items like the old LEFT JOIN did.
+    seen_ids = [item["item_id"] for item in items]
+    padding_stmt = text(
+        """
+        SELECT item_id, item_name, price, weight, photos, videos, description,
+               0 AS total_quantity_ordered
+        FROM items
+        WHERE item_id NOT IN :seen_ids
+        ORDER BY item_name ASC
+        LIMIT :limit
+        """
+    ).bindparams(bindparam("seen_ids", expanding=True))
+    padding = db.execute(padding_stmt, {"seen_ids": seen_ids, "limit": limit - len(items)}).mappings().all()
+    return items + [dict(row) for row in padding]
+
+
+def rebuild_item_sales_stats(db: Session) -> int:
+    db.execute(text("DELETE FROM item_sales_stats"))
+    result = db.execute(
+        text(
+            """
+            INSERT INTO item_sales_stats (item_id, total_quantity)
+            SELECT od.item_id, SUM(od.quantity)
+            FROM order_details od
+            JOIN orders o ON o.order_id = od.order_id
+            WHERE o.order_status <> 'cancelled'
+            GROUP BY od.item_id
+            """
+        )
+    )
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        rebuilt = rebuild_item_sales_stats(session)
+        session.commit()
+    finally:
+        session.close()
+    print(f"Rebuilt item_sales_stats for {rebuilt} items")
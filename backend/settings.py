@@ -24,6 +24,38 @@ _load_dotenv()
 APP_ENV = os.getenv("APP_ENV", "development").strip().lower()
 IS_PRODUCTION = APP_ENV in {"production", "prod"}
 DEBUG = os.getenv("DEBUG", "").strip().lower() in {"1", "true", "yes", "on"}
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB_ENABLED", "").strip().lower() in {"1", "true", "yes", "on"}
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").strip().lower() in {"1", "true", "yes", "on"}
+DB_POOL_WAIT_WARN_MS = float(os.getenv("DB_POOL_WAIT_WARN_MS", "100"))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_GROUP_COMMIT = os.getenv("SQLITE_GROUP_COMMIT", "").strip().lower() in {"1", "true", "yes", "on"}
+SQLITE_GROUP_COMMIT_MAX_BATCH = int(os.getenv("SQLITE_GROUP_COMMIT_MAX_BATCH", "64"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+# Each worker caches principals on its own and only hears about the user
+# writes it handles itself, so a role change or delete made through another
+# worker can take up to this long to reach requests served here.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+SQL_PROFILER_SLOW_MS = float(os.getenv("SQL_PROFILER_SLOW_MS", "25"))
+SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILER_REPEAT_THRESHOLD", "3"))
+FRONTEND_ENABLED = os.getenv("FRONTEND_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+FRONTEND_DIR = os.getenv("FRONTEND_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend"))
+MEDIA_DIR = os.getenv("MEDIA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media"))
+MEDIA_URL_PATH = "/media"
+IMAGE_UPLOAD_MAX_BYTES = int(os.getenv("IMAGE_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "1"))
 
 DEFAULT_PRODUCTION_ORIGINS = [
     "https://home-bites-frontend.onrender.com",
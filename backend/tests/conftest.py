@@ -0,0 +1,58 @@
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# database.py creates its engine on import, so the URL is set before any
+# backend module is loaded. TEST_DATABASE_URL runs the suite against an empty
+# scratch database instead, for example Postgres; the tests write to it.
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or (
+    f"sqlite+pysqlite:///{Path(tempfile.mkdtemp(prefix='homebites-tests-')) / 'tests.db'}"
+)
+os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(48))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+from database import SessionLocal  # noqa: E402
+from tests.support import clear_tables  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    # No ini file: alembic.ini sets up logging and resolves script_location
+    # against the working directory, which is wherever pytest was started.
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        clear_tables()
+
+
+@pytest.fixture
+def app(db):
+    # Requests run without the startup and shutdown hooks: the schema is
+    # migrated already, and shutdown would stop the password hashing pool.
+    import auth
+    from catalog import catalog_cache
+    from main import app
+
+    yield app
+    # Cleared tables hand out the same ids again, so nothing cached survives a test.
+    auth._token_cache.clear()
+    auth._principal_cache.clear()
+    catalog_cache.invalidate()
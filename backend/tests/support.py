@@ -0,0 +1,109 @@
+from datetime import date
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import IS_SQLITE, SessionLocal
+from db_models import Base
+from order_service import create_order_with_items
+
+
+# Search tables that live outside the ORM metadata (see db_models.py).
+SEARCH_TABLES = ("user_search", "item_search") if IS_SQLITE else ("item_search",)
+
+ROLLUP_TABLES = {
+    "daily_sales": ("day",),
+    "daily_item_sales": ("day", "item_id"),
+    "daily_city_sales": ("day", "city"),
+}
+
+
+def clear_tables() -> None:
+    with SessionLocal() as session:
+        for table in SEARCH_TABLES:
+            session.execute(text(f"DELETE FROM {table}"))
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+
+
+def add_user(
+    db: Session,
+    email: str = "customer@example.com",
+    *,
+    name: str = "Customer",
+    phone_number: int = 9000000001,
+    role: str = "user",
+    password: str = "x",
+    city: str = "Vizag",
+) -> int:
+    # password is stored as given; pass a hash_password() result to log in.
+    return db.execute(
+        text(
+            """
+            INSERT INTO users (name, phone_number, email, password, role, address, city)
+            VALUES (:name, :phone_number, :email, :password, :role, 'Test Street', :city)
+            RETURNING user_id
+            """
+        ),
+        {"name": name, "phone_number": phone_number, "email": email, "password": password, "role": role, "city": city},
+    ).scalar_one()
+
+
+def add_item(db: Session, name: str = "Item", price: int = 100) -> int:
+    return db.execute(
+        text(
+            """
+            INSERT INTO items (item_name, price, weight, photos, videos, description)
+            VALUES (:name, :price, '250g', '', '', '')
+            RETURNING item_id
+            """
+        ),
+        {"name": name, "price": price},
+    ).scalar_one()
+
+
+def place_order(
+    db: Session,
+    user_id: int,
+    items: dict[int, int],
+    *,
+    order_date: date,
+    order_status: str = "pending",
+    city: str = "Vizag",
+) -> int:
+    # items maps item_id -> quantity; prices come from the items table.
+    return create_order_with_items(
+        db,
+        user_id=user_id,
+        items=[{"item_id": item_id, "quantity": quantity} for item_id, quantity in items.items()],
+        order_status=order_status,
+        payment_status="pending",
+        payment_mode="cash",
+        order_date=order_date.isoformat(),
+        delivery_date=order_date.isoformat(),
+        address="Test Street",
+        city=city,
+    )["order_id"]
+
+
+def fetch_rollups(db: Session) -> dict[str, list[dict[str, Any]]]:
+    # Rollup rows with something in them; reversals leave zeroed rows behind.
+    rollups = {}
+    for table, keys in ROLLUP_TABLES.items():
+        rows = db.execute(text(f"SELECT * FROM {table} ORDER BY {', '.join(keys)}")).mappings().all()
+        rollups[table] = [
+            {column: str(value) if column == "day" else value for column, value in row.items()}
+            for row in rows
+            if any(value for column, value in row.items() if column not in keys)
+        ]
+    return rollups
+
+
+def login(app, email: str, password: str) -> TestClient:
+    client = TestClient(app)
+    response = client.post("/login", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    return client
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from auth import (
+    create_access_token,
+    get_auth_cache_stats,
+    hash_password,
+    invalidate_principal,
+    rehash_password_in_background,
+    verify_password,
+)
+from tests.support import add_user, login
+
+
+CUSTOMER_PASSWORD = "customer-pass"
+ADMIN_PASSWORD = "admin-pass"
+
+
+@pytest.fixture
+def accounts(app, db):
+    customer_id = add_user(db, "customer@example.com", password=hash_password(CUSTOMER_PASSWORD))
+    add_user(
+        db,
+        "admin@example.com",
+        name="Admin",
+        phone_number=9000000002,
+        role="admin",
+        password=hash_password(ADMIN_PASSWORD),
+    )
+    db.commit()
+    return {
+        "customer_id": customer_id,
+        "customer": login(app, "customer@example.com", CUSTOMER_PASSWORD),
+        "admin": login(app, "admin@example.com", ADMIN_PASSWORD),
+    }
+
+
+def _rename_behind_the_cache(db, user_id: int, name: str) -> None:
+    # Another worker's write: this process is not told about it.
+    db.execute(text("UPDATE users SET name = :name WHERE user_id = :user_id"), {"name": name, "user_id": user_id})
+    db.commit()
+
+
+def test_repeat_requests_reuse_the_cached_principal(accounts, db):
+    customer = accounts["customer"]
+    assert customer.get("/me").json()["name"] == "Customer"
+    hits = get_auth_cache_stats()["principal_hits"]
+
+    _rename_behind_the_cache(db, accounts["customer_id"], "Renamed Elsewhere")
+    assert customer.get("/me").json()["name"] == "Customer"
+    assert get_auth_cache_stats()["principal_hits"] == hits + 1
+
+    invalidate_principal(accounts["customer_id"])
+    assert customer.get("/me").json()["name"] == "Renamed Elsewhere"
+
+
+def test_each_session_caches_its_own_principal(app, accounts, db):
+    first = accounts["customer"]
+    # A second token for the same user, e.g. another device.
+    token = create_access_token({"sub": str(accounts["customer_id"])}, timedelta(minutes=5))
+    second = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+    first.get("/me")
+    misses = get_auth_cache_stats()["principal_misses"]
+
+    _rename_behind_the_cache(db, accounts["customer_id"], "Renamed Elsewhere")
+    assert second.get("/me").json()["name"] == "Renamed Elsewhere"
+    assert get_auth_cache_stats()["principal_misses"] == misses + 1
+    assert first.get("/me").json()["name"] == "Customer"
+
+    # Invalidation drops every session of the user.
+    _rename_behind_the_cache(db, accounts["customer_id"], "Renamed Again")
+    invalidate_principal(accounts["customer_id"])
+    assert first.get("/me").json()["name"] == "Renamed Again"
+    assert second.get("/me").json()["name"] == "Renamed Again"
+
+
+def test_admin_update_takes_effect_on_the_next_request(accounts):
+    customer = accounts["customer"]
+    assert customer.get("/admin/cache/auth").status_code == 403
+
+    response = accounts["admin"].put(
+        f"/users/{accounts['customer_id']}",
+        json={
+            "name": "Promoted",
+            "phone_number": 9000000001,
+            "email": "customer@example.com",
+            "password": CUSTOMER_PASSWORD,
+            "role": "admin",
+            "address": "Test Street",
+            "city": "Vizag",
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    assert customer.get("/admin/cache/auth").status_code == 200
+    assert customer.get("/me").json()["name"] == "Promoted"
+
+
+def test_profile_update_takes_effect_on_the_next_request(accounts):
+    customer = accounts["customer"]
+    customer.get("/me")
+    response = customer.put("/me/profile", json={"name": "New Name", "address": "New Street", "city": "Guntur"})
+    assert response.status_code == 200, response.text
+
+    me = customer.get("/me").json()
+    assert (me["name"], me["city"]) == ("New Name", "Guntur")
+
+
+def test_deleted_user_loses_access_at_once(accounts):
+    customer = accounts["customer"]
+    assert customer.get("/me").status_code == 200
+
+    response = accounts["admin"].delete(f"/users/{accounts['customer_id']}")
+    assert response.status_code == 200, response.text
+    assert customer.get("/me").status_code == 401
+
+
+def _stored_password(db, user_id: int) -> str:
+    db.rollback()
+    return db.execute(text("SELECT password FROM users WHERE user_id = :user_id"), {"user_id": user_id}).scalar_one()
+
+
+def test_login_upgrades_a_legacy_password(app, db):
+    user_id = add_user(db, password="legacy-pass")
+    db.commit()
+    login(app, "customer@example.com", "legacy-pass")
+
+    stored = _stored_password(db, user_id)
+    assert stored.startswith("$2") and verify_password("legacy-pass", stored)
+
+
+def test_stale_rehash_leaves_a_changed_password_alone(db):
+    user_id = add_user(db, password="legacy-pass")
+    changed = hash_password("changed-pass")
+    db.execute(text("UPDATE users SET password = :password WHERE user_id = :user_id"), {"password": changed, "user_id": user_id})
+    db.commit()
+
+    asyncio.run(rehash_password_in_background(user_id, "legacy-pass", "legacy-pass"))
+    assert _stored_password(db, user_id) == changed
@@ -0,0 +1,87 @@
+import pytest
+
+from auth import hash_password
+from catalog import CatalogCache
+from tests.support import add_item, add_user, login
+
+
+def _names(items: list[dict]) -> list[str]:
+    return [item["item_name"] for item in items]
+
+
+def test_reads_are_served_from_the_snapshot_until_invalidated(db):
+    cache = CatalogCache(ttl_seconds=60)
+    add_item(db, "Laddu")
+    db.commit()
+
+    assert _names(cache.get(db)[0]) == ["Laddu"]
+    add_item(db, "Murukku")
+    db.commit()
+    assert _names(cache.get(db)[0]) == ["Laddu"]
+
+    cache.invalidate()
+    items, items_by_id = cache.get(db)
+    assert _names(items) == ["Laddu", "Murukku"]
+    assert set(items_by_id) == {item["item_id"] for item in items}
+    stats = cache.stats()
+    assert (stats["refreshes"], stats["hits"], stats["invalidations"]) == (2, 1, 1)
+
+
+def test_snapshot_expires_after_the_ttl(db):
+    cache = CatalogCache(ttl_seconds=0)
+    add_item(db, "Laddu")
+    db.commit()
+    cache.get(db)
+    add_item(db, "Murukku")
+    db.commit()
+    assert _names(cache.get(db)[0]) == ["Laddu", "Murukku"]
+
+
+def test_readers_that_cannot_wait_get_the_previous_snapshot(db):
+    cache = CatalogCache(ttl_seconds=60)
+    add_item(db, "Laddu")
+    db.commit()
+    cache.get(db)
+    cache.invalidate()
+
+    # Another request is mid-refresh.
+    with cache._refresh_lock:
+        assert _names(cache.get(db, wait=False)[0]) == ["Laddu"]
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_encoded_catalog_follows_the_snapshot(db):
+    cache = CatalogCache(ttl_seconds=60)
+    add_item(db, "Laddu")
+    db.commit()
+    first = cache.get_json(db)
+    assert cache.get_json(db) is first
+
+    cache.invalidate()
+    add_item(db, "Murukku")
+    db.commit()
+    assert b"Murukku" in cache.get_json(db)
+
+
+@pytest.fixture
+def admin(app, db):
+    add_user(db, "admin@example.com", role="admin", password=hash_password("admin-pass"))
+    db.commit()
+    return login(app, "admin@example.com", "admin-pass")
+
+
+def test_item_writes_show_up_on_the_next_read(admin):
+    payload = {"item_name": "Laddu", "price": 120, "weight": "250g", "photos": "", "videos": "", "description": "sweet"}
+    assert admin.get("/items").json() == []
+
+    item_id = admin.post("/items/", json=payload).json()["item_id"]
+    assert _names(admin.get("/items").json()) == ["Laddu"]
+
+    response = admin.put(f"/items/{item_id}", json={**payload, "item_name": "Besan Laddu"})
+    assert response.status_code == 200, response.text
+    assert _names(admin.get("/items").json()) == ["Besan Laddu"]
+    assert admin.get(f"/items/{item_id}").json()["item_name"] == "Besan Laddu"
+
+    assert admin.delete(f"/items/{item_id}").status_code == 200
+    assert admin.get("/items").json() == []
+    assert admin.get(f"/items/{item_id}").status_code == 404
@@ -0,0 +1,132 @@
+import base64
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from db_utils import InvalidCursorError, build_page, decode_cursor, encode_cursor, fetch_page
+from order_service import fetch_order_page
+from tests.support import add_item, add_user, place_order
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+@pytest.mark.parametrize("key", [0, 42, ["2026-01-05", 17], ["Hyderabad", "Asha", 3]])
+def test_cursor_round_trips(key):
+    cursor = encode_cursor(key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_missing_cursor_means_first_page(cursor):
+    assert decode_cursor(cursor) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        "ünïcode",
+        base64.urlsafe_b64encode(b"not json").decode("ascii"),
+        _raw_cursor({"key": 1}),
+        _raw_cursor({"k": "1"}),
+        _raw_cursor({"k": 1.5}),
+        _raw_cursor({"k": []}),
+        _raw_cursor({"k": [1, None]}),
+        _raw_cursor({"k": {"order_id": 1}}),
+        _raw_cursor([1]),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_build_page_uses_the_extra_row_only_as_a_signal():
+    rows = [{"order_date": date(2026, 1, day), "order_id": day} for day in (3, 2, 1)]
+    page = build_page(rows, ("order_date", "order_id"), 2)
+    assert page["items"] == rows[:2]
+    assert decode_cursor(page["next_cursor"]) == ["2026-01-02", 2]
+
+    last_page = build_page(rows, ("order_date", "order_id"), 3)
+    assert last_page["next_cursor"] is None
+
+
+@pytest.fixture
+def orders(db):
+    # Several orders per day, placed out of date order, so order_id alone
+    # does not follow order_date.
+    user_id = add_user(db)
+    item_id = add_item(db)
+    days = [5, 3, 5, 1, 3, 5, 2, 1, 4]
+    statuses = ["pending", "confirmed"]
+    for index, day in enumerate(days):
+        place_order(db, user_id, {item_id: 1}, order_date=date(2026, 1, day), order_status=statuses[index % 2])
+    db.commit()
+    return db
+
+
+def _all_pages(fetch) -> list[int]:
+    seen = []
+    cursor = None
+    while True:
+        page = fetch(cursor)
+        seen.extend(row["order_id"] for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def _expected(db, where: str) -> list[int]:
+    return list(
+        db.execute(text(f"SELECT order_id FROM orders WHERE {where} ORDER BY order_date DESC, order_id DESC")).scalars()
+    )
+
+
+def test_date_range_pages_follow_the_composite_key(orders):
+    seen = _all_pages(
+        lambda cursor: fetch_order_page(orders, cursor, 2, date_from=date(2026, 1, 2), date_to=date(2026, 1, 5))
+    )
+    assert seen == _expected(orders, "order_date >= '2026-01-02'")
+    assert len(seen) == len(set(seen))
+
+
+def test_status_and_date_range_pages(orders):
+    seen = _all_pages(
+        lambda cursor: fetch_order_page(
+            orders, cursor, 2, date_from=date(2026, 1, 1), date_to=date(2026, 1, 5), order_status="confirmed"
+        )
+    )
+    assert seen == _expected(orders, "order_status = 'confirmed'")
+
+
+def test_single_key_pages_in_both_directions(orders):
+    ascending = _all_pages(lambda cursor: fetch_page(orders, "orders", "order_id", "order_id", cursor, 4))
+    descending = _all_pages(
+        lambda cursor: fetch_page(orders, "orders", "order_id", "order_id", cursor, 4, descending=True)
+    )
+    assert ascending == sorted(ascending)
+    assert descending == ascending[::-1]
+    assert len(ascending) == 9
+
+
+def test_include_total_counts_the_filtered_rows(orders):
+    page = fetch_order_page(orders, None, 2, include_total=True, order_status="pending")
+    assert page["total"] == 5
+    assert len(page["items"]) == 2
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor(["2026-01-05", 3]), encode_cursor([3])])
+def test_single_key_rejects_a_composite_cursor(orders, cursor):
+    with pytest.raises(InvalidCursorError):
+        fetch_page(orders, "orders", "*", "order_id", cursor, 2)
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor(3), encode_cursor(["2026-01-05"])])
+def test_composite_key_rejects_a_mismatched_cursor(orders, cursor):
+    with pytest.raises(InvalidCursorError):
+        fetch_order_page(orders, cursor, 2, date_from=date(2026, 1, 1))
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from database import IS_SQLITE, GroupCommitWriter, SessionLocal
+
+
+pytestmark = pytest.mark.skipif(not IS_SQLITE, reason="the group commit writer is for SQLite")
+
+
+def _add_item(name: str):
+    def work(db):
+        return db.execute(
+            text("INSERT INTO items (item_name, price, weight) VALUES (:name, 10, '1kg') RETURNING item_id"),
+            {"name": name},
+        ).scalar_one()
+
+    return work
+
+
+def _add_item_then_fail(name: str):
+    def work(db):
+        _add_item(name)(db)
+        raise ValueError(f"{name} failed")
+
+    return work
+
+
+def _item_names(db) -> list[str]:
+    db.rollback()
+    return list(db.execute(text("SELECT item_name FROM items ORDER BY item_id")).scalars())
+
+
+@pytest.fixture
+def writer(db):
+    writer = GroupCommitWriter(SessionLocal, max_batch=8)
+    yield writer
+    writer.close()
+
+
+def _queue_behind_a_gate(writer, jobs) -> list:
+    # The first job holds the writer thread until the rest are queued, so
+    # they are all written in the next batch.
+    started = threading.Event()
+    gate = threading.Event()
+
+    def hold(db):
+        started.set()
+        return gate.wait(5)
+
+    gate_future = writer.submit(hold)
+    assert started.wait(5)
+    futures = [writer.submit(job) for job in jobs]
+    gate.set()
+    gate_future.result(timeout=5)
+    return futures
+
+
+def test_jobs_queued_together_share_one_commit(db, writer):
+    futures = _queue_behind_a_gate(writer, [_add_item(f"Item {n}") for n in range(3)])
+    item_ids = [future.result(timeout=5) for future in futures]
+
+    assert len(set(item_ids)) == 3
+    assert _item_names(db) == ["Item 0", "Item 1", "Item 2"]
+    stats = writer.stats()
+    assert (stats["jobs"], stats["batches"], stats["largest_batch"]) == (4, 2, 3)
+
+
+def test_a_failing_job_is_rolled_back_alone(db, writer):
+    futures = _queue_behind_a_gate(writer, [_add_item("Before"), _add_item_then_fail("Broken"), _add_item("After")])
+
+    assert futures[0].result(timeout=5)
+    with pytest.raises(ValueError, match="Broken failed"):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5)
+    assert _item_names(db) == ["Before", "After"]
+    stats = writer.stats()
+    assert (stats["failed_jobs"], stats["largest_batch"]) == (1, 3)
+
+
+def test_writer_keeps_serving_after_a_failure(db, writer):
+    with pytest.raises(ValueError):
+        writer.run(_add_item_then_fail("Broken"))
+    writer.run(_add_item("Next"))
+    assert _item_names(db) == ["Next"]
+
+
+def test_closed_writer_finishes_queued_jobs_and_refuses_new_ones(db, writer):
+    futures = _queue_behind_a_gate(writer, [_add_item("Queued")])
+    writer.close()
+
+    assert futures[0].done()
+    assert _item_names(db) == ["Queued"]
+    with pytest.raises(RuntimeError):
+        writer.submit(_add_item("Late"))
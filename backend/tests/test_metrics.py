@@ -0,0 +1,29 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+def test_metrics_are_open_outside_production(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "homebites_" in response.text
+
+
+def test_production_hides_metrics_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(main, "IS_PRODUCTION", True)
+    monkeypatch.setattr(main, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+
+def test_production_serves_metrics_to_the_token_holder(client, monkeypatch):
+    monkeypatch.setattr(main, "IS_PRODUCTION", True)
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-token")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).status_code == 200
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+import order_transitions
+from database import engine
+from order_transitions import (
+    ORDER_STATUSES,
+    ORDER_TRANSITIONS,
+    CancellationWindowError,
+    InvalidTransitionError,
+    OrderConflictError,
+    OrderNotFoundError,
+    OrderOwnershipError,
+    transition_order,
+)
+from tests.support import add_item, add_user, place_order
+
+
+@pytest.fixture
+def shop(db):
+    user_id = add_user(db)
+    item_id = add_item(db, price=50)
+    db.commit()
+    return {"user_id": user_id, "item_id": item_id}
+
+
+def _order(db, shop, status: str = "pending", order_date: date | None = None, quantity: int = 2) -> int:
+    order_id = place_order(
+        db, shop["user_id"], {shop["item_id"]: quantity}, order_date=order_date or date.today(), order_status=status
+    )
+    db.commit()
+    return order_id
+
+
+def _status(db, order_id: int) -> str:
+    return db.execute(text("SELECT order_status FROM orders WHERE order_id = :order_id"), {"order_id": order_id}).scalar()
+
+
+def _items_sold(db, item_id: int) -> int:
+    return db.execute(
+        text("SELECT total_quantity FROM item_sales_stats WHERE item_id = :item_id"), {"item_id": item_id}
+    ).scalar()
+
+
+@pytest.mark.parametrize("source", sorted(ORDER_STATUSES))
+@pytest.mark.parametrize("target", sorted(ORDER_STATUSES))
+def test_transition_table(db, shop, source, target):
+    order_id = _order(db, shop, source)
+    if target in ORDER_TRANSITIONS[source]:
+        assert transition_order(db, order_id, target)["order_status"] == target
+        db.commit()
+        assert _status(db, order_id) == target
+    else:
+        with pytest.raises(InvalidTransitionError):
+            transition_order(db, order_id, target)
+        db.rollback()
+        assert _status(db, order_id) == source
+
+
+@pytest.mark.parametrize("status", ["pending", "confirmed"])
+def test_resending_the_current_status_needs_allow_unchanged(db, shop, status):
+    order_id = _order(db, shop, status)
+    with pytest.raises(InvalidTransitionError):
+        transition_order(db, order_id, status)
+    assert transition_order(db, order_id, status, allow_unchanged=True)["order_status"] == status
+
+
+def test_unknown_status_is_rejected(db, shop):
+    with pytest.raises(InvalidTransitionError):
+        transition_order(db, _order(db, shop), "shipped")
+
+
+def test_missing_order(db):
+    with pytest.raises(OrderNotFoundError):
+        transition_order(db, 424242, "confirmed")
+
+
+def test_customers_change_only_their_own_orders(db, shop):
+    order_id = _order(db, shop)
+    other_user = add_user(db, "other@example.com", phone_number=9000000002)
+    with pytest.raises(OrderOwnershipError):
+        transition_order(db, order_id, "cancelled", user_id=other_user)
+    assert transition_order(db, order_id, "cancelled", user_id=shop["user_id"])["order_status"] == "cancelled"
+
+
+def test_cancellation_window(db, shop):
+    old_order = _order(db, shop, order_date=date.today() - timedelta(days=3))
+    with pytest.raises(CancellationWindowError):
+        transition_order(db, old_order, "cancelled", within_cancellation_window=True)
+
+    recent_order = _order(db, shop)
+    assert transition_order(db, recent_order, "cancelled", within_cancellation_window=True)["order_status"] == "cancelled"
+
+
+def test_second_of_two_racing_transitions_loses(db, shop):
+    order_id = _order(db, shop, "confirmed")
+    transition_order(db, order_id, "delivered")
+    db.commit()
+    with pytest.raises(InvalidTransitionError, match="already delivered"):
+        transition_order(db, order_id, "cancelled")
+
+
+def test_edit_that_keeps_losing_races_is_a_conflict(db, shop, monkeypatch):
+    # No snapshot reads left: as if every re-read was overtaken by another edit.
+    monkeypatch.setattr(order_transitions, "SNAPSHOT_ATTEMPTS", 0)
+    order_id = _order(db, shop)
+    with pytest.raises(OrderConflictError):
+        transition_order(db, order_id, "pending", changes={"amount": 75}, allow_unchanged=True)
+
+
+def test_item_sales_follow_cancellation(db, shop):
+    order_id = _order(db, shop, quantity=3)
+    assert _items_sold(db, shop["item_id"]) == 3
+    transition_order(db, order_id, "confirmed")
+    assert _items_sold(db, shop["item_id"]) == 3
+    transition_order(db, order_id, "cancelled")
+    assert _items_sold(db, shop["item_id"]) == 0
+
+
+def test_unknown_columns_cannot_be_changed(db, shop):
+    with pytest.raises(ValueError):
+        transition_order(db, _order(db, shop), None, changes={"order_id": 7})
+
+
+def _count_updates(call) -> int:
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(updates)
+
+
+def test_admin_edit_that_resends_the_rollup_columns_is_one_update(db, shop):
+    order_id = _order(db, shop)
+    order = db.execute(text("SELECT * FROM orders WHERE order_id = :order_id"), {"order_id": order_id}).mappings().one()
+    changes = {
+        "amount": order["amount"],
+        "city": order["city"],
+        "order_date": date.fromisoformat(str(order["order_date"])),
+        "payment_status": "paid",
+    }
+    assert _count_updates(lambda: transition_order(db, order_id, "confirmed", changes=changes, allow_unchanged=True)) == 1
+    assert _status(db, order_id) == "confirmed"
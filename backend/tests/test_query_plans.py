@@ -0,0 +1,223 @@
+import json
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import event, text
+
+from database import IS_SQLITE, SessionLocal, engine
+from db_utils import encode_cursor, fetch_page
+from order_service import attach_order_lines, fetch_order_page
+from production_plan import fetch_production_plan
+from sales_stats import get_top_ordered_item_ids
+from tests.support import clear_tables
+from user_search import rebuild_user_search, search_users
+
+
+# Hot read paths and the calls that exercise them. Every SELECT a call issues
+# is captured and explained, so the check follows the SQL the code builds.
+# Each must be answered from an index: a bare table scan always fails, and a
+# temporary sort fails unless sorts are allowed for that call. Keyset pages
+# and line lists rely on index order; the production plan groups and
+# search_users ranks rows an index has already narrowed down, so they may sort.
+HOT_PATHS = {
+    "user orders page": (
+        lambda db: fetch_page(
+            db, "orders", "*", "order_id", None, 50, where="user_id = :user_id", params={"user_id": 1}, descending=True
+        ),
+        False,
+    ),
+    "orders by status page": (
+        lambda db: fetch_page(
+            db,
+            "orders",
+            "*",
+            "order_id",
+            encode_cursor(1500),
+            50,
+            where="order_status = :status",
+            params={"status": "pending"},
+            descending=True,
+        ),
+        False,
+    ),
+    "order details page": (
+        lambda db: fetch_page(db, "order_details", "*", "order_detail_id", encode_cursor(100), 50),
+        False,
+    ),
+    "admin orders by status": (
+        lambda db: fetch_order_page(db, None, 50, order_status="pending"),
+        False,
+    ),
+    "admin orders by date range": (
+        lambda db: fetch_order_page(db, None, 50, date_from=date(2026, 1, 1), date_to=date(2026, 1, 7)),
+        False,
+    ),
+    "admin orders by status and date range, second page": (
+        lambda db: fetch_order_page(
+            db,
+            encode_cursor(["2026-01-20", 1500]),
+            50,
+            date_from=date(2026, 1, 1),
+            date_to=date(2026, 1, 31),
+            order_status="pending",
+        ),
+        False,
+    ),
+    "order lines for a page of orders": (
+        lambda db: attach_order_lines(db, [{"order_id": order_id} for order_id in (1, 2, 3)]),
+        False,
+    ),
+    "production plan": (
+        lambda db: fetch_production_plan(db, date(2026, 1, 1), date(2026, 1, 7)),
+        True,
+    ),
+    "user search": (
+        lambda db: search_users(db, "user 12", limit=20),
+        True,
+    ),
+    "user search by phone prefix": (
+        lambda db: search_users(db, "90000001", limit=20),
+        True,
+    ),
+    "user search by city": (
+        lambda db: search_users(db, city="hyderabad", limit=20),
+        True,
+    ),
+    "top ordered items": (
+        lambda db: get_top_ordered_item_ids(db, 20),
+        False,
+    ),
+}
+
+SQLITE_TABLE_SCAN = re.compile(r"^SCAN \w+$")
+
+
+def _seed(db) -> None:
+    cities = ["Hyderabad", "Vizag", "Vijayawada", "Guntur"]
+    db.execute(
+        text(
+            """
+            INSERT INTO users (name, phone_number, email, password, role, address, city)
+            VALUES (:name, :phone_number, :email, 'x', 'user', 'Seed Street', :city)
+            """
+        ),
+        [
+            {"name": f"User {n}", "phone_number": 9000000000 + n, "email": f"user{n}@example.com", "city": cities[n % 4]}
+            for n in range(1, 501)
+        ],
+    )
+    db.execute(
+        text("INSERT INTO items (item_name, price, weight) VALUES (:name, :price, '250g')"),
+        [{"name": f"Item {n}", "price": 50 + n} for n in range(1, 101)],
+    )
+    statuses = ["pending", "confirmed", "delivered", "cancelled"]
+    db.execute(
+        text(
+            """
+            INSERT INTO orders (
+                user_id, amount, order_status, payment_status, payment_mode, order_date, delivery_date, address, city
+            )
+            VALUES (:user_id, 100, :status, 'pending', 'cash', :order_date, :order_date, 'Seed Street', 'Vizag')
+            """
+        ),
+        [
+            {
+                "user_id": n % 500 + 1,
+                "status": statuses[n % 4],
+                "order_date": date(2026, n // 200 + 1, n % 28 + 1),
+            }
+            for n in range(2000)
+        ],
+    )
+    db.execute(
+        text("INSERT INTO order_details (order_id, item_id, quantity, price) VALUES (:order_id, :item_id, 1, 60)"),
+        [{"order_id": n % 2000 + 1, "item_id": n % 100 + 1} for n in range(6000)],
+    )
+    db.execute(
+        text(
+            """
+            INSERT INTO item_sales_stats (item_id, total_quantity)
+            SELECT item_id, SUM(quantity) FROM order_details GROUP BY item_id
+            """
+        )
+    )
+    rebuild_user_search(db)
+
+
+@pytest.fixture(scope="module")
+def seeded_db():
+    session = SessionLocal()
+    try:
+        _seed(session)
+        session.commit()
+        if IS_SQLITE:
+            session.execute(text("ANALYZE"))
+        else:
+            session.execute(text("ANALYZE users, items, orders, order_details, item_sales_stats"))
+        session.commit()
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        clear_tables()
+
+
+def _capture_selects(db, call) -> list[tuple[str, object]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _sqlite_plan(db, statement: str, parameters, allow_sort: bool) -> tuple[list[str], list[str]]:
+    plan = [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    problems = [
+        detail
+        for detail in plan
+        if SQLITE_TABLE_SCAN.match(detail) or (not allow_sort and detail.startswith("USE TEMP B-TREE"))
+    ]
+    return plan, problems
+
+
+def _postgres_plan(db, statement: str, parameters, allow_sort: bool) -> tuple[list[str], list[str]]:
+    # Tiny seeded tables make sequential scans cheapest, so disable them to
+    # check that an index path exists at all.
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    raw_plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar_one()
+    if isinstance(raw_plan, str):
+        raw_plan = json.loads(raw_plan)
+
+    plan: list[str] = []
+    problems: list[str] = []
+    pending = [raw_plan[0]["Plan"]]
+    while pending:
+        node = pending.pop()
+        description = node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+        plan.append(description)
+        if node["Node Type"] == "Seq Scan" or (not allow_sort and node["Node Type"] == "Sort"):
+            problems.append(description)
+        pending.extend(node.get("Plans", []))
+    return plan, problems
+
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_path_uses_an_index(seeded_db, name):
+    call, allow_sort = HOT_PATHS[name]
+    statements = _capture_selects(seeded_db, call)
+    seeded_db.rollback()
+    assert statements, f"{name} issued no SELECT"
+
+    explain = _sqlite_plan if IS_SQLITE else _postgres_plan
+    for statement, parameters in statements:
+        plan, problems = explain(seeded_db, statement, parameters, allow_sort)
+        seeded_db.rollback()
+        assert not problems, f"{name}: {', '.join(problems)}\n{statement}\nplan: {' | '.join(plan)}"
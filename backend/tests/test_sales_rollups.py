@@ -0,0 +1,139 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from auth import hash_password
+from order_transitions import transition_order
+from sales_rollups import apply_line_rollups, fetch_daily_sales, rebuild_sales_rollups
+from tests.support import add_item, add_user, fetch_rollups, login, place_order
+
+
+DAY = date(2026, 3, 10)
+NEXT_DAY = date(2026, 3, 11)
+
+
+@pytest.fixture
+def shop(db):
+    user_id = add_user(db)
+    laddu = add_item(db, "Laddu", price=100)
+    murukku = add_item(db, "Murukku", price=40)
+    db.commit()
+    return {"user_id": user_id, "laddu": laddu, "murukku": murukku}
+
+
+def assert_matches_rebuild(db) -> dict:
+    # The incremental upserts must land where a full recompute would.
+    incremental = fetch_rollups(db)
+    rebuild_sales_rollups(db)
+    assert fetch_rollups(db) == incremental
+    db.rollback()
+    return incremental
+
+
+def test_new_order_is_counted_on_its_day_item_and_city(db, shop):
+    place_order(db, shop["user_id"], {shop["laddu"]: 2, shop["murukku"]: 5}, order_date=DAY, city="Guntur")
+    db.commit()
+
+    rollups = assert_matches_rebuild(db)
+    assert rollups["daily_sales"] == [{"day": "2026-03-10", "orders": 1, "revenue": 400, "items_sold": 7}]
+    assert rollups["daily_item_sales"] == [
+        {"day": "2026-03-10", "item_id": shop["laddu"], "quantity": 2, "revenue": 200},
+        {"day": "2026-03-10", "item_id": shop["murukku"], "quantity": 5, "revenue": 200},
+    ]
+    assert rollups["daily_city_sales"] == [{"day": "2026-03-10", "city": "Guntur", "orders": 1, "revenue": 400}]
+
+
+def test_orders_on_the_same_day_add_up(db, shop):
+    place_order(db, shop["user_id"], {shop["laddu"]: 1}, order_date=DAY)
+    place_order(db, shop["user_id"], {shop["laddu"]: 3}, order_date=DAY)
+    db.commit()
+
+    [row] = fetch_daily_sales(db, DAY, DAY)
+    assert (row["orders"], row["revenue"], row["items_sold"]) == (2, 400, 4)
+    assert_matches_rebuild(db)
+
+
+def test_cancelled_orders_are_left_out(db, shop):
+    place_order(db, shop["user_id"], {shop["laddu"]: 1}, order_date=DAY, order_status="cancelled")
+    db.commit()
+    assert assert_matches_rebuild(db)["daily_sales"] == []
+
+
+def test_cancelling_reverses_the_order(db, shop):
+    order_id = place_order(db, shop["user_id"], {shop["laddu"]: 2}, order_date=DAY)
+    transition_order(db, order_id, "cancelled")
+    db.commit()
+    assert assert_matches_rebuild(db) == {"daily_sales": [], "daily_item_sales": [], "daily_city_sales": []}
+
+
+def test_editing_day_city_and_amount_moves_the_order(db, shop):
+    order_id = place_order(db, shop["user_id"], {shop["laddu"]: 2}, order_date=DAY, city="Guntur")
+    transition_order(db, order_id, "confirmed", changes={"order_date": NEXT_DAY, "city": "Vizag", "amount": 150})
+    db.commit()
+
+    rollups = assert_matches_rebuild(db)
+    assert rollups["daily_sales"] == [{"day": "2026-03-11", "orders": 1, "revenue": 150, "items_sold": 2}]
+    assert rollups["daily_city_sales"] == [{"day": "2026-03-11", "city": "Vizag", "orders": 1, "revenue": 150}]
+
+
+def test_line_rollups_reverse_with_a_negative_sign(db, shop):
+    lines = [{"item_id": shop["laddu"], "quantity": 2, "price": 100}]
+    apply_line_rollups(db, DAY, lines)
+    apply_line_rollups(db, DAY, lines)
+    apply_line_rollups(db, DAY, lines, -1)
+    db.commit()
+    assert fetch_rollups(db)["daily_item_sales"] == [
+        {"day": "2026-03-10", "item_id": shop["laddu"], "quantity": 2, "revenue": 200}
+    ]
+
+
+@pytest.fixture
+def admin(app, db):
+    add_user(db, "admin@example.com", phone_number=9000000002, role="admin", password=hash_password("admin-pass"))
+    db.commit()
+    return login(app, "admin@example.com", "admin-pass")
+
+
+def _items_sold(db) -> dict[int, int]:
+    return dict(db.execute(text("SELECT item_id, total_quantity FROM item_sales_stats WHERE total_quantity <> 0")).all())
+
+
+def test_order_line_endpoints_keep_the_rollups_in_step(db, shop, admin):
+    first = place_order(db, shop["user_id"], {shop["laddu"]: 1}, order_date=DAY)
+    second = place_order(db, shop["user_id"], {shop["laddu"]: 1}, order_date=NEXT_DAY)
+    db.commit()
+
+    line = {"order_id": first, "item_id": shop["murukku"], "quantity": 3, "price": 1}
+    response = admin.post("/order-details/", json=line)
+    assert response.status_code == 201, response.text
+    detail_id = response.json()["order_detail_id"]
+    db.rollback()
+    assert_matches_rebuild(db)
+
+    # Moving a line to another day's order moves its quantity and revenue.
+    response = admin.put(f"/order-details/{detail_id}", json={**line, "order_id": second, "quantity": 4})
+    assert response.status_code == 200, response.text
+    db.rollback()
+    rollups = assert_matches_rebuild(db)
+    moved = {"day": "2026-03-11", "item_id": shop["murukku"], "quantity": 4, "revenue": 160}
+    assert moved in rollups["daily_item_sales"]
+
+    assert admin.delete(f"/order-details/{detail_id}").status_code == 200
+    db.rollback()
+    assert_matches_rebuild(db)
+    assert _items_sold(db) == {shop["laddu"]: 2}
+
+
+def test_deleting_an_order_removes_its_lines_and_counts(db, shop, admin):
+    order_id = place_order(db, shop["user_id"], {shop["laddu"]: 2, shop["murukku"]: 1}, order_date=DAY)
+    db.commit()
+
+    response = admin.delete(f"/orders/{order_id}")
+    assert response.status_code == 200, response.text
+    db.rollback()
+    lines = db.execute(text("SELECT COUNT(*) FROM order_details WHERE order_id = :order_id"), {"order_id": order_id})
+    assert lines.scalar() == 0
+    assert assert_matches_rebuild(db) == {"daily_sales": [], "daily_item_sales": [], "daily_city_sales": []}
+    assert _items_sold(db) == {}
+    assert admin.delete(f"/orders/{order_id}").status_code == 404
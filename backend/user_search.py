@@ -0,0 +1,207 @@
+import re
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import IS_SQLITE, SessionLocal
+from db_models import USER_SEARCH_SQLITE_DDL
+from db_utils import fetch_all_dicts
+
+
+# Substring search over users for admin lookups. SQLite keeps an FTS5 trigram
+# table (rowid = user_id) that user writers refresh with sync_user_search();
+# Postgres answers the same LIKE patterns from pg_trgm GIN expression indexes
+# on the users table, so there is nothing to sync.
+
+MAX_QUERY_TERMS = 5
+MIN_TRIGRAM_LENGTH = 3
+USER_COLUMNS = "u.user_id, u.name, u.phone_number, u.email, u.role, u.address, u.city"
+
+PHONE_QUERY_PATTERN = re.compile(r"^\+?[\d\s-]+$")
+
+# (column, value) pairs; a None column searches name, city and email together.
+SearchFilters = list[tuple[Optional[str], str]]
+
+
+def sync_user_search(db: Session, user_id: int) -> None:
+    if not IS_SQLITE:
+        return
+    # Re-reads the user row, so it covers inserts, updates and deletes alike.
+    db.execute(text("DELETE FROM user_search WHERE rowid = :user_id"), {"user_id": user_id})
+    db.execute(
+        text(
+            """
+            INSERT INTO user_search (rowid, name, city, email, phone)
+            SELECT user_id, name, COALESCE(city, ''), email, CAST(phone_number AS TEXT)
+            FROM users
+            WHERE user_id = :user_id
+            """
+        ),
+        {"user_id": user_id},
+    )
+
+
+def rebuild_user_search(db: Session) -> int:
+    if not IS_SQLITE:
+        return 0
+    for statement in USER_SEARCH_SQLITE_DDL:
+        db.execute(text(statement))
+    db.execute(text("DELETE FROM user_search"))
+    result = db.execute(
+        text(
+            """
+            INSERT INTO user_search (rowid, name, city, email, phone)
+            SELECT user_id, name, COALESCE(city, ''), email, CAST(phone_number AS TEXT)
+            FROM users
+            """
+        )
+    )
+    db.execute(text("INSERT INTO user_search (user_search) VALUES ('optimize')"))
+    return result.rowcount
+
+
+def _like_pattern(value: str, prefix_only: bool = False) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
+
+def _fts_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _phone_prefix(query: str) -> Optional[str]:
+    if not PHONE_QUERY_PATTERN.match(query):
+        return None
+    digits = re.sub(r"\D", "", query)
+    return digits or None
+
+
+def search_users(
+    db: Session,
+    query: Optional[str] = None,
+    *,
+    name: Optional[str] = None,
+    city: Optional[str] = None,
+    limit: int,
+) -> list[dict[str, Any]]:
+    # Every word of query must appear in the name, city or email; a query of
+    # digits is a phone number prefix instead. name and city match substrings
+    # of that column only. Names starting with the query rank first.
+    query = (query or "").strip()
+    name = (name or "").strip().casefold()
+    city = (city or "").strip().casefold()
+
+    phone = _phone_prefix(query) if query else None
+    terms = [] if phone else list(dict.fromkeys(query.casefold().split()))[:MAX_QUERY_TERMS]
+    filters: SearchFilters = [(None, term) for term in terms]
+    if name:
+        filters.append(("name", name))
+    if city:
+        filters.append(("city", city))
+
+    if IS_SQLITE:
+        return _search_sqlite(db, query, phone, filters, limit)
+    return _search_postgres(db, query, phone, filters, limit)
+
+
+def _search_sqlite(
+    db: Session, query: str, phone: Optional[str], filters: SearchFilters, limit: int
+) -> list[dict[str, Any]]:
+    params: dict[str, Any] = {"limit": limit, "name_prefix": _like_pattern(query.casefold(), prefix_only=True)}
+    matches = []
+    conditions = []
+    for index, (column, value) in enumerate(filters):
+        if len(value) >= MIN_TRIGRAM_LENGTH:
+            scope = "{" + (column or "name city email") + "}"
+            matches.append(f"{scope} : {_fts_phrase(value)}")
+            continue
+        # Trigram queries need three characters; shorter values are checked
+        # on the rows the index already narrowed down (or scanned otherwise).
+        params[f"term_{index}"] = _like_pattern(value)
+        columns = [column] if column else ["name", "city", "email"]
+        conditions.append(
+            "(" + " OR ".join(f"lower(COALESCE(u.{col}, '')) LIKE :term_{index} ESCAPE '\\'" for col in columns) + ")"
+        )
+
+    if phone:
+        # Digits only, so the pattern needs no ESCAPE clause. FTS5 only
+        # serves two-argument LIKE from the trigram index; with ESCAPE it
+        # scans the whole table.
+        params["phone"] = f"{phone}%"
+        if len(phone) >= MIN_TRIGRAM_LENGTH:
+            conditions.append("s.phone LIKE :phone")
+        else:
+            conditions.append("CAST(u.phone_number AS TEXT) LIKE :phone")
+
+    if not matches and not conditions:
+        return fetch_all_dicts(db, f"SELECT {USER_COLUMNS} FROM users u ORDER BY u.name ASC LIMIT :limit", params)
+
+    if matches:
+        params["match"] = " AND ".join(matches)
+        conditions.insert(0, "user_search MATCH :match")
+        relevance = "bm25(user_search, 4.0, 1.0, 2.0, 0.0)"
+    else:
+        relevance = "u.name"
+
+    return fetch_all_dicts(
+        db,
+        f"""
+        SELECT {USER_COLUMNS}
+        FROM user_search s
+        JOIN users u ON u.user_id = s.rowid
+        WHERE {" AND ".join(conditions)}
+        ORDER BY lower(u.name) LIKE :name_prefix ESCAPE '\\' DESC, {relevance}, u.user_id ASC
+        LIMIT :limit
+        """,
+        params,
+    )
+
+
+def _search_postgres(
+    db: Session, query: str, phone: Optional[str], filters: SearchFilters, limit: int
+) -> list[dict[str, Any]]:
+    params: dict[str, Any] = {
+        "limit": limit,
+        "query": query.casefold(),
+        "name_prefix": _like_pattern(query.casefold(), prefix_only=True),
+    }
+    conditions = []
+    for index, (column, value) in enumerate(filters):
+        params[f"term_{index}"] = _like_pattern(value)
+        columns = [column] if column else ["name", "city", "email"]
+        conditions.append(
+            "(" + " OR ".join(f"lower(u.{col}) LIKE :term_{index}" for col in columns) + ")"
+        )
+    if phone:
+        params["phone"] = f"{phone}%"
+        conditions.append("(u.phone_number::text) LIKE :phone")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return fetch_all_dicts(
+        db,
+        f"""
+        SELECT {USER_COLUMNS}
+        FROM users u
+        {where}
+        ORDER BY
+            lower(u.name) LIKE :name_prefix DESC,
+            4 * similarity(lower(u.name), :query)
+            + 2 * similarity(lower(u.email), :query)
+            + COALESCE(similarity(lower(u.city), :query), 0) DESC,
+            u.name ASC,
+            u.user_id ASC
+        LIMIT :limit
+        """,
+        params,
+    )
+
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        rebuilt = rebuild_user_search(session)
+        session.commit()
+    finally:
+        session.close()
+    print(f"Rebuilt user_search for {rebuilt} users")
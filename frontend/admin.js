@@ -69,27 +69,21 @@ function switchTab(tabName) {
 }
 
 // Load Overview Stats
-async function loadOverviewStats() {
-  try {
-    const [itemsRes, usersRes, ordersRes] = await Promise.all([
-      fetchFresh(`${API_BASE_URL}/items`),
-      fetchFresh(`${API_BASE_URL}/users`),
-      fetchFresh(`${API_BASE_URL}/orders`)
-    ]);
-
-    const items = await itemsRes.json();
-    const users = await usersRes.json();
-    const orders = await ordersRes.json();
-
-    document.getElementById('totalItems').textContent = items.length;
-    document.getElementById('totalUsers').textContent = users.length;
-    document.getElementById('totalOrders').textContent = orders.length;
-    
-    const pending = orders.filter(o => o.order_status === 'pending').length;
-    document.getElementById('pendingOrders').textContent = pending;
-
-    // Load recent orders
-    loadRecentOrders(orders);
+async function loadOverviewStats() {
+  try {
+    const res = await fetchFresh(`${API_BASE_URL}/admin/summary`);
+    const summary = await res.json();
+    if (!res.ok) {
+      throw new Error(summary.detail || 'Failed to load summary');
+    }
+
+    document.getElementById('totalItems').textContent = summary.total_items;
+    document.getElementById('totalUsers').textContent = summary.total_users;
+    document.getElementById('totalOrders').textContent = summary.total_orders;
+    document.getElementById('pendingOrders').textContent = summary.pending_orders;
+    document.getElementById('revenueToday').textContent = `₹${summary.revenue_today} today`;
+
+    loadRecentOrders(summary.recent_orders);
 
   } catch (err) {
     console.error('Failed to load stats:', err);
@@ -198,14 +192,53 @@ async function loadItems() {
   }
 }
 
+function pageUrl(path, cursor, filters = {}) {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([name, value]) => {
+    if (value) params.set(name, value);
+  });
+  if (cursor) params.set('cursor', cursor);
+  const query = params.toString();
+  return query ? `${API_BASE_URL}${path}?${query}` : `${API_BASE_URL}${path}`;
+}
+
+function loadMoreButton(cursor, handler) {
+  if (!cursor) return '';
+  return `<div class="load-more"><button class="action-btn view" onclick="${handler}">Load more</button></div>`;
+}
+
 // Load Users
-async function loadUsers() {
+let allUsers = [];
+let usersNextCursor = null;
+let usersSearchTimer = null;
+
+function searchUsers() {
+  clearTimeout(usersSearchTimer);
+  usersSearchTimer = setTimeout(() => loadUsers(), 250);
+}
+
+async function loadUsers(append = false) {
   const container = document.getElementById('usersTable');
-  container.innerHTML = '<p class="loading">Loading users...</p>';
+  const query = document.getElementById('userSearchInput').value.trim();
+  if (!append) {
+    allUsers = [];
+    usersNextCursor = null;
+    container.innerHTML = '<p class="loading">Loading users...</p>';
+  }
 
-  try {
-    const res = await fetchFresh(`${API_BASE_URL}/users`);
-    const users = await res.json();
+  try {
+    // Searches return the best matches in one response; browsing pages by cursor.
+    const url = query
+      ? `${API_BASE_URL}/users/search/?q=${encodeURIComponent(query)}`
+      : pageUrl('/users', usersNextCursor);
+    const res = await fetchFresh(url);
+    const page = await res.json();
+    if (!res.ok) {
+      throw new Error(page.detail || 'Failed to load users');
+    }
+    allUsers = allUsers.concat(query ? page : page.items);
+    usersNextCursor = query ? null : page.next_cursor;
+    const users = allUsers;
 
     const html = `
       <table class="data-table">
@@ -232,6 +265,7 @@ async function loadUsers() {
           `).join('')}
         </tbody>
       </table>
+      ${loadMoreButton(usersNextCursor, 'loadUsers(true)')}
     `;
     container.innerHTML = html;
 
@@ -242,14 +276,40 @@ async function loadUsers() {
 
 // Load Orders
 let allOrders = [];
+let ordersNextCursor = null;
+
+// Mirrors ORDER_TRANSITIONS in backend/order_transitions.py.
+const ORDER_TRANSITIONS = {
+  pending: ['confirmed', 'cancelled'],
+  confirmed: ['delivered', 'cancelled'],
+  delivered: [],
+  cancelled: []
+};
+
+function orderStatusOptions(current) {
+  return [current, ...(ORDER_TRANSITIONS[current] || [])]
+    .map(status => `<option value="${status}" ${status === current ? 'selected' : ''}>${status}</option>`)
+    .join('');
+}
 
-async function loadOrders() {
+async function loadOrders(append = false) {
   const container = document.getElementById('ordersTable');
-  container.innerHTML = '<p class="loading">Loading orders...</p>';
+  if (!append) {
+    allOrders = [];
+    ordersNextCursor = null;
+    container.innerHTML = '<p class="loading">Loading orders...</p>';
+  }
 
-  try {
-    const res = await fetchFresh(`${API_BASE_URL}/orders`);
-    allOrders = await res.json();
+  try {
+    // The status filter is applied by the server, so every page matches it.
+    const status = document.getElementById('orderStatusFilter').value;
+    const res = await fetchFresh(pageUrl('/orders', ordersNextCursor, { status }));
+    const page = await res.json();
+    if (!res.ok) {
+      throw new Error(page.detail || 'Failed to load orders');
+    }
+    allOrders = allOrders.concat(page.items);
+    ordersNextCursor = page.next_cursor;
 
     displayOrders(allOrders);
 
@@ -262,7 +322,7 @@ function displayOrders(orders) {
   const container = document.getElementById('ordersTable');
 
   if (orders.length === 0) {
-    container.innerHTML = '<div class="empty-state"><div class="empty-state-icon">📦</div><p>No orders found</p></div>';
+    container.innerHTML = `<div class="empty-state"><div class="empty-state-icon">📦</div><p>No orders found</p></div>${loadMoreButton(ordersNextCursor, 'loadOrders(true)')}`;
     return;
   }
 
@@ -288,10 +348,7 @@ function displayOrders(orders) {
             <td>₹${order.amount}</td>
             <td>
               <select id="orderStatus-${order.order_id}" class="status-select">
-                <option value="pending" ${order.order_status === 'pending' ? 'selected' : ''}>pending</option>
-                <option value="confirmed" ${order.order_status === 'confirmed' ? 'selected' : ''}>confirmed</option>
-                <option value="delivered" ${order.order_status === 'delivered' ? 'selected' : ''}>delivered</option>
-                <option value="cancelled" ${order.order_status === 'cancelled' ? 'selected' : ''}>cancelled</option>
+                ${orderStatusOptions(order.order_status)}
               </select>
             </td>
             <td>
@@ -318,6 +375,7 @@ function displayOrders(orders) {
         `).join('')}
       </tbody>
     </table>
+    ${loadMoreButton(ordersNextCursor, 'loadOrders(true)')}
   `;
   container.innerHTML = html;
 }
@@ -368,17 +426,16 @@ async function updateOrderStatus(orderId) {
       throw new Error(data.detail || 'Failed to update order');
     }
 
+    const activeFilter = document.getElementById('orderStatusFilter').value;
     const idx = allOrders.findIndex(o => o.order_id === orderId);
     if (idx >= 0) {
-      allOrders[idx] = data;
-    }
-
-    const activeFilter = document.getElementById('orderStatusFilter').value;
-    if (!activeFilter) {
-      displayOrders(allOrders);
-    } else {
-      displayOrders(allOrders.filter(o => o.order_status === activeFilter));
+      if (activeFilter && data.order_status !== activeFilter) {
+        allOrders.splice(idx, 1);
+      } else {
+        allOrders[idx] = data;
+      }
     }
+    displayOrders(allOrders);
 
     loadOverviewStats();
     setAlert(document.getElementById('ordersMessage'), 'success', `Order #${orderId} updated successfully`);
@@ -388,14 +445,8 @@ async function updateOrderStatus(orderId) {
 }
 
 function filterOrders() {
-  const status = document.getElementById('orderStatusFilter').value;
-  
-  if (!status) {
-    displayOrders(allOrders);
-  } else {
-    const filtered = allOrders.filter(o => o.order_status === status);
-    displayOrders(filtered);
-  }
+  // Starts again from the first page of the newly selected status.
+  loadOrders();
 }
 
 // Add Item Modal
@@ -517,6 +568,12 @@ document.getElementById('addItemForm').addEventListener('submit', async (e) => {
       throw new Error(data.detail || (isEditMode ? 'Failed to update item' : 'Failed to add item'));
     }
 
+    const photoFile = document.getElementById('itemPhotoFile').files[0];
+    if (photoFile) {
+      setButtonLoading(btn, 'Uploading photo...', true);
+      await uploadItemPhoto(isEditMode ? editingItemId : data.item_id, photoFile);
+    }
+
     setAlert(message, 'success', isEditMode ? 'Item updated successfully!' : 'Item added successfully!');
     document.getElementById('addItemForm').reset();
     
@@ -533,6 +590,22 @@ document.getElementById('addItemForm').addEventListener('submit', async (e) => {
   }
 });
 
+// The photo is sent as the raw request body; the server builds the resized variants.
+async function uploadItemPhoto(itemId, file) {
+  const res = await apiFetch(`${API_BASE_URL}/items/${itemId}/photo`, {
+    method: 'PUT',
+    headers: {
+      'Content-Type': file.type || 'application/octet-stream'
+    },
+    body: file
+  });
+
+  if (!res.ok) {
+    const data = await res.json().catch(() => ({}));
+    throw new Error(data.detail || 'Failed to upload photo');
+  }
+}
+
 // Delete Item
 async function deleteItem(itemId) {
   const itemsMessage = document.getElementById('itemsMessage');
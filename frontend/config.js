@@ -3,6 +3,13 @@ const IS_LOCAL_HOST =
   window.location.hostname === "127.0.0.1" ||
   window.location.hostname === "";
 
+// The backend serves these pages under /app/, so the API is on the same origin.
+const IS_SERVED_BY_API = window.location.pathname.startsWith("/app/");
+
 window.API_BASE_URL =
   window.HOME_BITES_API_BASE_URL ||
-  (IS_LOCAL_HOST ? "http://127.0.0.1:8000" : "https://home-bites.onrender.com");
+  (IS_SERVED_BY_API
+    ? window.location.origin
+    : IS_LOCAL_HOST
+      ? "http://127.0.0.1:8000"
+      : "https://home-bites.onrender.com");